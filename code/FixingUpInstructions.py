@@ -1,5 +1,8 @@
 import sys
 import assemblyGenerator
+import diagnostics
+
+log = diagnostics.getLogger("FixingUpInstructions")
 
 def areMemoryOperands(src, dst):
     #        memory data indexed
@@ -15,19 +18,40 @@ def areMemoryOperands(src, dst):
     
     return False
 
+def isSameMemory(src, dst):
+    match src, dst:
+        case assemblyGenerator.MemoryOperand(), assemblyGenerator.MemoryOperand():
+            return src.reg.register == dst.reg.register and src.int == dst.int
+        case assemblyGenerator.DataOperand(), assemblyGenerator.DataOperand():
+            return src.identifier == dst.identifier
+    return False
+
+def isLargeImmediate(imm):
+    #doesn't fit in the sign extended 32 bit immediate of most instructions
+    return imm > pow(2, 31) - 1 or imm < -pow(2, 31)
+
 def FixingUpTopLevel(topLevel):
     match topLevel:
         case assemblyGenerator.StaticVariable():
             pass
-        case assemblyGenerator.Function(identifier = identifier, global_ = global_, insList = insList, stackOffset = stackOffset):
+        case assemblyGenerator.Function(identifier = identifier, global_ = global_, insList = insList, stackOffset = stackOffset, calleeSavedRegs = calleeSavedRegs):
             offset = stackOffset
 
             offset = offset - offset % 16
-            print(offset)
+
+            #the callee saved registers are pushed under the frame, the stack
+            #has to stay 16 byte aligned after the pushes
+            if len(calleeSavedRegs) % 2:
+                offset -= 8
+
+            log.debug("function {0} stack size {1}", identifier, -offset)
 
             newList = []
             newList.insert(0,assemblyGenerator.BinaryInstruction(assemblyGenerator.BinaryOperator(assemblyGenerator.BinopType.Sub), assemblyGenerator.Quadword(), assemblyGenerator.ImmediateOperand(-offset), assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.SP))))
 
+            for reg in calleeSavedRegs:
+                newList.append(assemblyGenerator.PushInstruction(assemblyGenerator.RegisterOperand(assemblyGenerator.Register(reg))))
+
             oldSize = len(newList)
 
             for index, i in enumerate(insList):
@@ -99,7 +123,7 @@ def FixingUpTopLevel(topLevel):
                                     newList.append(i)
                                     newList.append(instruction)
                                 
-                                elif type(src) == assemblyGenerator.ImmediateOperand and src.imm > pow(2, 31) - 1:
+                                elif type(src) == assemblyGenerator.ImmediateOperand and isLargeImmediate(src.imm):
 
                                     instructionImm = assemblyGenerator.MovInstruction(assType, src, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
 
@@ -119,6 +143,16 @@ def FixingUpTopLevel(topLevel):
                                 newList.append(instruction)
                                 newList.append(i)
                     
+                    case assemblyGenerator.IMulInstruction(assType=assType, factor=factor) | assemblyGenerator.MulInstruction(assType=assType, factor=factor):
+                        match factor:
+                            case assemblyGenerator.ImmediateOperand():
+                                i.factor = assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10))
+
+                                instruction = assemblyGenerator.MovInstruction(assType, factor, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
+
+                                newList.append(instruction)
+                                newList.append(i)
+
                     case assemblyGenerator.DivInstruction(assType=assType, divisor=div):
                         #mov imm(2), r10
                         #div r10
@@ -146,9 +180,9 @@ def FixingUpTopLevel(topLevel):
                                 newList.append(instruction1)
 
 
-                        elif type(operand) == assemblyGenerator.ImmediateOperand and operand.imm > pow(2, 31) - 1:
+                        elif type(operand) == assemblyGenerator.ImmediateOperand and isLargeImmediate(operand.imm):
                             #print(op0.imm)
-                            instructionImm = assemblyGenerator.MovInstruction(assType, operand, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
+                            instructionImm = assemblyGenerator.MovInstruction(assemblyGenerator.Quadword(), operand, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
 
                             i.operand = assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10))
 
@@ -253,8 +287,7 @@ def FixingUpTopLevel(topLevel):
 
                                     instructionImm = None
                                     
-                                    if type(op0) == assemblyGenerator.ImmediateOperand and op0.imm > pow(2, 31) - 1:
-                                        print(op0.imm)
+                                    if type(op0) == assemblyGenerator.ImmediateOperand and isLargeImmediate(op0.imm):
                                         instructionImm = assemblyGenerator.MovInstruction(assType, op0, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
 
                                         i.operand0 = assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10))
@@ -277,7 +310,15 @@ def FixingUpTopLevel(topLevel):
                                 
                                 if op.operator == assemblyGenerator.BinopType.Add or op.operator == assemblyGenerator.BinopType.Sub or op.operator == assemblyGenerator.BinopType.Mult or op.operator == assemblyGenerator.BinopType.DivDouble or op.operator == assemblyGenerator.BinopType.Xor:   
 
-                                    if type(dst) != assemblyGenerator.RegisterOperand:
+                                    if op.operator == assemblyGenerator.BinopType.Xor and isSameMemory(src, dst):
+                                        #zeroing memory, xorpd xmm15, xmm15
+                                        #                movsd xmm15, dst
+                                        xmm15 = assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.SSERegisterType.XMM15))
+
+                                        newList.append(assemblyGenerator.BinaryInstruction(op, assType, xmm15, xmm15))
+                                        newList.append(assemblyGenerator.MovInstruction(assType, xmm15, dst))
+
+                                    elif type(dst) != assemblyGenerator.RegisterOperand:
                                         #print("Ale:", assType.type)
                                         
                                         instruction0 = assemblyGenerator.MovInstruction(assType, i.dest, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.SSERegisterType.XMM15)))
@@ -304,7 +345,7 @@ def FixingUpTopLevel(topLevel):
                                         newList.append(instruction)
                                         newList.append(i)
 
-                                    elif type(src) == assemblyGenerator.ImmediateOperand and src.imm > pow(2, 31) - 1:
+                                    elif type(src) == assemblyGenerator.ImmediateOperand and isLargeImmediate(src.imm):
 
                                         instructionImm = assemblyGenerator.MovInstruction(assType, src, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.SSERegisterType.XMM14)))
 
@@ -335,7 +376,7 @@ def FixingUpTopLevel(topLevel):
                                         #newList.append(instruction1)
 
                                         instructionImm = None
-                                        if type(src) == assemblyGenerator.ImmediateOperand and src.imm > pow(2, 31) - 1:
+                                        if type(src) == assemblyGenerator.ImmediateOperand and isLargeImmediate(src.imm):
 
                                             instructionImm = assemblyGenerator.MovInstruction(assType, src, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
 
@@ -364,7 +405,7 @@ def FixingUpTopLevel(topLevel):
                                             newList.append(instruction)
                                             newList.append(i)
 
-                                        elif type(src) == assemblyGenerator.ImmediateOperand and src.imm > pow(2, 31) - 1:
+                                        elif type(src) == assemblyGenerator.ImmediateOperand and isLargeImmediate(src.imm):
 
                                             instructionImm = assemblyGenerator.MovInstruction(assType, src, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
 
@@ -383,7 +424,7 @@ def FixingUpTopLevel(topLevel):
                                             newList.append(instruction)
                                             newList.append(i)
 
-                                        elif type(src) == assemblyGenerator.ImmediateOperand and src.imm > pow(2, 31) - 1:
+                                        elif type(src) == assemblyGenerator.ImmediateOperand and isLargeImmediate(src.imm):
 
                                             instructionImm = assemblyGenerator.MovInstruction(assType, src, assemblyGenerator.RegisterOperand(assemblyGenerator.Register(assemblyGenerator.RegisterType.R10)))
 
@@ -394,7 +435,10 @@ def FixingUpTopLevel(topLevel):
 
                         
                     case assemblyGenerator.ReturnInstruction():
-                        pass
+                        for reg in reversed(calleeSavedRegs):
+                            newList.append(assemblyGenerator.PopInstruction(assemblyGenerator.Register(reg)))
+
+                        newList.append(i)
 
                     case assemblyGenerator.CallInstruction():
                         pass
@@ -0,0 +1,164 @@
+import assemblyGenerator
+import diagnostics
+
+log = diagnostics.getLogger("PeepholeOptimization")
+
+#Peephole optimizer, runs on the instruction lists FixingUpInstructions
+#leaves. Every rule looks at a short window of instructions and gives back
+#the instructions that replace it or None. Instructions go to the output
+#one by one and the rules are tried on the end of the output, after a
+#rewrite the instructions before it get another chance.
+#
+#A movl to the same register stays, it clears the upper half of the
+#register and that is how a zero extension ends up after allocation.
+
+class PeepholeRule:
+    def __init__(self, name, size, rewrite):
+        self.name = name
+        self.size = size
+        #rewrite(window) returns the new instructions or None
+        self.rewrite = rewrite
+
+    def __str__(self):
+        return "PeepholeRule {self.name} ({self.size})".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+def operandKey(operand):
+    match operand:
+        case assemblyGenerator.RegisterOperand(register = register):
+            return ("reg", register.register)
+        case assemblyGenerator.MemoryOperand(reg = reg, int = int):
+            return ("mem", reg.register, int)
+        case assemblyGenerator.DataOperand(identifier = identifier):
+            return ("data", identifier)
+        case assemblyGenerator.Indexed(base = base, index = index, scale = scale):
+            return ("indexed", base.register, index.register, scale)
+        case assemblyGenerator.ImmediateOperand(imm = imm):
+            return ("imm", imm)
+    return None
+
+def sameOperand(a, b):
+    key = operandKey(a)
+    return key != None and key == operandKey(b)
+
+def isRegister(operand):
+    return type(operand) == assemblyGenerator.RegisterOperand
+
+def isMemory(operand):
+    return type(operand) in [assemblyGenerator.MemoryOperand, assemblyGenerator.DataOperand, assemblyGenerator.Indexed]
+
+def addressUses(memory, register):
+    #the address of memory depends on register
+    match memory:
+        case assemblyGenerator.MemoryOperand(reg = reg):
+            return reg.register == register.register.register
+        case assemblyGenerator.Indexed(base = base, index = index):
+            return register.register.register in [base.register, index.register]
+    return False
+
+def isMov(i):
+    return type(i) == assemblyGenerator.MovInstruction
+
+def sameType(a, b):
+    return type(a.assType) == type(b.assType)
+
+#RULES
+
+def movToSelf(window):
+    #mov x, x does nothing, but movl on a register zero extends
+    [i] = window
+    if isMov(i) and sameOperand(i.sourceO, i.destO) and (type(i.assType) != assemblyGenerator.Longword or not isRegister(i.destO)):
+        return []
+    return None
+
+def storeReload(window):
+    #mov r, m; mov m, r2 -> mov r, m; mov r, r2
+    [store, load] = window
+    if isMov(store) and isMov(load) and sameType(store, load) and isRegister(store.sourceO) and isMemory(store.destO) and sameOperand(store.destO, load.sourceO):
+        if sameOperand(store.sourceO, load.destO):
+            return [store]
+        if isRegister(load.destO):
+            return [store, assemblyGenerator.MovInstruction(load.assType, store.sourceO, load.destO)]
+    return None
+
+def loadStoreBack(window):
+    #mov m, r; mov r, m writes back what is already there
+    [load, store] = window
+    if isMov(load) and isMov(store) and sameType(load, store) and isMemory(load.sourceO) and isRegister(load.destO) and sameOperand(load.destO, store.sourceO) and sameOperand(load.sourceO, store.destO) and not addressUses(load.sourceO, load.destO):
+        return [load]
+    return None
+
+def identityArithmetic(window):
+    #add $0, sub $0, or $0, xor $0 and imul $1 leave the operand alone,
+    #conditions always come from a cmp right before them so the flags
+    #don't matter
+    [i] = window
+    if type(i) == assemblyGenerator.BinaryInstruction and type(i.src) == assemblyGenerator.ImmediateOperand:
+        match i.operator.operator:
+            case assemblyGenerator.BinopType.Add | assemblyGenerator.BinopType.Sub | assemblyGenerator.BinopType.Or | assemblyGenerator.BinopType.Xor:
+                if i.src.imm == 0:
+                    return []
+            case assemblyGenerator.BinopType.Mult:
+                if i.src.imm == 1:
+                    return []
+    return None
+
+def jumpToNext(window):
+    [jump, label] = window
+    if type(jump) in [assemblyGenerator.JumpInst, assemblyGenerator.JumpCCInst] and type(label) == assemblyGenerator.LabelInst and jump.identifier == label.identifier:
+        return [label]
+    return None
+
+def afterJump(window):
+    #nothing gets to an instruction right after a jmp or ret but a label
+    [jump, i] = window
+    if type(jump) in [assemblyGenerator.JumpInst, assemblyGenerator.ReturnInstruction] and type(i) != assemblyGenerator.LabelInst:
+        return [jump]
+    return None
+
+RULES = [
+    PeepholeRule("movToSelf", 1, movToSelf),
+    PeepholeRule("identityArithmetic", 1, identityArithmetic),
+    PeepholeRule("storeReload", 2, storeReload),
+    PeepholeRule("loadStoreBack", 2, loadStoreBack),
+    PeepholeRule("jumpToNext", 2, jumpToNext),
+    PeepholeRule("afterJump", 2, afterJump)
+    ]
+
+def optimizeInstructions(insList, hits):
+    newList = []
+
+    for i in insList:
+        newList.append(i)
+
+        rewritten = True
+        while rewritten:
+            rewritten = False
+            for rule in RULES:
+                if len(newList) < rule.size:
+                    continue
+
+                new = rule.rewrite(newList[-rule.size:])
+                if new != None:
+                    del newList[-rule.size:]
+                    newList.extend(new)
+                    hits[rule.name] += 1
+                    rewritten = True
+                    break
+
+    return newList
+
+def PeepholeOptimization(ass):
+    hits = {rule.name : 0 for rule in RULES}
+
+    for topLevel in ass.topLevelList:
+        match topLevel:
+            case assemblyGenerator.Function():
+                topLevel.insList = optimizeInstructions(topLevel.insList, hits)
+
+    for name, count in hits.items():
+        log.info("{0}: {1}", name, count)
+
+    return sum(hits.values()) > 0
@@ -0,0 +1,464 @@
+import sys
+import assemblyGenerator
+import diagnostics
+
+from assemblyGenerator import RegisterType, SSERegisterType
+
+log = diagnostics.getLogger("RegisterAllocation")
+
+#Graph colouring register allocator. Runs between ASM_parseAST and
+#ReplacePseudoRegisters: every pseudo that gets a colour is rewritten to a
+#hard register, the spilled ones are left as pseudos and get their stack
+#slot from ReplacePseudoRegisters as before.
+#
+#R10, R11, XMM14 and XMM15 are never handed out, FixingUpInstructions
+#needs them as scratch registers.
+#
+#Before colouring the two sides of a move are merged when that can't make
+#the graph harder to colour, the move then becomes a move to itself and
+#goes away. That is what keeps a chain of double temporaries in one XMM
+#register instead of copying it around.
+
+#caller saved first so they are preferred
+generalRegisters = [RegisterType.AX, RegisterType.CX, RegisterType.DX, RegisterType.DI, RegisterType.SI, RegisterType.R8, RegisterType.R9, RegisterType.BX, RegisterType.R12, RegisterType.R13, RegisterType.R14, RegisterType.R15]
+
+sseRegisters = [SSERegisterType.XMM0, SSERegisterType.XMM1, SSERegisterType.XMM2, SSERegisterType.XMM3, SSERegisterType.XMM4, SSERegisterType.XMM5, SSERegisterType.XMM6, SSERegisterType.XMM7, SSERegisterType.XMM8, SSERegisterType.XMM9, SSERegisterType.XMM10, SSERegisterType.XMM11, SSERegisterType.XMM12, SSERegisterType.XMM13]
+
+calleeSavedRegisters = [RegisterType.BX, RegisterType.R12, RegisterType.R13, RegisterType.R14, RegisterType.R15]
+
+#everything a call may overwrite
+callerSavedRegisters = [RegisterType.AX, RegisterType.CX, RegisterType.DX, RegisterType.DI, RegisterType.SI, RegisterType.R8, RegisterType.R9] + sseRegisters
+
+class RegisterClass:
+    def __init__(self, name, registers):
+        self.name = name
+        self.registers = registers
+
+    def __str__(self):
+        return "{self.name}: {self.registers}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+GP = RegisterClass("GP", generalRegisters)
+SSE = RegisterClass("SSE", sseRegisters)
+
+#OPERANDS
+
+def operandLocation(operand):
+    #the register or pseudo that holds the value of operand
+    match operand:
+        case assemblyGenerator.PseudoRegisterOperand(pseudo = pseudo):
+            return [pseudo]
+        case assemblyGenerator.RegisterOperand(register = register):
+            return [register.register]
+    return []
+
+def addressRegisters(operand):
+    #registers read to compute the address of a memory operand
+    match operand:
+        case assemblyGenerator.MemoryOperand(reg = reg):
+            return [reg.register]
+        case assemblyGenerator.Indexed(base = base, index = index):
+            return [base.register, index.register]
+    return []
+
+def readOperand(operand):
+    return operandLocation(operand) + addressRegisters(operand)
+
+def useDef(i, symbolTable, returnRegs):
+    #what instruction i reads and writes, hard registers included
+    uses = []
+    defs = []
+
+    match i:
+        case assemblyGenerator.MovInstruction(sourceO = src, destO = dst) | assemblyGenerator.MovSXInstruction(sourceO = src, destO = dst) | assemblyGenerator.MovZeroExtendIns(sourceO = src, destO = dst) | assemblyGenerator.Cvtsi2sd(sourceO = src, destO = dst) | assemblyGenerator.Cvttsd2si(sourceO = src, destO = dst):
+            uses = readOperand(src) + addressRegisters(dst)
+            defs = operandLocation(dst)
+
+        case assemblyGenerator.LeaInstruction(sourceO = src, destO = dst):
+            uses = addressRegisters(src) + addressRegisters(dst)
+            defs = operandLocation(dst)
+
+        case assemblyGenerator.UnaryInstruction(dest = dst):
+            uses = readOperand(dst)
+            defs = operandLocation(dst)
+
+        case assemblyGenerator.BinaryInstruction(operator = op, src = src, dest = dst):
+            #xor of a register or pseudo with itself only zeroes it
+            location = operandLocation(dst)
+            if op.operator == assemblyGenerator.BinopType.Xor and location and operandLocation(src) == location:
+                defs = location
+            else:
+                uses = readOperand(src) + readOperand(dst)
+                defs = operandLocation(dst)
+
+        case assemblyGenerator.CompInst(operand0 = op0, operand1 = op1):
+            uses = readOperand(op0) + readOperand(op1)
+
+        case assemblyGenerator.SetCCInst(operand = op):
+            #only the low byte is written
+            uses = readOperand(op)
+            defs = operandLocation(op)
+
+        case assemblyGenerator.PushInstruction(operand = op):
+            uses = readOperand(op)
+
+        case assemblyGenerator.IDivInstruction(divisor = divisor) | assemblyGenerator.DivInstruction(divisor = divisor):
+            uses = readOperand(divisor) + [RegisterType.AX, RegisterType.DX]
+            defs = [RegisterType.AX, RegisterType.DX]
+
+        case assemblyGenerator.IMulInstruction(factor = factor) | assemblyGenerator.MulInstruction(factor = factor):
+            uses = readOperand(factor) + [RegisterType.AX]
+            defs = [RegisterType.AX, RegisterType.DX]
+
+        case assemblyGenerator.CDQInstruction():
+            uses = [RegisterType.AX]
+            defs = [RegisterType.DX]
+
+        case assemblyGenerator.CallInstruction(identifier = identifier):
+            uses = list(symbolTable[identifier].paramRegs)
+            defs = callerSavedRegisters
+
+        case assemblyGenerator.ReturnInstruction():
+            uses = returnRegs
+
+        case assemblyGenerator.JumpInst() | assemblyGenerator.JumpCCInst() | assemblyGenerator.LabelInst():
+            pass
+
+        case _:
+            print("Error: Instruction not supported by the register allocator. {0}".format(i))
+            sys.exit(1)
+
+    return uses, defs
+
+def replaceOperands(i, replace):
+    match i:
+        case assemblyGenerator.MovInstruction() | assemblyGenerator.MovSXInstruction() | assemblyGenerator.MovZeroExtendIns() | assemblyGenerator.LeaInstruction() | assemblyGenerator.Cvtsi2sd() | assemblyGenerator.Cvttsd2si():
+            i.sourceO = replace(i.sourceO)
+            i.destO = replace(i.destO)
+
+        case assemblyGenerator.UnaryInstruction():
+            i.dest = replace(i.dest)
+
+        case assemblyGenerator.BinaryInstruction():
+            i.src = replace(i.src)
+            i.dest = replace(i.dest)
+
+        case assemblyGenerator.CompInst():
+            i.operand0 = replace(i.operand0)
+            i.operand1 = replace(i.operand1)
+
+        case assemblyGenerator.SetCCInst() | assemblyGenerator.PushInstruction():
+            i.operand = replace(i.operand)
+
+        case assemblyGenerator.IDivInstruction() | assemblyGenerator.DivInstruction():
+            i.divisor = replace(i.divisor)
+
+        case assemblyGenerator.IMulInstruction() | assemblyGenerator.MulInstruction():
+            i.factor = replace(i.factor)
+
+#LIVENESS
+
+def buildBlocks(insList):
+    #basic blocks as [start, end) ranges of insList and their successors
+    starts = [0]
+    for index, i in enumerate(insList):
+        match i:
+            case assemblyGenerator.LabelInst():
+                starts.append(index)
+            case assemblyGenerator.JumpInst() | assemblyGenerator.JumpCCInst() | assemblyGenerator.ReturnInstruction():
+                starts.append(index + 1)
+
+    starts = sorted(set(s for s in starts if s < len(insList)))
+    blocks = [(start, end) for start, end in zip(starts, starts[1:] + [len(insList)])]
+
+    labelBlock = {}
+    for b, (start, end) in enumerate(blocks):
+        if type(insList[start]) == assemblyGenerator.LabelInst:
+            labelBlock[insList[start].identifier] = b
+
+    successors = []
+    for b, (start, end) in enumerate(blocks):
+        last = insList[end - 1]
+        match last:
+            case assemblyGenerator.JumpInst(identifier = identifier):
+                successors.append([labelBlock[identifier]])
+            case assemblyGenerator.JumpCCInst(identifier = identifier):
+                successors.append([labelBlock[identifier]] + ([b + 1] if b + 1 < len(blocks) else []))
+            case assemblyGenerator.ReturnInstruction():
+                successors.append([])
+            case _:
+                successors.append([b + 1] if b + 1 < len(blocks) else [])
+
+    return blocks, successors
+
+def liveOutOfBlocks(blocks, successors, useDefs):
+    liveIn = [set() for _ in blocks]
+    liveOut = [set() for _ in blocks]
+
+    changed = True
+    while changed:
+        changed = False
+        for b in reversed(range(len(blocks))):
+            out = set()
+            for s in successors[b]:
+                out |= liveIn[s]
+            liveOut[b] = out
+
+            live = set(out)
+            start, end = blocks[b]
+            for index in reversed(range(start, end)):
+                uses, defs = useDefs[index]
+                live.difference_update(defs)
+                live.update(uses)
+
+            if live != liveIn[b]:
+                liveIn[b] = live
+                changed = True
+
+    return liveOut
+
+#INTERFERENCE
+
+def buildInterference(insList, useDefs, nodeClass):
+    #dicts used as ordered sets keep the allocation deterministic
+    graph = {node : {} for node in nodeClass}
+
+    blocks, successors = buildBlocks(insList)
+    liveOut = liveOutOfBlocks(blocks, successors, useDefs)
+
+    for b, (start, end) in enumerate(blocks):
+        live = set(liveOut[b])
+
+        for index in reversed(range(start, end)):
+            i = insList[index]
+            uses, defs = useDefs[index]
+
+            #a move doesn't make its source and destination interfere
+            moveSource = None
+            if type(i) == assemblyGenerator.MovInstruction:
+                location = operandLocation(i.sourceO)
+                if location:
+                    moveSource = location[0]
+
+            for d in defs:
+                for l in live:
+                    if l != d and l != moveSource and nodeClass[l] == nodeClass[d]:
+                        graph[d][l] = True
+                        graph[l][d] = True
+
+            live.difference_update(defs)
+            live.update(uses)
+
+    return graph
+
+#COALESCING
+
+def coalesce(insList, graph, nodeClass, pseudos, spillCost, symbolTable):
+    #conservative coalescing, Briggs for two pseudos and George for a
+    #pseudo and a hard register. Returns the pseudo -> node it was merged into
+    alias = {}
+
+    def find(node):
+        while node in alias:
+            node = alias[node]
+        return node
+
+    def significant(node, k):
+        #hard registers have as many neighbours as it takes
+        return type(node) != str or len(graph[node]) >= k
+
+    def sameSize(node, assType):
+        return type(node) != str or type(symbolTable[node].assType) == type(assType)
+
+    def merge(keep, node):
+        for neighbour in graph.pop(node):
+            del graph[neighbour][node]
+            graph[neighbour][keep] = True
+            graph[keep][neighbour] = True
+
+        alias[node] = keep
+        pseudos[nodeClass[node]].remove(node)
+        if type(keep) == str:
+            spillCost[keep] += spillCost[node]
+
+    changed = True
+    while changed:
+        changed = False
+
+        for i in insList:
+            if type(i) != assemblyGenerator.MovInstruction:
+                continue
+
+            src = operandLocation(i.sourceO)
+            dst = operandLocation(i.destO)
+            if not src or not dst or src[0] not in nodeClass or dst[0] not in nodeClass:
+                continue
+
+            a = find(src[0])
+            b = find(dst[0])
+            if type(a) != str:
+                a, b = b, a
+
+            #a movl between a long and an int is a truncation
+            if a == b or type(a) != str or nodeClass[a] != nodeClass[b] or b in graph[a] or not sameSize(a, i.assType) or not sameSize(b, i.assType):
+                continue
+
+            k = len(nodeClass[a].registers)
+
+            if type(b) != str:
+                #every neighbour of a already interferes with b or is easy
+                if all(type(t) != str or t in graph[b] or len(graph[t]) < k for t in graph[a]):
+                    merge(b, a)
+                    changed = True
+
+            elif len([t for t in set(graph[a]) | set(graph[b]) if significant(t, k)]) < k:
+                merge(a, b)
+                changed = True
+
+    return {node : find(node) for node in alias}
+
+#COLOURING
+
+def colourClass(graph, pseudos, registerClass, spillCost):
+    k = len(registerClass.registers)
+    colour = {reg : reg for reg in registerClass.registers}
+
+    remaining = {p : True for p in pseudos}
+    degree = {p : len(graph[p]) for p in pseudos}
+    lowDegree = [p for p in pseudos if degree[p] < k]
+    stack = []
+
+    #simplify, when every node has k or more neighbours push the cheapest
+    #one anyway and hope it still gets a colour (optimistic colouring)
+    while remaining:
+        node = None
+        while lowDegree:
+            candidate = lowDegree.pop()
+            if candidate in remaining:
+                node = candidate
+                break
+
+        if node == None:
+            node = min(remaining, key=lambda p: spillCost[p] / max(degree[p], 1))
+
+        del remaining[node]
+        stack.append(node)
+
+        for neighbour in graph[node]:
+            if neighbour in remaining:
+                degree[neighbour] -= 1
+                if degree[neighbour] == k - 1:
+                    lowDegree.append(neighbour)
+
+    spilled = []
+    while stack:
+        node = stack.pop()
+        taken = set(colour[n] for n in graph[node] if n in colour)
+
+        for reg in registerClass.registers:
+            if reg not in taken:
+                colour[node] = reg
+                break
+        else:
+            spilled.append(node)
+
+    return colour, spilled
+
+def allocateFunction(function, symbolTable):
+    insList = function.insList
+
+    #pseudos whose address is taken or that are also written through
+    #PseudoMem (initializers) have to stay in memory
+    aliased = set()
+
+    def findAliased(operand):
+        match operand:
+            case assemblyGenerator.PseudoMem(identifier = identifier):
+                aliased.add(identifier)
+        return operand
+
+    for i in insList:
+        if type(i) == assemblyGenerator.LeaInstruction and type(i.sourceO) == assemblyGenerator.PseudoRegisterOperand:
+            aliased.add(i.sourceO.pseudo)
+        replaceOperands(i, findAliased)
+
+    returnRegs = symbolTable[function.identifier].returnRegs
+
+    nodeClass = {}
+    for reg in generalRegisters:
+        nodeClass[reg] = GP
+    for reg in sseRegisters:
+        nodeClass[reg] = SSE
+
+    pseudos = {GP : [], SSE : []}
+    spillCost = {}
+    useDefs = []
+
+    for i in insList:
+        uses, defs = useDef(i, symbolTable, returnRegs)
+
+        for name in uses + defs:
+            if type(name) != str:
+                continue
+
+            if name not in nodeClass:
+                entry = symbolTable[name]
+                if entry.isStatic or name in aliased:
+                    continue
+
+                registerClass = SSE if type(entry.assType) == assemblyGenerator.Double else GP
+                nodeClass[name] = registerClass
+                pseudos[registerClass].append(name)
+
+            #how often the pseudo would touch memory if it is spilled
+            spillCost[name] = spillCost.get(name, 0) + 1
+
+
+        #liveness only tracks what can be allocated
+        useDefs.append(([u for u in uses if u in nodeClass], [d for d in defs if d in nodeClass]))
+
+    graph = buildInterference(insList, useDefs, nodeClass)
+    merged = coalesce(insList, graph, nodeClass, pseudos, spillCost, symbolTable)
+
+    colour = {}
+    spilled = []
+    for registerClass in [GP, SSE]:
+        classColour, classSpilled = colourClass(graph, pseudos[registerClass], registerClass, spillCost)
+        colour.update(classColour)
+        spilled += classSpilled
+
+    for node, keep in merged.items():
+        if keep in colour:
+            colour[node] = colour[keep]
+        else:
+            spilled.append(node)
+
+    def replace(operand):
+        if type(operand) == assemblyGenerator.PseudoRegisterOperand and operand.pseudo in colour:
+            return assemblyGenerator.RegisterOperand(assemblyGenerator.Register(colour[operand.pseudo]))
+        return operand
+
+    newList = []
+    for i in insList:
+        replaceOperands(i, replace)
+
+        #a move of a register into itself is what coalesced temps leave behind
+        if type(i) == assemblyGenerator.MovInstruction and type(i.sourceO) == assemblyGenerator.RegisterOperand and type(i.destO) == assemblyGenerator.RegisterOperand and i.sourceO.register.register == i.destO.register.register:
+            continue
+
+        newList.append(i)
+
+    function.insList = newList
+
+    used = set(colour[p] for p in colour if type(p) == str and nodeClass[p] == GP)
+    function.calleeSavedRegs = [reg for reg in calleeSavedRegisters if reg in used]
+
+    log.debug("function {0}: {1} pseudos, {2} coalesced, {3} spilled {4}, callee saved {5}", function.identifier, len(pseudos[GP]) + len(pseudos[SSE]) + len(merged), len(merged), len(spilled), spilled, [reg.name for reg in function.calleeSavedRegs])
+
+def RegisterAllocation(ass, symbolTable):
+    for topLevel in ass.topLevelList:
+        match topLevel:
+            case assemblyGenerator.Function():
+                allocateFunction(topLevel, symbolTable)
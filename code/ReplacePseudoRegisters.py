@@ -1,6 +1,10 @@
 import sys
 import typeChecker
 import assemblyGenerator
+import RegisterAllocation
+import diagnostics
+
+log = diagnostics.getLogger("ReplacePseudoRegisters")
 
 
 def ReplaceOperand(operand, table, offset, symbolTable):
@@ -127,7 +131,84 @@ def ReplaceOperand(operand, table, offset, symbolTable):
 
     return offset, None
 
-def ReplaceTopLevel(topLevel, symbolTable):
+def slotSize(assType):
+    match assType:
+        case assemblyGenerator.Longword():
+            return 4, 4
+        case assemblyGenerator.Quadword() | assemblyGenerator.Double():
+            return 8, 8
+        case assemblyGenerator.ByteArray(size = size, alignment = alignment):
+            return size, alignment
+
+    print("Error. {0}".format(assType))
+    sys.exit(1)
+
+def newSlot(offset, size, alignment):
+    offset -= size
+    return offset - offset % alignment
+
+def shareSlots(function, symbolTable):
+    #pseudos whose lifetimes don't overlap get the same stack slot. The ones
+    #whose address is taken can be reached through a pointer at any time so
+    #they keep a slot of their own
+    insList = function.insList
+
+    stackPseudos = {}
+    aliased = {}
+
+    def findPseudos(operand):
+        match operand:
+            case assemblyGenerator.PseudoRegisterOperand(pseudo = id) | assemblyGenerator.PseudoMem(identifier = id):
+                if not symbolTable[id].isStatic:
+                    stackPseudos[id] = True
+                    if type(operand) == assemblyGenerator.PseudoMem:
+                        aliased[id] = True
+        return operand
+
+    for i in insList:
+        #statics live in .data, &static is never a stack slot
+        if type(i) == assemblyGenerator.LeaInstruction and type(i.sourceO) == assemblyGenerator.PseudoRegisterOperand and not symbolTable[i.sourceO.pseudo].isStatic:
+            aliased[i.sourceO.pseudo] = True
+        RegisterAllocation.replaceOperands(i, findPseudos)
+
+    shared = {id : "stack" for id in stackPseudos if id not in aliased}
+
+    returnRegs = symbolTable[function.identifier].returnRegs
+    useDefs = []
+    for i in insList:
+        uses, defs = RegisterAllocation.useDef(i, symbolTable, returnRegs)
+        useDefs.append(([u for u in uses if u in shared], [d for d in defs if d in shared]))
+
+    graph = RegisterAllocation.buildInterference(insList, useDefs, shared)
+
+    offset = 0
+    table = {}
+
+    for id in aliased:
+        size, alignment = slotSize(symbolTable[id].assType)
+        offset = newSlot(offset, size, alignment)
+        table[id] = offset
+
+    #first slot that is big enough, aligned and not used by a neighbour
+    slots = []
+    for id in shared:
+        size, alignment = slotSize(symbolTable[id].assType)
+        taken = set(table[n] for n in graph[id] if n in table)
+
+        for slotOffset, slotSize_ in slots:
+            if slotSize_ >= size and slotOffset % alignment == 0 and slotOffset not in taken:
+                table[id] = slotOffset
+                break
+        else:
+            offset = newSlot(offset, size, alignment)
+            slots.append((offset, size))
+            table[id] = offset
+
+    log.debug("function {0}: {1} pseudos in {2} slots, {3} bytes", function.identifier, len(stackPseudos), len(aliased) + len(slots), -offset)
+
+    return table, offset
+
+def ReplaceTopLevel(topLevel, symbolTable, shareStackSlots):
     
     match topLevel:
         case assemblyGenerator.StaticVariable():
@@ -135,6 +216,10 @@ def ReplaceTopLevel(topLevel, symbolTable):
         case assemblyGenerator.Function(identifier = identifier, global_ = global_, insList = insList, stackOffset = stackOffset):
             offset = 0
             table = {}
+
+            if shareStackSlots:
+                table, offset = shareSlots(topLevel, symbolTable)
+
             #esto es por funcion 
             for i in insList:
                 #print(type(i))
@@ -217,6 +302,11 @@ def ReplaceTopLevel(topLevel, symbolTable):
                         if object:
                             i.divisor = object
 
+                    case assemblyGenerator.IMulInstruction(factor = factor) | assemblyGenerator.MulInstruction(factor = factor):
+                        offset, object = ReplaceOperand(factor, table, offset, symbolTable)
+                        if object:
+                            i.factor = object
+
 
                     case assemblyGenerator.Cvtsi2sd(assType = assType, sourceO = sourceO, destO = destO):
                         offset, object = ReplaceOperand(sourceO, table, offset, symbolTable)
@@ -270,6 +360,6 @@ def ReplaceTopLevel(topLevel, symbolTable):
 
             topLevel.stackOffset = offset
                     
-def ReplacePseudoRegisters(ass, symbolTable):
+def ReplacePseudoRegisters(ass, symbolTable, shareStackSlots = True):
     for topLevel in ass.topLevelList:
-        ReplaceTopLevel(topLevel, symbolTable)
+        ReplaceTopLevel(topLevel, symbolTable, shareStackSlots)
@@ -1,14 +1,21 @@
 from enum import Enum
 import tacGenerator
 import sys
+import struct
 import parser
 import typeChecker
 
 from tacGenerator import makeTemp
+import diagnostics
+
+log = diagnostics.getLogger("assemblyGenerator")
 #from tacGenerator import makeStaticConstant
 
 class Program:
     
+    __slots__ = ('topLevelList',)
+    __match_args__ = ('topLevelList',)
+
     def __init__(self, topLevelList):
         self.topLevelList = topLevelList
 
@@ -24,18 +31,21 @@ class AssemblyType(Enum):
 """
 
 class AssemblyType:
-    pass
+    __slots__ = ()
 
 class Longword(AssemblyType):
-    pass
+    __slots__ = ()
 
 class Quadword(AssemblyType):
-    pass
+    __slots__ = ()
 
 class Double(AssemblyType):
-    pass
+    __slots__ = ()
 
 class ByteArray(AssemblyType):
+    __slots__ = ('size', 'alignment')
+    __match_args__ = ('size', 'alignment')
+
     def __init__(self, size, alignment):
         self.size = size
         self.alignment = alignment
@@ -57,9 +67,12 @@ class AssemblySize:
     
 
 class TopLevel:
-    pass
+    __slots__ = ()
 
 class StaticConstant(TopLevel):
+    __slots__ = ('identifier', 'alignment', 'staticInit')
+    __match_args__ = ('identifier', 'alignment', 'staticInit')
+
     def __init__(self, identifier, alignment, staticInit):
         self.identifier = identifier
         self.alignment = alignment
@@ -73,6 +86,9 @@ class StaticConstant(TopLevel):
 
 class StaticVariable(TopLevel):
 
+    __slots__ = ('identifier', 'global_', 'alignment', 'initList')
+    __match_args__ = ('identifier', 'global_', 'alignment', 'initList')
+
     def __init__(self, identifier, global_, alignment, initList):
         self.identifier = identifier
         self.global_ = global_
@@ -87,11 +103,16 @@ class StaticVariable(TopLevel):
     
 class Function(TopLevel):
 
-    def __init__(self, identifier, global_, insList, stackOffset = None):
+    __slots__ = ('identifier', 'global_', 'insList', 'stackOffset', 'calleeSavedRegs')
+    __match_args__ = ('identifier', 'global_', 'insList', 'stackOffset', 'calleeSavedRegs')
+
+    def __init__(self, identifier, global_, insList, stackOffset = None, calleeSavedRegs = None):
         self.identifier = identifier
         self.global_ = global_
         self.insList = insList
         self.stackOffset = stackOffset 
+        #callee saved registers the register allocator used, FixingUpInstructions saves them
+        self.calleeSavedRegs = calleeSavedRegs if calleeSavedRegs else []
 
     def __str__(self):
         
@@ -102,6 +123,8 @@ class Function(TopLevel):
 
 class ReturnInstruction:
 
+    __slots__ = ()
+
     def __init__(self):
         pass
     
@@ -115,6 +138,9 @@ class ReturnInstruction:
 
 class Cvttsd2si:
 
+    __slots__ = ('assType', 'sourceO', 'destO')
+    __match_args__ = ('assType', 'sourceO', 'destO')
+
     def __init__(self, assType, sourceO, destO):
         self.assType = assType
         self.sourceO = sourceO
@@ -130,6 +156,9 @@ class Cvttsd2si:
 
 class Cvtsi2sd:
 
+    __slots__ = ('assType', 'sourceO', 'destO')
+    __match_args__ = ('assType', 'sourceO', 'destO')
+
     def __init__(self, assType, sourceO, destO):
         self.assType = assType
         self.sourceO = sourceO
@@ -145,6 +174,9 @@ class Cvtsi2sd:
 
 class MovInstruction:
 
+    __slots__ = ('assType', 'sourceO', 'destO')
+    __match_args__ = ('assType', 'sourceO', 'destO')
+
     def __init__(self, assType, sourceO, destO):
         self.assType = assType
         self.sourceO = sourceO
@@ -159,6 +191,9 @@ class MovInstruction:
 
 class MovSXInstruction:
 
+    __slots__ = ('sourceO', 'destO')
+    __match_args__ = ('sourceO', 'destO')
+
     def __init__(self, sourceO, destO):
         self.sourceO = sourceO
         self.destO = destO
@@ -171,6 +206,9 @@ class MovSXInstruction:
     
 class MovZeroExtendIns:
 
+    __slots__ = ('sourceO', 'destO')
+    __match_args__ = ('sourceO', 'destO')
+
     def __init__(self, sourceO, destO):
         self.sourceO = sourceO
         self.destO = destO
@@ -183,6 +221,9 @@ class MovZeroExtendIns:
     
 class LeaInstruction:
 
+    __slots__ = ('sourceO', 'destO')
+    __match_args__ = ('sourceO', 'destO')
+
     def __init__(self, sourceO, destO):
         self.sourceO = sourceO
         self.destO = destO
@@ -194,6 +235,9 @@ class LeaInstruction:
         return self.__str__()    
     
 class UnaryInstruction:
+    __slots__ = ('operator', 'assType', 'dest')
+    __match_args__ = ('operator', 'assType', 'dest')
+
     def __init__(self, operator, assType, dest):
         self.operator = operator
         self.assType = assType
@@ -206,6 +250,9 @@ class UnaryInstruction:
         return self.__str__()
 
 class CompInst:
+    __slots__ = ('assType', 'operand0', 'operand1')
+    __match_args__ = ('assType', 'operand0', 'operand1')
+
     def __init__(self, assType, operand0, operand1):
         self.assType = assType
         self.operand0 = operand0
@@ -218,6 +265,9 @@ class CompInst:
         return self.__str__()
     
 class JumpInst:
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier
     
@@ -244,6 +294,9 @@ class ConcCodeTypeUnsigned(Enum):
     BE = 6
 
 class JumpCCInst:
+    __slots__ = ('conc_code', 'identifier')
+    __match_args__ = ('conc_code', 'identifier')
+
     def __init__(self, conc_code, identifier):
         self.conc_code = conc_code
         self.identifier = identifier
@@ -255,6 +308,9 @@ class JumpCCInst:
         return self.__str__()
 
 class SetCCInst:
+    __slots__ = ('conc_code', 'operand')
+    __match_args__ = ('conc_code', 'operand')
+
     def __init__(self, conc_code, operand):
         self.conc_code = conc_code
         self.operand = operand
@@ -266,6 +322,9 @@ class SetCCInst:
         return self.__str__()
 
 class LabelInst:
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier
     
@@ -276,6 +335,9 @@ class LabelInst:
         return self.__str__()
 
 class BinaryInstruction:
+    __slots__ = ('operator', 'assType', 'src', 'dest')
+    __match_args__ = ('operator', 'assType', 'src', 'dest')
+
     def __init__(self, operator, assType, src, dest):
         self.operator = operator
         self.assType = assType
@@ -292,6 +354,9 @@ class BinaryInstruction:
 #(operator, src2, dst)
 
 class IDivInstruction:
+    __slots__ = ('assType', 'divisor')
+    __match_args__ = ('assType', 'divisor')
+
     def __init__(self, assType, divisor):
         self.assType = assType
         self.divisor = divisor
@@ -303,6 +368,9 @@ class IDivInstruction:
         return self.__str__()
 
 class DivInstruction:
+    __slots__ = ('assType', 'divisor')
+    __match_args__ = ('assType', 'divisor')
+
     def __init__(self, assType, divisor):
         self.assType = assType
         self.divisor = divisor
@@ -312,9 +380,42 @@ class DivInstruction:
     
     def __repr__(self):
         return self.__str__()
+
+class IMulInstruction:
+    #one operand imul, RDX:RAX = RAX * factor
+    __slots__ = ('assType', 'factor')
+    __match_args__ = ('assType', 'factor')
+
+    def __init__(self, assType, factor):
+        self.assType = assType
+        self.factor = factor
+    
+    def __str__(self):
+        return "AssType: {self.assType} Imul({self.factor})".format(self=self)
+    
+    def __repr__(self):
+        return self.__str__()
+
+class MulInstruction:
+    #one operand mul, unsigned RDX:RAX = RAX * factor
+    __slots__ = ('assType', 'factor')
+    __match_args__ = ('assType', 'factor')
+
+    def __init__(self, assType, factor):
+        self.assType = assType
+        self.factor = factor
+    
+    def __str__(self):
+        return "AssType: {self.assType} Mul({self.factor})".format(self=self)
+    
+    def __repr__(self):
+        return self.__str__()
         
 
 class CDQInstruction:
+    __slots__ = ('assType',)
+    __match_args__ = ('assType',)
+
     def __init__(self, assType):
         self.assType = assType
 
@@ -351,6 +452,9 @@ class DeallocateStackInstruction():
 """
     
 class PushInstruction():
+    __slots__ = ('operand',)
+    __match_args__ = ('operand',)
+
     def __init__(self, operand):
         self.operand = operand
     
@@ -360,7 +464,23 @@ class PushInstruction():
     def __repr__(self):
         return self.__str__()
     
+class PopInstruction():
+    __slots__ = ('register',)
+    __match_args__ = ('register',)
+
+    def __init__(self, register):
+        self.register = register
+    
+    def __str__(self):
+        return "Pop({self.register})".format(self=self)
+    
+    def __repr__(self):
+        return self.__str__()
+
 class CallInstruction():
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier    
     
@@ -372,10 +492,13 @@ class CallInstruction():
 
 
 class Operand:
-    pass
+    __slots__ = ()
 
 class PseudoMem(Operand):
     
+    __slots__ = ('identifier', 'offset')
+    __match_args__ = ('identifier', 'offset')
+
     def __init__(self, identifier, offset):
         self.identifier = identifier
         self.offset = offset
@@ -388,6 +511,9 @@ class PseudoMem(Operand):
     
     
 class Indexed(Operand):
+    __slots__ = ('base', 'index', 'scale')
+    __match_args__ = ('base', 'index', 'scale')
+
     def __init__(self, base, index, scale):
         self.base = base
         self.index = index
@@ -401,6 +527,9 @@ class Indexed(Operand):
 
 class PseudoRegisterOperand:
 
+    __slots__ = ('pseudo',)
+    __match_args__ = ('pseudo',)
+
     def __init__(self, pseudo):
         self.pseudo = pseudo
     
@@ -411,6 +540,9 @@ class PseudoRegisterOperand:
         return self.__str__()
 
 class MemoryOperand:
+    __slots__ = ('reg', 'int')
+    __match_args__ = ('reg', 'int')
+
     def __init__(self, reg, int):
         self.reg = reg
         self.int = int
@@ -419,6 +551,9 @@ class MemoryOperand:
         return "Memory({self.reg}, {self.int})".format(self=self)
 
 class DataOperand:
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier
 
@@ -427,6 +562,9 @@ class DataOperand:
 
 class RegisterOperand:
 
+    __slots__ = ('register',)
+    __match_args__ = ('register',)
+
     def __init__(self, register):
         self.register = register
     
@@ -439,6 +577,9 @@ class RegisterOperand:
     """
 
 class ImmediateOperand:
+    __slots__ = ('imm',)
+    __match_args__ = ('imm',)
+
     def __init__(self, intVal):
         self.imm = intVal
 
@@ -463,9 +604,16 @@ class BinopType(Enum):
     And = 5
     Or = 6
     Xor = 7
+    #shifts by an immediate count
+    Sal = 8
+    Sar = 9
+    Shr = 10
 
 
 class UnaryOperator:
+    __slots__ = ('operator',)
+    __match_args__ = ('operator',)
+
     def __init__(self, operator):
         self.operator = operator
     
@@ -481,6 +629,9 @@ class UnaryOperator:
                 return "_"
 
 class BinaryOperator:
+    __slots__ = ('operator',)
+    __match_args__ = ('operator',)
+
     def __init__(self, operator):
         self.operator = operator
 
@@ -500,6 +651,12 @@ class BinaryOperator:
                 return "Xor"
             case BinopType.DivDouble:
                 return "DivDouble"
+            case BinopType.Sal:
+                return "Sal"
+            case BinopType.Sar:
+                return "Sar"
+            case BinopType.Shr:
+                return "Shr"
             
             case _:
                 return "_"
@@ -519,6 +676,13 @@ class RegisterType(Enum):
     SP = 9
     BP = 10
 
+    #callee saved, only handed out by the register allocator
+    BX = 11
+    R12 = 12
+    R13 = 13
+    R14 = 14
+    R15 = 15
+
 class SSERegisterType(Enum):
     XMM0 = 0
     XMM1 = 1
@@ -531,7 +695,18 @@ class SSERegisterType(Enum):
     XMM14 = 8
     XMM15 = 9
 
+    #only handed out by the register allocator
+    XMM8 = 10
+    XMM9 = 11
+    XMM10 = 12
+    XMM11 = 13
+    XMM12 = 14
+    XMM13 = 15
+
 class Register:
+    __slots__ = ('register',)
+    __match_args__ = ('register',)
+
     def __init__(self, register):
         self.register = register
 
@@ -557,6 +732,16 @@ class Register:
                 return "R11d"
             case RegisterType.SP:
                 return "SP"
+            case RegisterType.BX:
+                return "BX"
+            case RegisterType.R12:
+                return "R12"
+            case RegisterType.R13:
+                return "R13"
+            case RegisterType.R14:
+                return "R14"
+            case RegisterType.R15:
+                return "R15"
             
             case SSERegisterType.XMM0:
                 return "XMM0"
@@ -574,6 +759,18 @@ class Register:
                 return "XMM6"
             case SSERegisterType.XMM7:
                 return "XMM7"
+            case SSERegisterType.XMM8:
+                return "XMM8"
+            case SSERegisterType.XMM9:
+                return "XMM9"
+            case SSERegisterType.XMM10:
+                return "XMM10"
+            case SSERegisterType.XMM11:
+                return "XMM11"
+            case SSERegisterType.XMM12:
+                return "XMM12"
+            case SSERegisterType.XMM13:
+                return "XMM13"
             case SSERegisterType.XMM14:
                 return "XMM14"
             case SSERegisterType.XMM15:
@@ -585,6 +782,28 @@ class Register:
             case _:
                 return "_"
 
+#the double constants of the program, (bits, alignment) -> name. The same
+#value used anywhere in the program shares one StaticConstant
+constantPool = {}
+
+def makeDoubleConstant(double, alignment, topLevelList):
+    #bits and not the float, -0.0 == 0.0
+    key = (struct.pack("<d", double), alignment)
+
+    if key not in constantPool:
+        name = makeTemp()
+        constantPool[key] = name
+        topLevelList.append(StaticConstant(name, alignment, typeChecker.DoubleInit(double)))
+
+    return constantPool[key]
+
+def isPositiveZero(v):
+    #0.0 is all zero bits, -0.0 is not
+    match v:
+        case tacGenerator.TAC_ConstantValue(const = parser.ConstDouble(double = double)):
+            return struct.pack("<d", double) == bytes(8)
+    return False
+
 def parseValue(v, symbolTable, topLevelList):
     asmType = None
     cType = None
@@ -615,8 +834,7 @@ def parseValue(v, symbolTable, topLevelList):
                     return asmType, cType, ImmediateOperand(const.int)
 
                 case parser.ConstDouble():
-                    name = makeTemp()
-                    topLevelList.append(StaticConstant(name, 8, typeChecker.DoubleInit(const.double)))
+                    name = makeDoubleConstant(const.double, 8, topLevelList)
                     
                     asmType = Double()
                     cType = parser.DoubleType()
@@ -665,7 +883,6 @@ def parseValue(v, symbolTable, topLevelList):
                     cType = symbolTable[i].type
                     
                     sizeArray = cType.getBaseTypeSize(0)
-                    print(sizeArray)
 
                     while type(cType) == parser.ArrayType:
                         cType = cType.elementType
@@ -732,7 +949,6 @@ def parseValue(v, symbolTable, topLevelList):
                     cType = symbolTable[v].type
                     
                     sizeArray = cType.getBaseTypeSize(0)
-                    print(sizeArray)
 
                     while type(cType) == parser.ArrayType:
                         cType = cType.elementType
@@ -781,9 +997,195 @@ def Expect(*args):
         other = i
 
 def isIntegerType(type_):
-    if type(type_) == parser.UIntType or type(type_) == parser.ULongType or type(type_) == parser.IntType or type(type_) == parser.LongType:
-        return True 
-    return False
+    #chars don't get here as values
+    return type_.isInteger and not type_.isCharacter
+
+#STRENGTH REDUCTION
+
+#Multiplication and division by an integer constant. Powers of two become
+#shifts, 3, 5 and 9 a lea and the other divisors a multiplication by a
+#magic number from Granlund and Montgomery, "Division by invariant
+#integers using multiplication". AX and DX are scratch like in idiv.
+
+def log2Ceil(d):
+    return (d - 1).bit_length()
+
+def isPowerOfTwo(d):
+    return d > 0 and d & (d - 1) == 0
+
+def quadwordImmediate(value):
+    #unsigned 64 bit values as the signed number with the same bits
+    return value - pow(2, 64) if value >= pow(2, 63) else value
+
+def signedMagic(d, bits):
+    #figure 5.2, x / d is (x * m) >> (bits + shift) plus one when x < 0
+    l = max(log2Ceil(d), 1)
+    return 1 + pow(2, bits + l - 1) // d, l - 1
+
+def unsignedMagic(d, bits):
+    #figure 4.2, with t = (x * m) >> bits x / d is (t + ((x - t) >> 1)) >> (l - 1)
+    l = log2Ceil(d)
+    return pow(2, bits) * (pow(2, l) - d) // d + 1, l
+
+def shift(operator, assType, count, dst):
+    return BinaryInstruction(BinaryOperator(operator), assType, ImmediateOperand(count), dst)
+
+def reduceMultiply(assType, cType, src1, src2, dst, ASM_Instructions):
+    #False when the generic imul has to do it
+    if type(src1) == ImmediateOperand:
+        src1, src2 = src2, src1
+
+    if not isIntegerType(cType) or type(src1) == ImmediateOperand or type(src2) != ImmediateOperand:
+        return False
+
+    c = src2.imm
+    ax = RegisterOperand(Register(RegisterType.AX))
+
+    if c == 0:
+        ASM_Instructions.append(MovInstruction(assType, ImmediateOperand(0), dst))
+
+    elif isPowerOfTwo(abs(c)):
+        ASM_Instructions.append(MovInstruction(assType, src1, dst))
+        if abs(c) > 1:
+            ASM_Instructions.append(shift(BinopType.Sal, assType, log2Ceil(abs(c)), dst))
+        if c < 0:
+            ASM_Instructions.append(UnaryInstruction(UnaryOperator(UnopType.Neg), assType, dst))
+
+    elif c in [3, 5, 9]:
+        #lea (%rax, %rax, c - 1), the low half is right for longwords too
+        ASM_Instructions.append(MovInstruction(assType, src1, ax))
+        ASM_Instructions.append(LeaInstruction(Indexed(Register(RegisterType.AX), Register(RegisterType.AX), c - 1), ax))
+        ASM_Instructions.append(MovInstruction(assType, ax, dst))
+
+    else:
+        return False
+
+    return True
+
+def reduceDivision(operator, assType, cType, src1, src2, dst, ASM_Instructions):
+    #False when the generic idiv or div has to do it
+    if not isIntegerType(cType) or type(src1) == ImmediateOperand or type(src2) != ImmediateOperand or src2.imm == 0:
+        return False
+
+    d = src2.imm
+    bits = 32 if type(assType) == Longword else 64
+    isSigned = type(cType) == parser.IntType or type(cType) == parser.LongType
+    remainder = operator == tacGenerator.BinopType.REMAINDER
+
+    ax = RegisterOperand(Register(RegisterType.AX))
+    dx = RegisterOperand(Register(RegisterType.DX))
+
+    if d == 1 or (isSigned and d == -1):
+        if remainder:
+            ASM_Instructions.append(MovInstruction(assType, ImmediateOperand(0), dst))
+        else:
+            ASM_Instructions.append(MovInstruction(assType, src1, dst))
+            if d == -1:
+                ASM_Instructions.append(UnaryInstruction(UnaryOperator(UnopType.Neg), assType, dst))
+        return True
+
+    if not isSigned and isPowerOfTwo(d):
+        k = log2Ceil(d)
+        ASM_Instructions.append(MovInstruction(assType, src1, dst))
+
+        if not remainder:
+            ASM_Instructions.append(shift(BinopType.Shr, assType, k, dst))
+        elif k < 32:
+            ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.And), assType, ImmediateOperand(d - 1), dst))
+        else:
+            #the mask doesn't fit in an immediate
+            ASM_Instructions.append(shift(BinopType.Sal, assType, bits - k, dst))
+            ASM_Instructions.append(shift(BinopType.Shr, assType, bits - k, dst))
+        return True
+
+    if isSigned and isPowerOfTwo(abs(d)):
+        #negative x needs 2^k - 1 added first to round toward zero
+        k = log2Ceil(abs(d))
+        ASM_Instructions.append(MovInstruction(assType, src1, ax))
+        ASM_Instructions.append(MovInstruction(assType, src1, dx))
+        if k > 1:
+            ASM_Instructions.append(shift(BinopType.Sar, assType, bits - 1, dx))
+        ASM_Instructions.append(shift(BinopType.Shr, assType, bits - k, dx))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Add), assType, dx, ax))
+        ASM_Instructions.append(shift(BinopType.Sar, assType, k, ax))
+
+        if remainder:
+            ASM_Instructions.append(shift(BinopType.Sal, assType, k, ax))
+            ASM_Instructions.append(MovInstruction(assType, src1, dx))
+            ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Sub), assType, ax, dx))
+            ASM_Instructions.append(MovInstruction(assType, dx, dst))
+        else:
+            if d < 0:
+                ASM_Instructions.append(UnaryInstruction(UnaryOperator(UnopType.Neg), assType, ax))
+            ASM_Instructions.append(MovInstruction(assType, ax, dst))
+        return True
+
+    if isSigned and bits == 32:
+        #the 64 bit product of a longword and m < 2^32 can't overflow
+        m, post = signedMagic(abs(d), 32)
+        ASM_Instructions.append(MovSXInstruction(src1, ax))
+        ASM_Instructions.append(MovInstruction(Quadword(), ImmediateOperand(m), dx))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Mult), Quadword(), dx, ax))
+        ASM_Instructions.append(shift(BinopType.Sar, Quadword(), 32 + post, ax))
+        ASM_Instructions.append(MovInstruction(assType, src1, dx))
+        ASM_Instructions.append(shift(BinopType.Sar, assType, 31, dx))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Sub), assType, dx, ax))
+        quotient, other = ax, dx
+
+    elif isSigned:
+        #m is above 2^63, imul sees m - 2^64 so x is added back
+        m, post = signedMagic(abs(d), 64)
+        ASM_Instructions.append(MovInstruction(Quadword(), ImmediateOperand(quadwordImmediate(m)), ax))
+        ASM_Instructions.append(IMulInstruction(Quadword(), src1))
+        if m >= pow(2, 63):
+            ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Add), Quadword(), src1, dx))
+        if post > 0:
+            ASM_Instructions.append(shift(BinopType.Sar, Quadword(), post, dx))
+        ASM_Instructions.append(MovInstruction(Quadword(), src1, ax))
+        ASM_Instructions.append(shift(BinopType.Sar, Quadword(), 63, ax))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Sub), Quadword(), ax, dx))
+        quotient, other = dx, ax
+
+    elif bits == 32:
+        m, l = unsignedMagic(d, 32)
+        ASM_Instructions.append(MovZeroExtendIns(src1, ax))
+        ASM_Instructions.append(MovInstruction(Quadword(), ImmediateOperand(m), dx))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Mult), Quadword(), dx, ax))
+        ASM_Instructions.append(shift(BinopType.Shr, Quadword(), 32, ax))
+        ASM_Instructions.append(MovInstruction(assType, src1, dx))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Sub), assType, ax, dx))
+        ASM_Instructions.append(shift(BinopType.Shr, assType, 1, dx))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Add), assType, ax, dx))
+        if l > 1:
+            ASM_Instructions.append(shift(BinopType.Shr, assType, l - 1, dx))
+        quotient, other = dx, ax
+
+    else:
+        m, l = unsignedMagic(d, 64)
+        ASM_Instructions.append(MovInstruction(Quadword(), ImmediateOperand(quadwordImmediate(m)), ax))
+        ASM_Instructions.append(MulInstruction(Quadword(), src1))
+        ASM_Instructions.append(MovInstruction(Quadword(), src1, ax))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Sub), Quadword(), dx, ax))
+        ASM_Instructions.append(shift(BinopType.Shr, Quadword(), 1, ax))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Add), Quadword(), dx, ax))
+        if l > 1:
+            ASM_Instructions.append(shift(BinopType.Shr, Quadword(), l - 1, ax))
+        quotient, other = ax, dx
+
+    if isSigned and d < 0:
+        ASM_Instructions.append(UnaryInstruction(UnaryOperator(UnopType.Neg), assType, quotient))
+
+    if remainder:
+        #x - (x / d) * d
+        multiplier = quadwordImmediate(d) if bits == 64 else d
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Mult), assType, ImmediateOperand(multiplier), quotient))
+        ASM_Instructions.append(MovInstruction(assType, src1, other))
+        ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Sub), assType, quotient, other))
+        ASM_Instructions.append(MovInstruction(assType, other, dst))
+    else:
+        ASM_Instructions.append(MovInstruction(assType, quotient, dst))
+
+    return True
 
 def parseUnaryInstructionGeneral(src_, dst_, o, symbolTable, ASM_Instructions, topLevelList):
     type1, alignment1, src = parseValue(src_, symbolTable, topLevelList)
@@ -819,7 +1221,7 @@ def classifyParameters(values, symbolTable, topLevelList):
                 
     return intRegArgs, doubleRegArgs, stackArgs  
 
-def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLevelList):
+def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLevelList, strengthReduction = True):
 
     for i in TAC_Instructions:
         match i:
@@ -865,7 +1267,12 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                 type1, cType1, src = parseValue(src, symbolTable, topLevelList)
                 #type2, cType2, dst_ = parseValue(dst, symbolTable, topLevelList)
 
-                ASM_Instructions.append(MovInstruction(type1, src, PseudoMem(dst, offset)))
+                #initializing a scalar is a plain copy, it can live in a register
+                if type(symbolTable[dst].type) != parser.ArrayType and offset == 0:
+                    type2, cType2, dst_ = parseValue(dst, symbolTable, topLevelList)
+                    ASM_Instructions.append(MovInstruction(type1, src, dst_))
+                else:
+                    ASM_Instructions.append(MovInstruction(type1, src, PseudoMem(dst, offset)))
 
             case tacGenerator.TAC_returnInstruction(Value=v):
                 type1, cType1, src = parseValue(v, symbolTable, topLevelList)
@@ -934,8 +1341,8 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                                     parseUnaryInstructionGeneral(src_, dst_, o, symbolTable, ASM_Instructions, topLevelList)
                                     
                                 else:
-                                    name = makeTemp()
-                                    topLevelList.append(StaticConstant(name, 16, typeChecker.DoubleInit(-0.0)))
+                                    #xorpd wants its memory operand 16 byte aligned
+                                    name = makeDoubleConstant(-0.0, 16, topLevelList)
                                     
                                     instruction0 = MovInstruction(Double(), src, dst)
                                     
@@ -957,9 +1364,7 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
 
                 intArgs, doubleArgs, stackArgs = classifyParameters(arguments, symbolTable, topLevelList)
 
-                print("IntArgs:", intArgs)
-                print("DoubleArgs:", doubleArgs)
-                print("StackArgs:", stackArgs)
+                log.debug("call {0} int args: {1} double args: {2} stack args: {3}", funName, intArgs, doubleArgs, stackArgs)
 
                 stackPadding = 0
                 if len(stackArgs) % 2:
@@ -1033,8 +1438,6 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                     type2, cType2, src2 = parseValue(src2_, symbolTable, topLevelList)
                     type3, cType3, dst = parseValue(dst_, symbolTable, topLevelList)
 
-                    print(type(cType1))
-
                     instruction0 = CompInst(type1, src2, src1)
                     instruction1 = MovInstruction(type3, ImmediateOperand(0), dst)
 
@@ -1061,8 +1464,11 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                             type2, alignment2, src2 = parseValue(src2_, symbolTable, topLevelList)
                             type3, alignment3, dst = parseValue(dst_, symbolTable, topLevelList)
                             
+                            if strengthReduction and reduceDivision(op.operator, type1, cType1, src1, src2, dst, ASM_Instructions):
+                                pass
+
                             #SIGNED
-                            if type(cType1) == parser.IntType or type(cType1) == parser.LongType:
+                            elif type(cType1) == parser.IntType or type(cType1) == parser.LongType:
                                 instruction0 = MovInstruction(type1, src1, RegisterOperand(Register(RegisterType.AX)))
                                 instruction1 = CDQInstruction(type1)
                                 instruction2 = IDivInstruction(type1, src2)
@@ -1100,7 +1506,10 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                             type2, alignment2, src2 = parseValue(src2_, symbolTable, topLevelList)
                             type3, alignment3, dst = parseValue(dst_, symbolTable, topLevelList)
 
-                            if type(cType1) == parser.IntType or type(cType1) == parser.LongType:
+                            if strengthReduction and reduceDivision(op.operator, type1, cType1, src1, src2, dst, ASM_Instructions):
+                                pass
+
+                            elif type(cType1) == parser.IntType or type(cType1) == parser.LongType:
                                 instruction0 = MovInstruction(type1, src1, RegisterOperand(Register(RegisterType.AX)))
                                 instruction1 = CDQInstruction(type1)
                                 instruction2 = IDivInstruction(type1, src2)
@@ -1132,13 +1541,17 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                             
                             Expect(type1, type2, type3)
 
-                            operator = parseOperator(op)
+                            if strengthReduction and op.operator == tacGenerator.BinopType.MULTIPLY and reduceMultiply(type1, alignment1, src1, src2, dst, ASM_Instructions):
+                                pass
+
+                            else:
+                                operator = parseOperator(op)
                                     
-                            instruction0 = MovInstruction(type1, src1, dst)
-                            instruction1 = BinaryInstruction(operator, type1, src2, dst)
+                                instruction0 = MovInstruction(type1, src1, dst)
+                                instruction1 = BinaryInstruction(operator, type1, src2, dst)
                             
-                            ASM_Instructions.append(instruction0)
-                            ASM_Instructions.append(instruction1)
+                                ASM_Instructions.append(instruction0)
+                                ASM_Instructions.append(instruction1)
             
             case tacGenerator.TAC_JumpInst(label=label):
                 ASM_Instructions.append(JumpInst(label))
@@ -1263,8 +1676,7 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                     
                 elif type(cType2) == parser.ULongType:
                     
-                    upperBound = makeTemp()
-                    topLevelList.append(StaticConstant(upperBound, 8, typeChecker.DoubleInit(9223372036854775808.0)))
+                    upperBound = makeDoubleConstant(9223372036854775808.0, 8, topLevelList)
 
                     ASM_Instructions.append(CompInst(Double(), DataOperand(upperBound), src))
                     
@@ -1311,6 +1723,12 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
 
             
 
+            case tacGenerator.TAC_CopyInstruction(src=src_, dst=dst_) if isPositiveZero(src_):
+                #xorpd of the register with itself instead of a load
+                type2, alignment2, dst = parseValue(dst_, symbolTable, topLevelList)
+
+                ASM_Instructions.append(BinaryInstruction(BinaryOperator(BinopType.Xor), Double(), dst, dst))
+
             case tacGenerator.TAC_CopyInstruction(src=src_, dst=dst_):
                 type1, alignment1, src = parseValue(src_, symbolTable, topLevelList)
                 type2, alignment2, dst = parseValue(dst_, symbolTable, topLevelList)
@@ -1378,7 +1796,7 @@ def ASM_parseInstructions(TAC_Instructions, ASM_Instructions, symbolTable, topLe
                 sys.exit(1)
 
 
-def ASM_parseTopLevel(topLevel, symbolTable, topLevelList):
+def ASM_parseTopLevel(topLevel, symbolTable, topLevelList, strengthReduction = True):
     match topLevel:
         case tacGenerator.StaticVariable(identifier = identifier, global_ = global_, type = type, initList = initList):
             #print(identifier)
@@ -1391,13 +1809,13 @@ def ASM_parseTopLevel(topLevel, symbolTable, topLevelList):
 
             ASM_Instructions = []
             
+            log.debug("function {0} int params: {1} double params: {2} stack params: {3}", identifier, intParams, doubleParams, stackParams)
+
             for i, (paramType, param) in enumerate(intParams):
-                print(paramType, param)
                 i0 = MovInstruction(paramType, RegisterOperand(Register(list(RegisterType)[i])), param)
                 ASM_Instructions.append(i0)
             
             for i, param in enumerate(doubleParams):
-                print(param)
                 i0 = MovInstruction(Double(), RegisterOperand(Register(list(SSERegisterType)[i])), param)
                 ASM_Instructions.append(i0)
             
@@ -1405,12 +1823,11 @@ def ASM_parseTopLevel(topLevel, symbolTable, topLevelList):
             offset = 16 
 
             for i, (paramType, param) in enumerate(stackParams):
-                print(paramType, param)
                 i0 = MovInstruction(paramType, MemoryOperand(Register(RegisterType.BP), offset), param)
                 ASM_Instructions.append(i0)
                 offset += 8
                 
-            ASM_parseInstructions(instructions, ASM_Instructions, symbolTable, topLevelList)
+            ASM_parseInstructions(instructions, ASM_Instructions, symbolTable, topLevelList, strengthReduction)
             return Function(identifier, global_, ASM_Instructions)
 
         case _:
@@ -1418,9 +1835,12 @@ def ASM_parseTopLevel(topLevel, symbolTable, topLevelList):
             sys.exit(1)
 
 class asm_symtab_entry:
-    pass
+    __slots__ = ()
 
 class ObjEntry(asm_symtab_entry):
+    __slots__ = ('assType', 'isStatic', 'isConstant')
+    __match_args__ = ('assType', 'isStatic', 'isConstant')
+
     def __init__(self, assType, isStatic, isConstant):
         self.assType = assType
         self.isStatic = isStatic
@@ -1433,15 +1853,41 @@ class ObjEntry(asm_symtab_entry):
         return self.__str__()
 
 class FunEntry(asm_symtab_entry):
-    def __init__(self, defined):
+    __slots__ = ('defined', 'paramRegs', 'returnRegs')
+    __match_args__ = ('defined', 'paramRegs', 'returnRegs')
+
+    def __init__(self, defined, paramRegs, returnRegs):
         self.defined = defined
+        #registers a call passes arguments in and returns the result in
+        self.paramRegs = paramRegs
+        self.returnRegs = returnRegs
 
     def __str__(self):
-        return "Defined: {self.defined}".format(self=self)
+        return "Defined: {self.defined} ParamRegs: {self.paramRegs} ReturnRegs: {self.returnRegs}".format(self=self)
     
     def __repr__(self):
         return self.__str__()
 
+def classifyFunctionRegisters(funType):
+    paramRegs = []
+    intCount = 0
+    doubleCount = 0
+
+    for paramType in funType.paramTypes:
+        if type(paramType) == parser.DoubleType:
+            if doubleCount < 8:
+                paramRegs.append(list(SSERegisterType)[doubleCount])
+            doubleCount += 1
+        else:
+            if intCount < 6:
+                paramRegs.append(list(RegisterType)[intCount])
+            intCount += 1
+
+    if type(funType.retType) == parser.DoubleType:
+        return paramRegs, [SSERegisterType.XMM0]
+
+    return paramRegs, [RegisterType.AX]
+
 def matchCType(cType):
     match cType:
         case parser.IntType():
@@ -1470,7 +1916,6 @@ def matchCType(cType):
 
         case parser.ArrayType(elementType = elementType, size = size):
             sizeArray = cType.getBaseTypeSize(0)
-            print(sizeArray)
 
             while type(cType) == parser.ArrayType:
                 cType = cType.elementType
@@ -1486,10 +1931,12 @@ def matchCType(cType):
             print("Error: Invalid C Type to Assembly Conversion. {0}".format(type))
             sys.exit(1)
 
-def ASM_parseAST(ast, symbolTable):
+def ASM_parseAST(ast, symbolTable, strengthReduction = True):
+    constantPool.clear()
+
     funcDefList = []
     for topLevel in ast.topLevelList:
-        function = ASM_parseTopLevel(topLevel, symbolTable, funcDefList)
+        function = ASM_parseTopLevel(topLevel, symbolTable, funcDefList, strengthReduction)
         funcDefList.append(function)
 
     backendSymbolTable = {}
@@ -1497,7 +1944,6 @@ def ASM_parseAST(ast, symbolTable):
     for i in funcDefList:
         match i:
             case StaticConstant(identifier = identifier, alignment = alignment, staticInit = staticInit):
-                print("StaticInit:", type(staticInit))
                 match staticInit:
                     case typeChecker.DoubleInit():
                         backendSymbolTable[identifier] = ObjEntry(Double(), isStatic=True, isConstant=True)
@@ -1510,7 +1956,8 @@ def ASM_parseAST(ast, symbolTable):
     for name, entry in symbolTable.items():
         match entry.attrs:
             case typeChecker.FunAttributes(defined = defined, global_ = global_):
-                backendSymbolTable[name] = FunEntry(defined=defined)
+                paramRegs, returnRegs = classifyFunctionRegisters(entry.type)
+                backendSymbolTable[name] = FunEntry(defined, paramRegs, returnRegs)
              
             case typeChecker.LocalAttributes():
                 alignment, type_ = matchCType(entry.type)
@@ -0,0 +1,399 @@
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from enum import Enum
+
+import lexer
+import parser
+import semanticAnalysis
+import typeChecker
+import loopLabeling
+import tacGenerator
+import assemblyGenerator
+import RegisterAllocation
+import ReplacePseudoRegisters
+import FixingUpInstructions
+import PeepholeOptimization
+import codeEmission
+import passStats
+import passManager
+
+#Compiler benchmark: generates C programs of growing size, runs them through
+#every pass of the compiler and reports time, peak memory and the size of
+#what each pass produced. For the passes that build a new AST, TAC or
+#assembly program the memory they keep over the nodes they built is what a
+#node costs.
+#
+#   python3 code/benchmark.py --save baseline.json
+#   python3 code/benchmark.py --compare baseline.json
+
+countedModules = {"parser", "tacGenerator", "assemblyGenerator", "typeChecker"}
+
+def countNodes(root):
+    #counts every compiler object reachable from root, shared objects once
+    seen = set()
+    stack = [root]
+    count = 0
+
+    while stack != []:
+        obj = stack.pop()
+
+        if type(obj) == list or type(obj) == tuple:
+            stack.extend(obj)
+            continue
+
+        if type(obj) == dict:
+            stack.extend(obj.values())
+            continue
+
+        if type(obj).__module__ not in countedModules or isinstance(obj, Enum):
+            continue
+
+        if id(obj) in seen:
+            continue
+
+        seen.add(id(obj))
+        count += 1
+
+        if hasattr(obj, '__dict__'):
+            stack.extend(vars(obj).values())
+
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+
+    return count
+
+def countTAC(tac):
+    count = 0
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef(instructions = instructions):
+                count += len(instructions)
+            case _:
+                count += 1
+    return count
+
+def countASM(ass):
+    count = 0
+    for topLevel in ass.topLevelList:
+        match topLevel:
+            case assemblyGenerator.Function(insList = insList):
+                count += len(insList)
+            case _:
+                count += 1
+    return count
+
+#CORPORA
+#every generator takes a scale factor and returns C source text
+
+def manyFunctions(scale):
+    n = 40 * scale
+    lines = []
+    for k in range(n):
+        lines.append("int f{0}(int a, int b) {{".format(k))
+        lines.append("    int c = a * {0} + b;".format(k))
+        lines.append("    long d = (long) c * 3l;")
+        lines.append("    if (c > {0}) return c - a;".format(k))
+        lines.append("    for (int i = 0; i < 4; i = i + 1) c = c + b + i;")
+        lines.append("    return (int) (d % 7l) + c;")
+        lines.append("}")
+
+    lines.append("int main(void) {")
+    lines.append("    int s = 0;")
+    for k in range(0, n, max(1, n // 20)):
+        lines.append("    s = s + f{0}({0}, 2);".format(k))
+    lines.append("    return s % 256;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def deepExpressions(scale):
+    depth = 20 * scale
+    statements = 10 * scale
+    ops = ["+", "-", "*", "+", "/"]
+    lines = ["int main(void) {", "    int a = 3;", "    int b = 5;", "    long c = 7l;", "    double d = 1.5;", "    int s = 0;"]
+
+    for k in range(statements):
+        exp = "a"
+        for i in range(depth):
+            op = ops[(i + k) % len(ops)]
+            if op == "/":
+                exp = "({0}) / (b + {1})".format(exp, i + 1)
+            elif i % 3 == 0:
+                exp = "{0} {1} (b * {2} - (int) c)".format(exp, op, i)
+            else:
+                exp = "{0} {1} {2}".format(exp, op, i + 1)
+        lines.append("    s = s + ({0});".format(exp))
+        lines.append("    d = d * 0.5 + (double) s;")
+
+    lines.append("    return s % 256 + (int) d % 2;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def staticArrays(scale):
+    n = 2000 * scale
+    ints = ", ".join(str((i * 7) % 1000) for i in range(n))
+    longs = ", ".join("{0}l".format((i * 13) % 100000) for i in range(n))
+    doubles = ", ".join("{0}.5".format(i % 100) for i in range(n // 4))
+    rows = ", ".join("{{{0}, {1}, {2}}}".format(i, i + 1, i + 2) for i in range(n // 8))
+
+    lines = []
+    lines.append("static int tableI[{0}] = {{{1}}};".format(n, ints))
+    lines.append("long tableL[{0}] = {{{1}}};".format(n, longs))
+    lines.append("double tableD[{0}] = {{{1}}};".format(n // 4, doubles))
+    lines.append("int grid[{0}][3] = {{{1}}};".format(n // 8, rows))
+    lines.append("int zeros[{0}];".format(n))
+    lines.append("int main(void) {")
+    lines.append("    return tableI[3] + (int) tableL[5] + (int) tableD[7] + grid[2][1] + zeros[9];")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def longStrings(scale):
+    length = 500 * scale
+    lines = []
+    for k in range(8):
+        text = "".join(chr(ord('a') + (i + k) % 26) for i in range(length))
+        lines.append('char *s{0} = "{1}\\n";'.format(k, text))
+
+    lines.append("char *pick(int i) {")
+    lines.append('    if (i) return "{0}";'.format("x" * length))
+    lines.append('    return "{0}" "{1}";'.format("y" * length, "z" * length))
+    lines.append("}")
+    lines.append("int main(void) {")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+corpora = {
+    "manyFunctions" : manyFunctions,
+    "deepExpressions" : deepExpressions,
+    "staticArrays" : staticArrays,
+    "longStrings" : longStrings
+    }
+
+#PIPELINE
+
+def runPipeline(source, iFile, traceMemory, level):
+    manager = passManager.PassManager(level)
+    stats = passStats.PassStats(True, traceMemory)
+    records = stats.records
+    runPass = stats.run
+    stoppedAt = None
+    #nodes built by the passes that make a new program
+    nodes = {}
+
+    #error messages of a pass that gives up don't belong in the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            tokenList = runPass("lex", lexer.Lex, source, iFile)
+            records[-1].count = len(tokenList)
+
+            pro = runPass("parse", lambda: parser.parseProgram(parser.TokenStream(tokenList)))
+            records[-1].count = countNodes(pro)
+            nodes["parse"] = records[-1].count
+
+            res = runPass("IdentifierResolution", semanticAnalysis.IdentifierResolution, pro)
+            records[-1].count = countNodes(res)
+            nodes["IdentifierResolution"] = records[-1].count
+
+            typeChekedProgram, symbolTable = runPass("typeCheckProgram", typeChecker.typeCheckProgram, res)
+            records[-1].count = countNodes(typeChekedProgram)
+            nodes["typeCheckProgram"] = records[-1].count
+
+            loo = runPass("labelProgram", loopLabeling.labelProgram, typeChekedProgram)
+            records[-1].count = countNodes(loo)
+
+            tac = runPass("TAC_parseProgram", tacGenerator.TAC_parseProgram, loo, symbolTable)
+            records[-1].count = countTAC(tac)
+            nodes["TAC_parseProgram"] = countNodes(tac)
+
+            def countAfterPass():
+                records[-1].count = countTAC(tac)
+
+            manager.runTAC(tac, symbolTable, stats, countAfterPass)
+
+            ass, backSymbolTable = runPass("ASM_parseAST", assemblyGenerator.ASM_parseAST, tac, symbolTable, manager.isEnabled("strengthReduction"))
+            records[-1].count = countASM(ass)
+            nodes["ASM_parseAST"] = countNodes((ass, backSymbolTable))
+
+            if manager.isEnabled("registerAllocation"):
+                runPass("RegisterAllocation", RegisterAllocation.RegisterAllocation, ass, backSymbolTable)
+                records[-1].count = countASM(ass)
+
+            runPass("ReplacePseudoRegisters", ReplacePseudoRegisters.ReplacePseudoRegisters, ass, backSymbolTable, manager.isEnabled("stackSlotSharing"))
+            records[-1].count = countASM(ass)
+
+            runPass("FixingUpInstructions", FixingUpInstructions.FixingUpInstructions, ass)
+            records[-1].count = countASM(ass)
+
+            if manager.isEnabled("peephole"):
+                runPass("PeepholeOptimization", PeepholeOptimization.PeepholeOptimization, ass)
+                records[-1].count = countASM(ass)
+
+            #streamed to a file like cd.py does
+            sFile = os.path.splitext(iFile)[0] + ".s"
+            with open(sFile, "w") as aFile:
+                runPass("outputAsmFile", codeEmission.writeAsmFile, ass, backSymbolTable, aFile)
+
+            with open(sFile, "r") as aFile:
+                records[-1].count = aFile.read().count("\n")
+            os.remove(sFile)
+
+        except SystemExit:
+            #the pass that was running when the compiler gave up
+            stoppedAt = "in {0}".format(records[-1].name)
+
+        except RecursionError:
+            stoppedAt = "in {0} (RecursionError)".format(records[-1].name)
+
+    return records, stoppedAt, nodes
+
+def benchmarkCorpus(name, scale, repeat, level):
+    source = corpora[name](scale)
+
+    #the lexer only uses this name to remove the file on an invalid token
+    iFile = os.path.join(tempfile.gettempdir(), "ccomp-benchmark.i")
+
+    best = None
+    stoppedAt = None
+    for _ in range(repeat):
+        records, stoppedAt, _ = runPipeline(source, iFile, False, level)
+        if best == None:
+            best = records
+        else:
+            for b, r in zip(best, records):
+                b.time = min(b.time, r.time)
+
+    tracemalloc.start()
+    memRecords, _, nodes = runPipeline(source, iFile, True, level)
+    tracemalloc.stop()
+
+    for b, m in zip(best, memRecords):
+        b.peak = m.peak
+        b.retained = m.retained
+
+    passes = []
+    for r in best:
+        p = {"name" : r.name, "time" : r.time, "peak" : r.peak, "count" : r.count}
+        if r.name in nodes:
+            p.update({"retained" : r.retained, "nodes" : nodes[r.name]})
+        passes.append(p)
+
+    return {
+        "sourceBytes" : len(source),
+        "stoppedAt" : stoppedAt,
+        "passes" : passes
+        }
+
+#REPORTING
+
+def bytesPerNode(p):
+    #only the passes that build a program have it, and baselines saved
+    #before it was recorded don't
+    if "nodes" not in p or p["nodes"] == 0:
+        return None
+    return p["retained"] / p["nodes"]
+
+def printReport(results):
+    for name, scales in results.items():
+        for scale, result in scales.items():
+            print("\n{0} x{1} ({2} bytes of C)".format(name, scale, result["sourceBytes"]))
+            print("  {0:<24}{1:>12}{2:>14}{3:>12}{4:>10}".format("pass", "time (ms)", "peak (KiB)", "count", "B/node"))
+
+            total = 0.0
+            for p in result["passes"]:
+                total += p["time"]
+                perNode = bytesPerNode(p)
+                print("  {0:<24}{1:>12.2f}{2:>14.1f}{3:>12}{4:>10}".format(p["name"], p["time"] * 1000, p["peak"] / 1024, p["count"], "{0:.0f}".format(perNode) if perNode != None else ""))
+
+            print("  {0:<24}{1:>12.2f}".format("total", total * 1000))
+
+            if result["stoppedAt"]:
+                print("  compiler stopped {0}".format(result["stoppedAt"]))
+
+def compareResults(old, new, threshold):
+    regressions = []
+
+    print("\nComparison against baseline (threshold {0:.0%}):".format(threshold))
+    for name, scales in new.items():
+        for scale, result in scales.items():
+            if name not in old or scale not in old[name]:
+                continue
+
+            oldPasses = {p["name"] : p for p in old[name][scale]["passes"]}
+
+            for p in result["passes"]:
+                if p["name"] not in oldPasses:
+                    continue
+
+                o = oldPasses[p["name"]]
+
+                #tiny passes are all noise, they need an absolute change too
+                timeRatio = p["time"] / o["time"] if o["time"] > 0 else 1.0
+                peakRatio = p["peak"] / o["peak"] if o["peak"] > 0 else 1.0
+
+                perNode = bytesPerNode(p)
+                oldPerNode = bytesPerNode(o)
+                nodeText = ""
+                if perNode != None and oldPerNode != None:
+                    nodeText = "  node {0:.0f}B -> {1:.0f}B".format(oldPerNode, perNode)
+
+                flags = []
+                if timeRatio > 1 + threshold and p["time"] - o["time"] > 0.001:
+                    flags.append("time")
+                if peakRatio > 1 + threshold and p["peak"] - o["peak"] > 64 * 1024:
+                    flags.append("memory")
+
+                print("  {0:<16} x{1:<3} {2:<24} time {3:>7.2f}x  peak {4:>7.2f}x{5} {6}".format(name, scale, p["name"], timeRatio, peakRatio, nodeText, " ".join("REGRESSION:" + f for f in flags)))
+
+                if flags:
+                    regressions.append((name, scale, p["name"], flags))
+
+    return regressions
+
+def main():
+    argParser = argparse.ArgumentParser(description="Benchmark every pass of the compiler on generated C programs.")
+    argParser.add_argument("--corpus", nargs="*", choices=list(corpora), default=list(corpora))
+    argParser.add_argument("--scales", nargs="*", type=int, default=[1, 2, 4])
+    argParser.add_argument("--repeat", type=int, default=3)
+    argParser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    argParser.add_argument("--compare", metavar="FILE", help="compare against a saved JSON baseline")
+    argParser.add_argument("--opt-level", type=int, choices=list(passManager.LEVELS), default=passManager.DEFAULT_LEVEL, help="the -O level the passes run at")
+    argParser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a pass is flagged (0.2 = 20%%)")
+    args = argParser.parse_args()
+
+    if args.repeat < 1:
+        argParser.error("--repeat must be at least 1")
+
+    results = {}
+    for name in args.corpus:
+        results[name] = {}
+        for scale in args.scales:
+            results[name][str(scale)] = benchmarkCorpus(name, scale, args.repeat, args.opt_level)
+
+    printReport(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python" : platform.python_version(), "results" : results}, f, indent=1)
+        print("\nSaved baseline to {0}".format(args.save))
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            old = json.load(f)["results"]
+
+        regressions = compareResults(old, results, args.threshold)
+        if regressions:
+            print("\n{0} regressions.".format(len(regressions)))
+            sys.exit(1)
+
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 import os
 import sys
 import re
+import io
+import json
+import subprocess
+import traceback
+import contextlib
+import concurrent.futures
 #from lexer import *
 
 import lexer
@@ -11,27 +17,53 @@ import semanticAnalysis
 import tacGenerator
 import typeChecker
 import loopLabeling
+import RegisterAllocation
 import ReplacePseudoRegisters
 import FixingUpInstructions
+import PeepholeOptimization
 import ASTDebug
+import passStats
+import passManager
+import diagnostics
 
-printDebugInfo = True
+log = diagnostics.getLogger("driver")
 
-file = ''
 LastStage = "codeEmission"
 NoLink = False
 library = None
+TimePasses = False
+MemPasses = False
+PassesJson = False
+OptLevel = passManager.DEFAULT_LEVEL
+#(names, on) in the order they were given, applied after -O
+PassToggles = []
+#worker processes when more than one file is given
+Jobs = os.cpu_count()
 
 def matchCommands(argument):
 
 	global LastStage
 	global library
 	global NoLink
+	global TimePasses
+	global MemPasses
+	global PassesJson
+	global OptLevel
+	global Jobs
 
 	cCommand = argument
 	isLibary = r"-l"
 	lMatch = re.match(isLibary, cCommand)
-	if lMatch:
+	logMatch = re.match(r"--log=", cCommand)
+	toggleMatch = re.match(r"--(enable|disable)=", cCommand)
+	jobsMatch = re.match(r"-j([0-9]+)$", cCommand)
+	if logMatch:
+		diagnostics.configure(cCommand[logMatch.end():])
+	elif toggleMatch:
+		PassToggles.append((cCommand[toggleMatch.end():], toggleMatch.group(1) == "enable"))
+	elif jobsMatch:
+		Jobs = max(1, int(jobsMatch.group(1)))
+	elif lMatch:
 		cCommand = lMatch.string[lMatch.span()[1]:]
 		#print(cCommand)
 		library = cCommand
@@ -49,56 +81,62 @@ def matchCommands(argument):
 				LastStage = "assemblyGeneration"
 			case "-c":
 				NoLink = True
+			case "--time-passes":
+				TimePasses = True
+			case "--mem-passes":
+				MemPasses = True
+			case "--passes-json":
+				PassesJson = True
+			case "-O0" | "-O1" | "-O2":
+				OptLevel = int(argument[2])
 			case _:
 				print("Error Invalid command option.")
 				sys.exit(1)
 
 
-if __name__ == "__main__":	
-	print(sys.float_info)
-
-	match len(sys.argv):
-		case 1:
-			#NOTE: no arguments
-			pass
-		case 2:
-			file = sys.argv[1]	
-			
-		case 3:
-			file = sys.argv[2]			
-			matchCommands(sys.argv[1])
-
-		case 4:
-			file = sys.argv[3]
-			matchCommands(sys.argv[1])
-			matchCommands(sys.argv[2])
-
-		case 5:
-			file = sys.argv[4]
-			matchCommands(sys.argv[1])
-			matchCommands(sys.argv[2])
-			matchCommands(sys.argv[3])
-			
-			pass
-		case _:
-			print("Error Invalid command option.")
-			sys.exit(1)
-
-	#lexonly
-	
-	print("File:", file)
-	print("Last Stage:", LastStage)
-	print("NoLink:", NoLink)
-	print("Libary:", library)
+def runCommand(command):
+	#gcc's messages go through sys.stdout and sys.stderr, so a worker can
+	#collect them with the rest of its diagnostics
+	result = subprocess.run(command, shell=True, capture_output=True, text=True)
+	sys.stdout.write(result.stdout)
+	sys.stderr.write(result.stderr)
+	return result.returncode
+
+def outputName(file, extension):
+	return os.path.dirname(file) + "/" + os.path.basename(file).split('.')[0] + extension
+
+def makeManager():
+	manager = passManager.PassManager(OptLevel)
+	for names, on in PassToggles:
+		manager.toggle(names, on)
+	return manager
+
+def makeStats():
+	#--passes-json alone means time the passes
+	return passStats.PassStats(TimePasses or PassesJson, MemPasses)
+
+def exitCode(error):
+	#sys.exit() is success and sys.exit("message") prints the message and fails
+	if error.code == None:
+		return 0
+	if type(error.code) == int:
+		return error.code
+	print(error.code, file=sys.stderr)
+	return 1
+
+def compileFile(file, manager, stats, link=True):
+	#returns the exit code, without link the file is only assembled
+	log.info("File: {0} Last Stage: {1} NoLink: {2} Libary: {3}", file, LastStage, NoLink, library)
+	log.info("{0}", manager)
 
 	#NOTE: you have an archive
 	prepC = "gcc -E -P " + file + " -o "
 
-	iFile = os.path.dirname(file) + "/" +  os.path.basename(file).split('.')[0] + ".i"
+	iFile = outputName(file, ".i")
 
 	prepC = prepC + iFile
 
-	if os.system(prepC) == 0:
+	if stats.run("preprocess", runCommand, prepC) == 0:
 		#note here you already have a file in the same directory
 		#preprocessor file
 
@@ -106,113 +144,204 @@ if __name__ == "__main__":
 
 			buffer = preprocessedfile.read()
 	
-			tokenList = lexer.Lex(buffer, iFile)
+			tokenList = stats.run("lex", lexer.Lex, buffer, iFile)
 
-			if printDebugInfo:
-				print(tokenList)
+			diagnostics.getLogger("lexer").dump("Tokens", lambda: tokenList)
 
 			os.remove(iFile)
 
 			if LastStage == 'lex':
-				sys.exit(0)
+				return 0
 
-			pro = parser.parseProgram(tokenList)
+			tokenStream = parser.TokenStream(tokenList)
 
-			if tokenList != []:
+			pro = stats.run("parse", parser.parseProgram, tokenStream)
+
+			if not tokenStream.atEnd():
 				#raise Exception("Syntax Error Extra code inside program. {0}".format(tokenList))
-				print("Syntax Error Extra code inside program. {0}".format(tokenList))
-				sys.exit(1)
+				print("Syntax Error Extra code inside program. {0}".format(tokenStream))
+				return 1
 
-			if printDebugInfo:
-				print(pro.printNode(0))
+			diagnostics.getLogger("parser").dump("AST", lambda: pro.printNode(0))
 
 			if LastStage == 'parse':
-				sys.exit(0)
+				return 0
 
-			res = semanticAnalysis.IdentifierResolution(pro)
+			res = stats.run("IdentifierResolution", semanticAnalysis.IdentifierResolution, pro)
 
-			if printDebugInfo:
-				print(res.printNode(0))
+			diagnostics.getLogger("semanticAnalysis").dump("Resolved AST", lambda: res.printNode(0))
 			
 
-			typeChekedProgram, symbolTable = typeChecker.typeCheckProgram(res)
+			typeChekedProgram, symbolTable = stats.run("typeCheckProgram", typeChecker.typeCheckProgram, res)
 
-			if printDebugInfo:
-				print(typeChekedProgram.printNode(0))
-				print(symbolTable)
+			diagnostics.getLogger("typeChecker").dump("Typed AST", lambda: typeChekedProgram.printNode(0))
+			diagnostics.getLogger("typeChecker").dump("Symbol table", lambda: symbolTable)
 
-			loo = loopLabeling.labelProgram(typeChekedProgram)
+			loo = stats.run("labelProgram", loopLabeling.labelProgram, typeChekedProgram)
 
-			if printDebugInfo:
-				print(loo.printNode(0))
+			diagnostics.getLogger("loopLabeling").dump("Labeled AST", lambda: loo.printNode(0))
 
 			if LastStage == 'validate':
-				sys.exit(0)
+				return 0
+
+			tac = stats.run("TAC_parseProgram", tacGenerator.TAC_parseProgram, loo, symbolTable)
 
-			tac = tacGenerator.TAC_parseProgram(loo, symbolTable)
+			diagnostics.getLogger("tacGenerator").dump("TAC", lambda: tac)
+			diagnostics.getLogger("tacGenerator").dump("Symbol table", lambda: symbolTable)
 
-			if printDebugInfo:
-				print(tac)
-				print(symbolTable)
+			manager.runTAC(tac, symbolTable, stats)
 
 			if LastStage == 'tac':
-				sys.exit(0)
+				return 0
 
-			ass, backSymbolTable = assemblyGenerator.ASM_parseAST(tac, symbolTable)
+			ass, backSymbolTable = stats.run("ASM_parseAST", assemblyGenerator.ASM_parseAST, tac, symbolTable, manager.isEnabled("strengthReduction"))
 
-			if printDebugInfo:
-				print(ass)
-				print(backSymbolTable)
+			diagnostics.getLogger("assemblyGenerator").dump("Assembly", lambda: ass)
+			diagnostics.getLogger("assemblyGenerator").dump("Backend symbol table", lambda: backSymbolTable)
 			
-			ReplacePseudoRegisters.ReplacePseudoRegisters(ass, backSymbolTable)
+			if manager.isEnabled("registerAllocation"):
+				stats.run("RegisterAllocation", RegisterAllocation.RegisterAllocation, ass, backSymbolTable)
 
-			if printDebugInfo:
-				print(ass)
+				diagnostics.getLogger("RegisterAllocation").dump("Assembly", lambda: ass)
 
-			FixingUpInstructions.FixingUpInstructions(ass)
+			stats.run("ReplacePseudoRegisters", ReplacePseudoRegisters.ReplacePseudoRegisters, ass, backSymbolTable, manager.isEnabled("stackSlotSharing"))
 
-			if printDebugInfo:
-				print(ass)
-		
+			diagnostics.getLogger("ReplacePseudoRegisters").dump("Assembly", lambda: ass)
 
-			if LastStage == 'assemblyGeneration':
-				sys.exit(0)
+			stats.run("FixingUpInstructions", FixingUpInstructions.FixingUpInstructions, ass)
+
+			diagnostics.getLogger("FixingUpInstructions").dump("Assembly", lambda: ass)
 
+			if manager.isEnabled("peephole"):
+				stats.run("PeepholeOptimization", PeepholeOptimization.PeepholeOptimization, ass)
 
-			output = codeEmission.outputAsmFile(ass, backSymbolTable)
+				diagnostics.getLogger("PeepholeOptimization").dump("Assembly", lambda: ass)
 
-			if printDebugInfo:
-				print(output)
+			if LastStage == 'assemblyGeneration':
+				return 0
+
+
+			diagnostics.getLogger("codeEmission").dump("Assembly file", lambda: codeEmission.outputAsmFile(ass, backSymbolTable))
 
 			#ASSEMBLER
-			asmFile = os.path.dirname(file) + "/" + os.path.basename(file).split('.')[0] + '.s'
+			asmFile = outputName(file, '.s')
 			#print(asmFile)
+			#every function goes straight to the file, the text is never held whole
 			aFile = open(asmFile, 'w')
-			aFile.write(output)
+			stats.run("outputAsmFile", codeEmission.writeAsmFile, ass, backSymbolTable, aFile)
 			aFile.close()
 
 			
-			if NoLink:
-				assC = "gcc -ggdb -c " + asmFile + " -o " + os.path.dirname(file) + "/" + os.path.basename(file).split('.')[0] + '.o'
+			if NoLink or not link:
+				assC = "gcc -ggdb -c " + asmFile + " -o " + outputName(file, '.o')
 
-				print(assC)
+				log.info(assC)
 
-				os.system(assC)
-
-				pass
+				return stats.run("assemble", runCommand, assC)
 			else:	
-				assC = "gcc -ggdb " + asmFile + " -o " + os.path.dirname(file) + "/" + os.path.basename(file).split('.')[0]
+				assC = "gcc -ggdb " + asmFile + " -o " + outputName(file, '')
 
 				if library:
 					assC += ' -lm'
 				
-				print(assC)
+				log.info(assC)
 
-				os.system(assC)
-			
-			
+				return stats.run("assembleAndLink", runCommand, assC)
+
+	#gcc already said why the preprocessor failed
+	return 1
+
+#BATCH COMPILATION
+
+def setOptions(arguments):
+	#a spawned worker starts from the defaults and a forked one from the
+	#driver's options, either way it ends up with the same ones
+	PassToggles.clear()
+	for argument in arguments:
+		matchCommands(argument)
+
+def compileInWorker(file):
+	#everything a file prints is kept and printed by the driver in input order
+	out = io.StringIO()
+	err = io.StringIO()
+	stats = makeStats()
+
+	with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+		try:
+			code = compileFile(file, makeManager(), stats, False)
+		except SystemExit as error:
+			code = exitCode(error)
+		except Exception:
+			#a crash in one file must not stop the others from being reported
+			print("{0}: internal compiler error\n{1}".format(file, traceback.format_exc()), file=sys.stderr, end="")
+			code = 1
+
+	return code, out.getvalue(), err.getvalue(), stats
+
+def compileFiles(files, arguments):
+	#every file is compiled and assembled to its own .o in a worker, then
+	#they are linked once, the first file that fails gives the exit code
+	code = 0
+	reports = {}
+
+	with concurrent.futures.ProcessPoolExecutor(min(Jobs, len(files)), initializer=setOptions, initargs=(arguments,)) as executor:
+		#map gives the results back in input order
+		for file, (fileCode, out, err, stats) in zip(files, executor.map(compileInWorker, files)):
+			sys.stdout.write(out)
+			sys.stdout.flush()
+			sys.stderr.write(err)
+
+			if stats.enabled():
+				if PassesJson:
+					reports[file] = stats.toDict()
+				else:
+					print("{0}:".format(file), file=sys.stderr)
+					stats.printTable()
+
+			if fileCode != 0 and code == 0:
+				code = fileCode
+
+	if reports:
+		print(json.dumps(reports, indent=1), file=sys.stderr)
+
+	if code != 0 or NoLink or LastStage != "codeEmission":
+		return code
+
+	assC = "gcc -ggdb " + " ".join(outputName(file, '.o') for file in files) + " -o " + outputName(files[0], '')
+
+	if library:
+		assC += ' -lm'
+
+	log.info(assC)
+
+	return runCommand(assC)
+
+
+if __name__ == "__main__":	
+	#NOTE: options first, then one or more files
+	arguments = [argument for argument in sys.argv[1:] if argument.startswith("-")]
+	files = [argument for argument in sys.argv[1:] if not argument.startswith("-")]
+
+	for argument in arguments:
+		matchCommands(argument)
+
+	if files == []:
+		print("Error No input files.")
+		sys.exit(1)
+
+	if len(files) > 1:
+		sys.exit(compileFiles(files, arguments))
+
+	stats = makeStats()
 
-	sys.exit(0)
-					
+	try:
+		code = compileFile(files[0], makeManager(), stats)
+	finally:
+		#the passes give up through sys.exit, report whatever ran
+		if stats.enabled():
+			if PassesJson:
+				stats.printJson()
+			else:
+				stats.printTable()
 
-	
\ No newline at end of file
+	sys.exit(code)
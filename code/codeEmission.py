@@ -15,233 +15,326 @@ def matchRegister(reg, output, operandSize):
             match regi:
 
                 case assemblyGenerator.SSERegisterType.XMM0:
-                    output += '%xmm0'
+                    output.append('%xmm0')
                 
                 case assemblyGenerator.SSERegisterType.XMM1:
-                    output += '%xmm1'
+                    output.append('%xmm1')
 
                 case assemblyGenerator.SSERegisterType.XMM2:
-                    output += '%xmm2'
+                    output.append('%xmm2')
                 
                 case assemblyGenerator.SSERegisterType.XMM3:
-                    output += '%xmm3'
+                    output.append('%xmm3')
                 
                 case assemblyGenerator.SSERegisterType.XMM4:
-                    output += '%xmm4'
+                    output.append('%xmm4')
                 
                 case assemblyGenerator.SSERegisterType.XMM5:
-                    output += '%xmm5'
+                    output.append('%xmm5')
 
                 case assemblyGenerator.SSERegisterType.XMM6:
-                    output += '%xmm6'
+                    output.append('%xmm6')
 
                 case assemblyGenerator.SSERegisterType.XMM7:
-                    output += '%xmm7'
+                    output.append('%xmm7')
+
+                case assemblyGenerator.SSERegisterType.XMM8:
+                    output.append('%xmm8')
+
+                case assemblyGenerator.SSERegisterType.XMM9:
+                    output.append('%xmm9')
+
+                case assemblyGenerator.SSERegisterType.XMM10:
+                    output.append('%xmm10')
+
+                case assemblyGenerator.SSERegisterType.XMM11:
+                    output.append('%xmm11')
+
+                case assemblyGenerator.SSERegisterType.XMM12:
+                    output.append('%xmm12')
+
+                case assemblyGenerator.SSERegisterType.XMM13:
+                    output.append('%xmm13')
 
                 case assemblyGenerator.SSERegisterType.XMM14:
-                    output += '%xmm14'
+                    output.append('%xmm14')
 
                 case assemblyGenerator.SSERegisterType.XMM15:
-                    output += '%xmm15'
+                    output.append('%xmm15')
 
                 case assemblyGenerator.RegisterType.SP:
-                    output += '%rsp'
+                    output.append('%rsp')
                 
                 case assemblyGenerator.RegisterType.BP:
-                    output += '%rbp'
+                    output.append('%rbp')
                     
                 case assemblyGenerator.RegisterType.AX:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%rax'
+                            output.append('%rax')
                         
                         case OperandSize.BYTE_4:
-                            output += '%eax'
+                            output.append('%eax')
 
                         case OperandSize.BYTE_1:
-                            output += '%al'
+                            output.append('%al')
 
 
                 case assemblyGenerator.RegisterType.CX:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%rcx'
+                            output.append('%rcx')
                         
                         case OperandSize.BYTE_4:
-                            output += '%ecx'
+                            output.append('%ecx')
 
                         case OperandSize.BYTE_1:
-                            output += '%cl'
+                            output.append('%cl')
                                             
                 case assemblyGenerator.RegisterType.DX:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%rdx'
+                            output.append('%rdx')
                         
                         case OperandSize.BYTE_4:
-                            output += '%edx'
+                            output.append('%edx')
 
                         case OperandSize.BYTE_1:
-                            output += '%dl'
+                            output.append('%dl')
 
                 case assemblyGenerator.RegisterType.DI:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%rdi'
+                            output.append('%rdi')
                         
                         case OperandSize.BYTE_4:
-                            output += '%edi'
+                            output.append('%edi')
 
                         case OperandSize.BYTE_1:
-                            output += '%dil'
+                            output.append('%dil')
 
                 case assemblyGenerator.RegisterType.SI:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%rsi'
+                            output.append('%rsi')
                         
                         case OperandSize.BYTE_4:
-                            output += '%esi'
+                            output.append('%esi')
 
                         case OperandSize.BYTE_1:
-                            output += '%sil'
+                            output.append('%sil')
 
                 case assemblyGenerator.RegisterType.R8:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%r8'
+                            output.append('%r8')
                         
                         case OperandSize.BYTE_4:
-                            output += '%r8d'
+                            output.append('%r8d')
 
                         case OperandSize.BYTE_1:
-                            output += '%r8b'
+                            output.append('%r8b')
 
                 case assemblyGenerator.RegisterType.R9:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%r9'
+                            output.append('%r9')
                         
                         case OperandSize.BYTE_4:
-                            output += '%r9d'
+                            output.append('%r9d')
 
                         case OperandSize.BYTE_1:
-                            output += '%r9b'
+                            output.append('%r9b')
 
                 case assemblyGenerator.RegisterType.R10:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%r10'
+                            output.append('%r10')
                         
                         case OperandSize.BYTE_4:
-                            output += '%r10d'
+                            output.append('%r10d')
 
                         case OperandSize.BYTE_1:
-                            output += '%r10b'
+                            output.append('%r10b')
                 
                 case assemblyGenerator.RegisterType.R11:
                     match operandSize:
                         case OperandSize.BYTE_8:
-                            output += '%r11'
+                            output.append('%r11')
+                        
+                        case OperandSize.BYTE_4:
+                            output.append('%r11d')
+
+                        case OperandSize.BYTE_1:
+                            output.append('%r11b')
+
+                case assemblyGenerator.RegisterType.BX:
+                    match operandSize:
+                        case OperandSize.BYTE_8:
+                            output.append('%rbx')
+                        
+                        case OperandSize.BYTE_4:
+                            output.append('%ebx')
+
+                        case OperandSize.BYTE_1:
+                            output.append('%bl')
+
+                case assemblyGenerator.RegisterType.R12:
+                    match operandSize:
+                        case OperandSize.BYTE_8:
+                            output.append('%r12')
                         
                         case OperandSize.BYTE_4:
-                            output += '%r11d'
+                            output.append('%r12d')
 
                         case OperandSize.BYTE_1:
-                            output += '%r11b'
+                            output.append('%r12b')
 
-    return output
+                case assemblyGenerator.RegisterType.R13:
+                    match operandSize:
+                        case OperandSize.BYTE_8:
+                            output.append('%r13')
+                        
+                        case OperandSize.BYTE_4:
+                            output.append('%r13d')
+
+                        case OperandSize.BYTE_1:
+                            output.append('%r13b')
+
+                case assemblyGenerator.RegisterType.R14:
+                    match operandSize:
+                        case OperandSize.BYTE_8:
+                            output.append('%r14')
+                        
+                        case OperandSize.BYTE_4:
+                            output.append('%r14d')
+
+                        case OperandSize.BYTE_1:
+                            output.append('%r14b')
+
+                case assemblyGenerator.RegisterType.R15:
+                    match operandSize:
+                        case OperandSize.BYTE_8:
+                            output.append('%r15')
+                        
+                        case OperandSize.BYTE_4:
+                            output.append('%r15d')
+
+                        case OperandSize.BYTE_1:
+                            output.append('%r15b')
 
 def matchOperand(operand, output, operandSize):
 
     match operand:
         case assemblyGenerator.MemoryOperand(reg = reg, int = int):
-            output += '{0}'.format(int)
+            output.append('{0}'.format(int))
 
-            output += '('
-            output = matchRegister(reg, output, OperandSize.BYTE_8)
-            output += ')'
+            output.append('(')
+            matchRegister(reg, output, OperandSize.BYTE_8)
+            output.append(')')
             
 
         case assemblyGenerator.DataOperand(identifier = identifier):
-            output += '{0}(%rip)'.format(identifier)
+            output.append('{0}(%rip)'.format(identifier))
             pass
             
         case assemblyGenerator.RegisterOperand(register=reg):
-            output = matchRegister(reg, output, operandSize)
+            matchRegister(reg, output, operandSize)
                                   
         case assemblyGenerator.ImmediateOperand(imm=im):
-            output += '${0}'.format(im)
+            output.append('${0}'.format(im))
 
         case assemblyGenerator.Indexed(base = base, index = index, scale = scale):
-            print(type(scale), scale)
             
-            output += '('
+            output.append('(')
 
-            output = matchRegister(base, output, operandSize)
-            output += ', '
-            output = matchRegister(index, output, operandSize)
-            output += ', {0}'.format(scale)
+            matchRegister(base, output, operandSize)
+            output.append(', ')
+            matchRegister(index, output, operandSize)
+            output.append(', {0}'.format(scale))
 
-            output += ')'
+            output.append(')')
         
         case _:
             print("Error: Operand not added into code emission. {0}".format(operand))
             sys.exit(1)
 
-    return output
+#directive for the values of a RunInit and how many go on one line
+RUN_DIRECTIVES = {
+    typeChecker.CharInit : '.byte',
+    typeChecker.UCharInit : '.byte',
+    typeChecker.IntInit : '.long',
+    typeChecker.UIntInit : '.long',
+    typeChecker.LongInit : '.quad',
+    typeChecker.ULongInit : '.quad',
+    typeChecker.DoubleInit : '.double'
+    }
+
+RUN_LINE = 32
+
+def isZeroInit(staticInit):
+    match staticInit:
+        case typeChecker.ZeroInit():
+            return True
+        case typeChecker.IntInit(int=int) | typeChecker.LongInit(int=int) | typeChecker.UIntInit(int=int) | typeChecker.ULongInit(int=int):
+            return int.value == 0
+    return False
 
 def printStaticInit(staticInit, output):
     match staticInit:
         case typeChecker.IntInit(int=int):
             if int.value == 0:
-                output += '\t.zero 4\n'
+                output.append('\t.zero 4\n')
             else:
-                output += '\t.long {0}\n'.format(int.value)
+                output.append('\t.long {0}\n'.format(int.value))
 
         case typeChecker.LongInit(int=int):
             if int.value == 0:
-                output += '\t.zero 8\n'
+                output.append('\t.zero 8\n')
             else:
-                output += '\t.quad {0}\n'.format(int.value)
+                output.append('\t.quad {0}\n'.format(int.value))
 
         case typeChecker.UIntInit(int=int):
             if int.value == 0:
-                output += '\t.zero 4\n'
+                output.append('\t.zero 4\n')
             else:
-                output += '\t.long {0}\n'.format(int.value)
+                output.append('\t.long {0}\n'.format(int.value))
             
         case typeChecker.ULongInit(int=int):
             if int.value == 0:
-                output += '\t.zero 8\n'
+                output.append('\t.zero 8\n')
             else:
-                output += '\t.quad {0}\n'.format(int.value)
+                output.append('\t.quad {0}\n'.format(int.value))
         
         case typeChecker.DoubleInit(double=double):
-            output += '\t.double {0}\n'.format(double.value)
+            output.append('\t.double {0}\n'.format(double.value))
             pass
 
         case typeChecker.ZeroInit(bytes = bytes):
-            output += '\t.zero {0}\n'.format(bytes)
+            output.append('\t.zero {0}\n'.format(bytes))
+
+        case typeChecker.RunInit(kind = kind, values = values):
+            directive = RUN_DIRECTIVES[kind]
+            for start in range(0, len(values), RUN_LINE):
+                output.append('\t{0} {1}\n'.format(directive, ','.join(map(str, values[start:start + RUN_LINE]))))
 
         case _:
             print("Error: {0}".format(type(staticInit)))
             sys.exit(1)
-    return output
 
 def printInstructionSuffix(type, output):
     match type:
         case assemblyGenerator.Longword():
-            output += 'l'
+            output.append('l')
             
         case assemblyGenerator.Quadword():
-            output += 'q'
+            output.append('q')
 
         case assemblyGenerator.Double():
-            output += 'sd'
+            output.append('sd')
         
         case assemblyGenerator.ByteArray():
-            output += 'q'
+            output.append('q')
             #traceback.print_stack()
             #print("Invalid Byte ARRay as operand?")
             #sys.exit(1)
@@ -250,8 +343,6 @@ def printInstructionSuffix(type, output):
             print("Invalid assembly type. {0}".format(type))
             sys.exit(1)
 
-    return output
-
 def getOperandSize(type):
     operandSize = None
     match type:
@@ -280,55 +371,17 @@ def printTopLevel(topLevel, output, symbolTable):
     match topLevel:
         case assemblyGenerator.StaticVariable(identifier = identifier, global_ = global_, alignment = alignment, initList = initList):
             
-            varType = symbolTable[identifier].assType
-            print(type(varType))
-
-            match varType:
-                case assemblyGenerator.Double():
-                    if global_ == True:
-                        output += '\t.globl {0}\n'.format(identifier)
-
-                    output += '\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
-
-                    output = printStaticInit(initList[0], output)
-                    
-                case assemblyGenerator.ByteArray():
-                    if len(initList) == 1 and type(initList[0]) == typeChecker.ZeroInit:
-                        init = initList[0]
-
-                        if global_ == True:
-                            output += '\t.globl {0}\n'.format(identifier)
-
-                        output += '\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
-
-                        output = printStaticInit(init, output)
-                    else:
-                        if global_ == True:
-                            output += '\t.globl {0}\n'.format(identifier)
-
-                        output += '\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
-
-                        for init in initList:
-                            output = printStaticInit(init, output)   
-
-                case _:
-                    print(type(initList[0].int.value))
-
-                    if initList[0].int.value == 0:
-                        if global_ == True:
-                            output += '\t.globl {0}\n'.format(identifier)
-
-                        output += '\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
-
-                        output = printStaticInit(initList[0], output)
-
-                    else:
-                        if global_ == True:
-                            output += '\t.globl {0}\n'.format(identifier)
+            if global_ == True:
+                output.append('\t.globl {0}\n'.format(identifier))
 
-                        output += '\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
+            #nothing but zeros goes to .bss
+            if all(isZeroInit(init) for init in initList):
+                output.append('\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
+            else:
+                output.append('\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
 
-                        output = printStaticInit(initList[0], output)
+            for init in initList:
+                printStaticInit(init, output)
                     
             """
             if (type(varType) == assemblyGenerator.Longword or type(varType) == assemblyGenerator.Quadword or type(varType) == assemblyGenerator.ByteArray):
@@ -337,90 +390,89 @@ def printTopLevel(topLevel, output, symbolTable):
                 init = initList[0]
 
                 if global_ == True:
-                    output += '\t.globl {0}\n'.format(identifier)
+                    output.append('\t.globl {0}\n'.format(identifier))
 
-                output += '\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
+                output.append('\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
 
-                output = printStaticInit(init, output)
+                printStaticInit(init, output)
                 
             else:
 
                 #aca es con inizializador
                 for i in initList:
-                    print(type(i))
                     match i:
                         case typeChecker.DoubleInit():
                             if global_ == True:
-                                output += '\t.globl {0}\n'.format(identifier)
+                                output.append('\t.globl {0}\n'.format(identifier))
 
-                            output += '\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
+                            output.append('\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
 
-                            output = printStaticInit(i, output)
+                            printStaticInit(i, output)
 
                         case _:
 
                             if staticInit.int == 0:
                                 if global_ == True:
-                                    output += '\t.globl {0}\n'.format(identifier)
+                                    output.append('\t.globl {0}\n'.format(identifier))
 
-                                output += '\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
+                                output.append('\t.bss\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
 
-                                output = printStaticInit(staticInit, output)
+                                printStaticInit(staticInit, output)
 
                             else:
                                 if global_ == True:
-                                    output += '\t.globl {0}\n'.format(identifier)
+                                    output.append('\t.globl {0}\n'.format(identifier))
 
-                                output += '\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
+                                output.append('\t.data\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
 
-                                output = printStaticInit(staticInit, output)
+                                printStaticInit(staticInit, output)
             """
             
             
         case assemblyGenerator.StaticConstant(identifier = identifier, alignment = alignment, staticInit = staticInit):
 
-            output += '\t.section .rodata\n\t.align {0}\n{1}:\n'.format(alignment, identifier)
+            output.append('\t.section .rodata\n\t.align {0}\n{1}:\n'.format(alignment, identifier))
             
-            output = printStaticInit(staticInit, output)
+            printStaticInit(staticInit, output)
 
         
         case assemblyGenerator.Function(identifier = identifier, global_ = global_, insList = insList, stackOffset = stackOffset):
             if global_ == True:
-                output += '\t.globl {0}\n'.format(identifier)
+                output.append('\t.globl {0}\n'.format(identifier))
 
-            output += '\t.text\n{0}:\n\tpushq %rbp\n\tmovq %rsp, %rbp'.format(identifier)
+            output.append('\t.text\n{0}:\n\tpushq %rbp\n\tmovq %rsp, %rbp'.format(identifier))
             
             for i in insList:
                 match i:
                     #esq esta es un sign extend
                     case assemblyGenerator.MovSXInstruction(sourceO = sourceO, destO = destO):
-                        output += '\n\tmovslq '
+                        output.append('\n\tmovslq ')
 
-                        output = matchOperand(sourceO, output, OperandSize.BYTE_4)
+                        matchOperand(sourceO, output, OperandSize.BYTE_4)
                         
-                        output += ', '
+                        output.append(', ')
 
-                        output = matchOperand(destO, output, OperandSize.BYTE_8) 
+                        matchOperand(destO, output, OperandSize.BYTE_8)
 
                     case assemblyGenerator.MovInstruction(assType=assType, sourceO=src, destO=dst):
-                        output += '\n\tmov'
+                        output.append('\n\tmov')
 
-                        output = printInstructionSuffix(assType, output)
+                        printInstructionSuffix(assType, output)
                                 
-                        output += ' '
+                        output.append(' ')
                                 
                         operandSize = getOperandSize(assType)
 
-                        output = matchOperand(src, output, operandSize)
+                        matchOperand(src, output, operandSize)
                         
-                        output += ', '
+                        output.append(', ')
 
-                        output = matchOperand(dst, output, operandSize)
+                        matchOperand(dst, output, operandSize)
 
                         
 
                     case assemblyGenerator.ReturnInstruction():
-                        output += '\n\tmovq %rbp, %rsp\n\tpopq %rbp\n\tret'
+                        output.append('\n\tmovq %rbp, %rsp\n\tpopq %rbp\n\tret')
                         
                         
                     case assemblyGenerator.UnaryInstruction(operator=o, assType = assType, dest=dst):
@@ -429,20 +481,20 @@ def printTopLevel(topLevel, output, symbolTable):
                             case assemblyGenerator.UnaryOperator(operator=op):
                                 match op:
                                     case assemblyGenerator.UnopType.Not:
-                                        output += '\n\tnot'
+                                        output.append('\n\tnot')
 
                                     case assemblyGenerator.UnopType.Neg:
-                                        output += '\n\tneg'
+                                        output.append('\n\tneg')
                                     
                                     case assemblyGenerator.UnopType.Shr:
-                                        output += '\n\tshr'
+                                        output.append('\n\tshr')
 
-                        output = printInstructionSuffix(assType, output)
+                        printInstructionSuffix(assType, output)
 
-                        output += ' '                
+                        output.append(' ')
 
                         operandSize = getOperandSize(assType)
-                        output = matchOperand(dst, output, operandSize)
+                        matchOperand(dst, output, operandSize)
 
                     case assemblyGenerator.BinaryInstruction(operator=op, assType = assType, src=src, dest=dst):
 
@@ -453,43 +505,43 @@ def printTopLevel(topLevel, output, symbolTable):
                                     case assemblyGenerator.BinaryOperator(operator=o):
                                         match o:
                                             case assemblyGenerator.BinopType.Add:
-                                                output += '\n\tadd'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tadd')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.Sub:
-                                                output += '\n\tsub'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tsub')
+                                                printInstructionSuffix(assType, output)
                                             
                                             case assemblyGenerator.BinopType.And:
-                                                output += '\n\and'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\and')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.Or:
-                                                output += '\n\or'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\or')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.DivDouble:
-                                                output += '\n\tdiv'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tdiv')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.Mult:
-                                                output += '\n\tmulsd'
+                                                output.append('\n\tmulsd')
 
                                             case assemblyGenerator.BinopType.Xor:
-                                                output += '\n\txorpd'
+                                                output.append('\n\txorpd')
 
                                             case _:
                                                 print("Error: Invalid Binary Instruction for doubles.")
                                                 sys.exit(1)
 
                                 
-                                output += ' '                
+                                output.append(' ')
 
                                 operandSize = getOperandSize(assType)
 
-                                output = matchOperand(src, output, operandSize)
-                                output += ', '
-                                output = matchOperand(dst, output, operandSize)
+                                matchOperand(src, output, operandSize)
+                                output.append(', ')
+                                matchOperand(dst, output, operandSize)
 
                                 
                             case _:
@@ -498,102 +550,134 @@ def printTopLevel(topLevel, output, symbolTable):
                                     case assemblyGenerator.BinaryOperator(operator=o):
                                         match o:
                                             case assemblyGenerator.BinopType.Add:
-                                                output += '\n\tadd'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tadd')
+                                                printInstructionSuffix(assType, output)
                                                 
                                             case assemblyGenerator.BinopType.Sub:
-                                                output += '\n\tsub'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tsub')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.And:
-                                                output += '\n\tand'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tand')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.Or:
-                                                output += '\n\tor'
-                                                output = printInstructionSuffix(assType, output)
+                                                output.append('\n\tor')
+                                                printInstructionSuffix(assType, output)
 
                                             case assemblyGenerator.BinopType.Mult:
-                                                output += '\n\timul'
+                                                output.append('\n\timul')
                                                 pass
 
+                                            case assemblyGenerator.BinopType.Sal:
+                                                output.append('\n\tsal')
+                                                printInstructionSuffix(assType, output)
+
+                                            case assemblyGenerator.BinopType.Sar:
+                                                output.append('\n\tsar')
+                                                printInstructionSuffix(assType, output)
+
+                                            case assemblyGenerator.BinopType.Shr:
+                                                output.append('\n\tshr')
+                                                printInstructionSuffix(assType, output)
+
                                             case _:
                                                 print("Error: Invalid Binary Instruction for integers. {0}".format(o))
                                                 sys.exit(1)
                                 
 
-                                output += ' '                
+                                output.append(' ')
 
                                 operandSize = getOperandSize(assType)
 
-                                output = matchOperand(src, output, operandSize)
-                                output += ', '
-                                output = matchOperand(dst, output, operandSize)
+                                matchOperand(src, output, operandSize)
+                                output.append(', ')
+                                matchOperand(dst, output, operandSize)
 
 
                     case assemblyGenerator.Cvtsi2sd(assType = assType, sourceO = sourceO, destO = destO):
-                        output += "\n\tcvtsi2sd"
+                        output.append("\n\tcvtsi2sd")
 
-                        output = printInstructionSuffix(assType, output)
+                        printInstructionSuffix(assType, output)
 
-                        output += ' '                
+                        output.append(' ')
 
                         operandSize = getOperandSize(assType)
 
-                        output = matchOperand(sourceO, output, operandSize)
-                        output += ', '
-                        output = matchOperand(destO, output, operandSize)
+                        matchOperand(sourceO, output, operandSize)
+                        output.append(', ')
+                        matchOperand(destO, output, operandSize)
 
                     
 
                     case assemblyGenerator.Cvttsd2si(assType = assType, sourceO = sourceO, destO = destO):
-                        output += "\n\tcvttsd2si"
+                        output.append("\n\tcvttsd2si")
 
-                        output = printInstructionSuffix(assType, output)
+                        printInstructionSuffix(assType, output)
 
-                        output += ' '                
+                        output.append(' ')
 
                         operandSize = getOperandSize(assType)
 
-                        output = matchOperand(sourceO, output, operandSize)
-                        output += ', '
-                        output = matchOperand(destO, output, operandSize)
+                        matchOperand(sourceO, output, operandSize)
+                        output.append(', ')
+                        matchOperand(destO, output, operandSize)
 
                     case assemblyGenerator.LeaInstruction(sourceO = sourceO, destO = destO):
-                        output += '\n\tleaq '
+                        output.append('\n\tleaq ')
                         
-                        output = matchOperand(sourceO, output, OperandSize.BYTE_8)
-                        output += ', '
-                        output = matchOperand(destO, output, OperandSize.BYTE_8)
+                        matchOperand(sourceO, output, OperandSize.BYTE_8)
+                        output.append(', ')
+                        matchOperand(destO, output, OperandSize.BYTE_8)
 
                     case assemblyGenerator.IDivInstruction(assType = assType, divisor=divisor):
-                        output += '\n\tidiv'
+                        output.append('\n\tidiv')
 
-                        output = printInstructionSuffix(assType, output)
+                        printInstructionSuffix(assType, output)
 
-                        output += ' '                
+                        output.append(' ')
                         
                         operandSize = getOperandSize(assType)
-                        output = matchOperand(divisor, output, operandSize)
+                        matchOperand(divisor, output, operandSize)
 
                     
                     case assemblyGenerator.DivInstruction(assType = assType, divisor=divisor):
-                        output += '\n\tdiv'
+                        output.append('\n\tdiv')
 
-                        output = printInstructionSuffix(assType, output)
+                        printInstructionSuffix(assType, output)
 
-                        output += ' '                
+                        output.append(' ')
                         
                         operandSize = getOperandSize(assType)
-                        output = matchOperand(divisor, output, operandSize)
+                        matchOperand(divisor, output, operandSize)
                     
                     
+                    case assemblyGenerator.IMulInstruction(assType = assType, factor = factor):
+                        output.append('\n\timul')
+
+                        printInstructionSuffix(assType, output)
+
+                        output.append(' ')
+                        
+                        operandSize = getOperandSize(assType)
+                        matchOperand(factor, output, operandSize)
+
+                    case assemblyGenerator.MulInstruction(assType = assType, factor = factor):
+                        output.append('\n\tmul')
+
+                        printInstructionSuffix(assType, output)
+
+                        output.append(' ')
+                        
+                        operandSize = getOperandSize(assType)
+                        matchOperand(factor, output, operandSize)
+
                     case assemblyGenerator.CDQInstruction(assType = assType):
                         match assType:
                             case assemblyGenerator.Longword():
-                                output += '\n\tcdq'
+                                output.append('\n\tcdq')
                             case assemblyGenerator.Quadword():
-                                output += '\n\tcqo'
+                                output.append('\n\tcqo')
                             
                     
                     case assemblyGenerator.CompInst(assType = assType, operand0=op0, operand1=op1):
@@ -601,61 +685,65 @@ def printTopLevel(topLevel, output, symbolTable):
                         match assType:
                             case assemblyGenerator.Double():
 
-                                output += '\n\tcomisd'
+                                output.append('\n\tcomisd')
 
-                                output += ' '                
+                                output.append(' ')
 
                                 operandSize = getOperandSize(assType)
 
-                                output = matchOperand(op0, output, operandSize)
+                                matchOperand(op0, output, operandSize)
 
-                                output += ', '
+                                output.append(', ')
 
-                                output = matchOperand(op1, output, operandSize)
+                                matchOperand(op1, output, operandSize)
 
                                 
                             case _:
                                 
-                                output += '\n\tcmp'
+                                output.append('\n\tcmp')
 
-                                output = printInstructionSuffix(assType, output)
+                                printInstructionSuffix(assType, output)
 
-                                output += ' '                
+                                output.append(' ')
 
                                 operandSize = getOperandSize(assType)
 
-                                output = matchOperand(op0, output, operandSize)
+                                matchOperand(op0, output, operandSize)
 
-                                output += ', '
+                                output.append(', ')
 
-                                output = matchOperand(op1, output, operandSize)
+                                matchOperand(op1, output, operandSize)
                                 
 
                                             
                     case assemblyGenerator.JumpInst(identifier=id):
-                        output += '\n\tjmp .L{0}'.format(id)
+                        output.append('\n\tjmp .L{0}'.format(id))
 
                     case assemblyGenerator.JumpCCInst(conc_code=code, identifier=id):
-                        output += '\n\tj{0} .L{1}'.format(code.name, id)
+                        output.append('\n\tj{0} .L{1}'.format(code.name, id))
                         
                     
                     case assemblyGenerator.SetCCInst(conc_code=code, operand=op):
-                        output += '\n\tset{0} '.format(code.name)
-                        output = matchOperand(op, output, OperandSize.BYTE_1)
+                        output.append('\n\tset{0} '.format(code.name))
+                        matchOperand(op, output, OperandSize.BYTE_1)
 
                     case assemblyGenerator.LabelInst(identifier=id):
-                        output += '\n.L{0}:'.format(id)
+                        output.append('\n.L{0}:'.format(id))
                         
                     case assemblyGenerator.PushInstruction(operand = operand):
-                        output += "\n\tpushq "
-                        output = matchOperand(operand, output, OperandSize.BYTE_8)
+                        output.append("\n\tpushq ")
+                        matchOperand(operand, output, OperandSize.BYTE_8)
                     
+                    case assemblyGenerator.PopInstruction(register = register):
+                        output.append("\n\tpopq ")
+                        matchRegister(register, output, OperandSize.BYTE_8)
+
                     case assemblyGenerator.CallInstruction(identifier = identifier):
                         if identifier in symbolTable:
                             #print(symbolTable)
-                            output += "\n\tcall {0}".format(identifier)
+                            output.append("\n\tcall {0}".format(identifier))
                         else:
-                            output += "\n\tcall {0}@PLT".format(identifier)
+                            output.append("\n\tcall {0}@PLT".format(identifier))
 
                     case _:
                         print("Instruction {0} not added into code emission!".format(i))
@@ -663,7 +751,7 @@ def printTopLevel(topLevel, output, symbolTable):
 
                 #output += '\n\t{0}'.format(i)
                 
-            output += '\n'
+            output.append('\n')
         
         
         
@@ -671,18 +759,24 @@ def printTopLevel(topLevel, output, symbolTable):
         case _:
             print("Invalid Top Level {0}".format(topLevel))
             sys.exit(1)
-
-    return output
     
 
-def outputAsmFile(ass, symbolTable):    
-
-    output = ""
+def outputAsmFile(ass, symbolTable):
+    #output is a list of pieces joined once at the end, appending to a
+    #string would copy the whole file for every instruction
+    output = []
     for topLevel in ass.topLevelList:
+        printTopLevel(topLevel, output, symbolTable)
 
-        output = printTopLevel(topLevel, output, symbolTable)
+    output.append('\t.section	.note.GNU-stack,"",@progbits\n')
 
-    output += '\t.section	.note.GNU-stack,"",@progbits\n'
+    return "".join(output)
+
+def writeAsmFile(ass, symbolTable, file):
+    #streams every top level into file as soon as it is emitted
+    for topLevel in ass.topLevelList:
+        output = []
+        printTopLevel(topLevel, output, symbolTable)
+        file.write("".join(output))
 
-    #print(output)
-    return output
\ No newline at end of file
+    file.write('\t.section	.note.GNU-stack,"",@progbits\n')
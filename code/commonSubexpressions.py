@@ -0,0 +1,167 @@
+import typeChecker
+import tacGenerator
+import copyPropagation
+import constantFolding
+import deadStoreElimination
+import diagnostics
+
+log = diagnostics.getLogger("commonSubexpressions")
+
+#Local value numbering over TAC. Every value computed in a block gets a
+#number, variables holding the same number hold the same value. A binary,
+#unary, addPtr or GetAddress whose operands and operator were already seen
+#becomes a copy from a variable that still holds the result, copy
+#propagation and dead store elimination clean up after it.
+#
+#Numbers are reset at every label. A call or a store through a pointer may
+#change any static variable or any variable whose address is taken, those
+#lose their number.
+
+COMMUTATIVE = [tacGenerator.BinopType.ADD, tacGenerator.BinopType.MULTIPLY, tacGenerator.BinopType.EQUAL, tacGenerator.BinopType.NOTEQUAL]
+
+class ValueTable:
+    def __init__(self):
+        #variable or constant key -> number
+        self.numbers = {}
+        self.constants = {}
+        #expression key -> number of its result
+        self.expressions = {}
+        #number -> variables holding it
+        self.holders = {}
+        self.next = 0
+
+    def __str__(self):
+        return "ValueTable numbers: {self.numbers} holders: {self.holders}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def fresh(self):
+        self.next += 1
+        return self.next
+
+    def number(self, value):
+        match value:
+            case tacGenerator.TAC_VariableValue(identifier = identifier):
+                if identifier not in self.numbers:
+                    self.assign(identifier, self.fresh())
+                return self.numbers[identifier]
+
+            case tacGenerator.TAC_ConstantValue():
+                key = copyPropagation.valueKey(value)
+                if key not in self.constants:
+                    self.constants[key] = self.fresh()
+                return self.constants[key]
+
+    def forget(self, name):
+        if name in self.numbers:
+            self.holders[self.numbers.pop(name)].remove(name)
+
+    def assign(self, name, number):
+        self.forget(name)
+        self.numbers[name] = number
+        self.holders.setdefault(number, []).append(name)
+
+    def holder(self, number, type_, symbolTable):
+        for name in self.holders.get(number, []):
+            if symbolTable[name].type.checkType(type_):
+                return name
+        return None
+
+def expressionKey(i, table):
+    match i:
+        case tacGenerator.TAC_BinaryInstruction(operator = operator, src1 = src1, src2 = src2):
+            operands = [table.number(src1), table.number(src2)]
+            if operator.operator in COMMUTATIVE:
+                operands.sort()
+            return ("binary", operator.operator, *operands)
+
+        case tacGenerator.TAC_UnaryInstruction(operator = operator, src = src):
+            return ("unary", operator.operator, table.number(src))
+
+        case tacGenerator.TAC_addPtr(ptr = ptr, index = index, scale = scale):
+            return ("addPtr", table.number(ptr), table.number(index), scale)
+
+        case tacGenerator.TAC_GetAddress(src = tacGenerator.TAC_VariableValue(identifier = identifier)):
+            #the address of a variable never changes
+            return ("address", identifier)
+
+    return None
+
+def eliminateFunction(function, symbolTable):
+    aliased = set()
+    for i in function.instructions:
+        match i:
+            case tacGenerator.TAC_GetAddress(src = tacGenerator.TAC_VariableValue(identifier = identifier)):
+                aliased.add(identifier)
+
+        for name in deadStoreElimination.usedVariables(i) + [constantFolding.definedVariable(i, symbolTable)]:
+            if name != None and type(symbolTable[name].attrs) == typeChecker.StaticAttributes:
+                aliased.add(name)
+
+    table = ValueTable()
+    reused = 0
+    newList = []
+
+    for i in function.instructions:
+        match i:
+            case tacGenerator.TAC_LabelInst():
+                #a label is a join point, other paths may bring other values
+                table = ValueTable()
+
+            case tacGenerator.TAC_CopyInstruction(src = src, dst = dst):
+                #copies between types don't keep the value, int -1 is not
+                #unsigned int -1
+                number = table.number(src)
+                srcType = symbolTable[src.identifier].type if type(src) == tacGenerator.TAC_VariableValue else None
+                if (srcType != None and srcType.checkType(symbolTable[dst.identifier].type)) or (srcType == None and type(src.const) == type(constantFolding.makeConstant(symbolTable[dst.identifier].type, 0))):
+                    table.assign(dst.identifier, number)
+                else:
+                    table.assign(dst.identifier, table.fresh())
+
+            case tacGenerator.TAC_FunCallInstruction(dst = dst):
+                for name in aliased:
+                    table.forget(name)
+                if dst != None:
+                    table.assign(dst.identifier, table.fresh())
+
+            case tacGenerator.TAC_Store():
+                for name in aliased:
+                    table.forget(name)
+
+            case _:
+                key = expressionKey(i, table)
+                dst = constantFolding.definedVariable(i, symbolTable)
+
+                if key != None and key in table.expressions:
+                    number = table.expressions[key]
+                    holder = table.holder(number, symbolTable[dst].type, symbolTable)
+                    if holder != None and holder != dst:
+                        i = tacGenerator.TAC_CopyInstruction(tacGenerator.TAC_VariableValue(holder), tacGenerator.TAC_VariableValue(dst))
+                        reused += 1
+                    table.assign(dst, number)
+
+                elif key != None:
+                    number = table.fresh()
+                    table.expressions[key] = number
+                    table.assign(dst, number)
+
+                elif dst != None:
+                    table.assign(dst, table.fresh())
+
+        newList.append(i)
+
+    function.instructions = newList
+
+    log.debug("function {0}: {1} expressions reused", function.identifier, reused)
+
+    return reused > 0
+
+def eliminateCommonSubexpressions(tac, symbolTable):
+    changed = False
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef():
+                changed = eliminateFunction(topLevel, symbolTable) or changed
+
+    return changed
@@ -0,0 +1,313 @@
+import sys
+import math
+import parser
+import typeChecker
+import tacGenerator
+import diagnostics
+
+log = diagnostics.getLogger("constantFolding")
+
+#Constant folding over TAC. Runs between TAC_parseProgram and ASM_parseAST
+#and evaluates at compile time every instruction whose operands are
+#constants, with the same wrap around, truncation and rounding the
+#generated code would have. Conditional jumps on a constant become a jump
+#or go away.
+#
+#Inside a basic block the constants are also propagated through local
+#variables so a whole constant expression folds, not just its leaves.
+#Statics and variables whose address is taken are never tracked, a call
+#or a store can change them behind our back.
+
+#CONSTANTS
+
+def wrap(value, bits, isSigned):
+    value = value % pow(2, bits)
+    if isSigned and value >= pow(2, bits - 1):
+        value -= pow(2, bits)
+    return value
+
+def constantType(const):
+    match const:
+        case parser.ConstInt():
+            return parser.IntType()
+        case parser.ConstLong():
+            return parser.LongType()
+        case parser.ConstUInt():
+            return parser.UIntType()
+        case parser.ConstULong():
+            return parser.ULongType()
+        case parser.ConstDouble():
+            return parser.DoubleType()
+    return None
+
+def constantValue(const):
+    match const:
+        case parser.ConstDouble(double = double):
+            return double
+    return const.int
+
+def makeConstant(type_, value):
+    #the constant always gets the C type of the variable it replaces, the
+    #backend picks sizes and signedness from it
+    match type_:
+        case parser.IntType():
+            return parser.ConstInt(wrap(value, 32, True))
+        case parser.LongType():
+            return parser.ConstLong(wrap(value, 64, True))
+        case parser.UIntType():
+            return parser.ConstUInt(wrap(value, 32, False))
+        case parser.ULongType() | parser.PointerType():
+            return parser.ConstULong(wrap(value, 64, False))
+        case parser.DoubleType():
+            return parser.ConstDouble(float(value))
+    return None
+
+def getConstant(value):
+    #the Const of a TAC value, None if it isn't a constant we can evaluate
+    match value:
+        case tacGenerator.TAC_ConstantValue(const = const):
+            if constantType(const):
+                return const
+    return None
+
+#EVALUATION
+
+def truncatedDivision(a, b):
+    #C rounds towards zero, python floors
+    quotient = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        quotient = -quotient
+    return quotient
+
+def evaluateBinary(operator, type_, a, b):
+    match operator:
+        case tacGenerator.BinopType.EQUAL:
+            return int(a == b)
+        case tacGenerator.BinopType.NOTEQUAL:
+            return int(a != b)
+        case tacGenerator.BinopType.LESSTHAN:
+            return int(a < b)
+        case tacGenerator.BinopType.LESSOREQUAL:
+            return int(a <= b)
+        case tacGenerator.BinopType.GREATERTHAN:
+            return int(a > b)
+        case tacGenerator.BinopType.GREATEROREQUAL:
+            return int(a >= b)
+        case tacGenerator.BinopType.ADD:
+            return a + b
+        case tacGenerator.BinopType.SUBTRACT:
+            return a - b
+        case tacGenerator.BinopType.MULTIPLY:
+            return a * b
+
+    #division by zero and INT_MIN / -1 are left for the program to trap on
+    if b == 0:
+        return None
+
+    if type(type_) == parser.DoubleType:
+        if operator == tacGenerator.BinopType.DIVIDE:
+            return a / b
+        return None
+
+    quotient = truncatedDivision(a, b)
+    if type_.isSigned and quotient != wrap(quotient, type_.size * 8, True):
+        return None
+
+    match operator:
+        case tacGenerator.BinopType.DIVIDE:
+            return quotient
+        case tacGenerator.BinopType.REMAINDER:
+            return a - b * quotient
+
+    return None
+
+def evaluateUnary(operator, type_, a):
+    match operator:
+        case tacGenerator.UnopType.NEGATE:
+            return -a
+        case tacGenerator.UnopType.COMPLEMENT:
+            if type(type_) == parser.DoubleType:
+                return None
+            return ~a
+        case tacGenerator.UnopType.NOT:
+            return int(a == 0)
+    return None
+
+def evaluateDoubleToInteger(type_, d):
+    #out of range conversions are undefined, the program decides at runtime
+    if math.isnan(d) or math.isinf(d):
+        return None
+
+    value = math.trunc(d)
+    bits = type_.size * 8
+    if type_.isSigned and -pow(2, bits - 1) <= value < pow(2, bits - 1):
+        return value
+    if not type_.isSigned and 0 <= value < pow(2, bits):
+        return value
+    return None
+
+def foldInstruction(i, symbolTable):
+    #the instruction that replaces i, i itself when nothing folds and None
+    #when i goes away
+    def copyOf(value, dst):
+        if value == None:
+            return i
+        const = makeConstant(symbolTable[dst.identifier].type, value)
+        if const == None:
+            return i
+        return tacGenerator.TAC_CopyInstruction(tacGenerator.TAC_ConstantValue(const), dst)
+
+    match i:
+        case tacGenerator.TAC_BinaryInstruction(operator = operator, src1 = src1, src2 = src2, dst = dst):
+            const1 = getConstant(src1)
+            const2 = getConstant(src2)
+            if const1 and const2:
+                return copyOf(evaluateBinary(operator.operator, constantType(const1), constantValue(const1), constantValue(const2)), dst)
+
+        case tacGenerator.TAC_UnaryInstruction(operator = operator, src = src, dst = dst):
+            const = getConstant(src)
+            if const:
+                return copyOf(evaluateUnary(operator.operator, constantType(const), constantValue(const)), dst)
+
+        case tacGenerator.TAC_CopyInstruction(src = src, dst = dst):
+            #casts between integers of the same size are copies
+            const = getConstant(src)
+            if const and type(const) != type(makeConstant(symbolTable[dst.identifier].type, 0)):
+                return copyOf(constantValue(const), dst)
+
+        case tacGenerator.TAC_signExtendInstruction(src = src, dst = dst) | tacGenerator.TAC_zeroExtendInstruction(src = src, dst = dst) | tacGenerator.TAC_truncateInstruction(src = src, dst = dst):
+            const = getConstant(src)
+            if const:
+                return copyOf(constantValue(const), dst)
+
+        case tacGenerator.TAC_IntToDouble(src = src, dst = dst) | tacGenerator.TAC_UIntToDouble(src = src, dst = dst):
+            const = getConstant(src)
+            if const:
+                return copyOf(float(constantValue(const)), dst)
+
+        case tacGenerator.TAC_DoubleToInt(src = src, dst = dst) | tacGenerator.TAC_DoubleToUInt(src = src, dst = dst):
+            const = getConstant(src)
+            if const:
+                return copyOf(evaluateDoubleToInteger(symbolTable[dst.identifier].type, constantValue(const)), dst)
+
+        case tacGenerator.TAC_JumpIfZeroInst(condition = condition, label = label):
+            const = getConstant(condition)
+            if const:
+                if constantValue(const) == 0:
+                    return tacGenerator.TAC_JumpInst(label)
+                return None
+
+        case tacGenerator.TAC_JumpIfNotZeroInst(condition = condition, label = label):
+            const = getConstant(condition)
+            if const:
+                if constantValue(const) != 0:
+                    return tacGenerator.TAC_JumpInst(label)
+                return None
+
+    return i
+
+#PROPAGATION
+
+def replaceUses(i, replace):
+    #every operand i reads as a value, pointers that are dereferenced and
+    #the source of GetAddress are left alone
+    match i:
+        case tacGenerator.TAC_BinaryInstruction():
+            i.src1 = replace(i.src1)
+            i.src2 = replace(i.src2)
+
+        case tacGenerator.TAC_UnaryInstruction() | tacGenerator.TAC_CopyInstruction() | tacGenerator.TAC_signExtendInstruction() | tacGenerator.TAC_zeroExtendInstruction() | tacGenerator.TAC_truncateInstruction() | tacGenerator.TAC_IntToDouble() | tacGenerator.TAC_UIntToDouble() | tacGenerator.TAC_DoubleToInt() | tacGenerator.TAC_DoubleToUInt() | tacGenerator.TAC_copyToOffset() | tacGenerator.TAC_Store():
+            i.src = replace(i.src)
+
+        case tacGenerator.TAC_returnInstruction():
+            i.Value = replace(i.Value)
+
+        case tacGenerator.TAC_JumpIfZeroInst() | tacGenerator.TAC_JumpIfNotZeroInst():
+            i.condition = replace(i.condition)
+
+        case tacGenerator.TAC_FunCallInstruction():
+            i.arguments = [replace(argument) for argument in i.arguments]
+
+        case tacGenerator.TAC_addPtr():
+            i.index = replace(i.index)
+
+def definedVariable(i, symbolTable):
+    #the variable i writes, stores through pointers don't count
+    match i:
+        case tacGenerator.TAC_copyToOffset(dst = dst):
+            return dst
+        case tacGenerator.TAC_Store() | tacGenerator.TAC_returnInstruction() | tacGenerator.TAC_JumpInst() | tacGenerator.TAC_JumpIfZeroInst() | tacGenerator.TAC_JumpIfNotZeroInst() | tacGenerator.TAC_LabelInst():
+            return None
+        case tacGenerator.TAC_FunCallInstruction(dst = dst):
+            if dst == None:
+                return None
+            return dst.identifier
+    return i.dst.identifier
+
+def foldFunction(function, symbolTable):
+    aliased = set()
+    for i in function.instructions:
+        match i:
+            case tacGenerator.TAC_GetAddress(src = tacGenerator.TAC_VariableValue(identifier = identifier)):
+                aliased.add(identifier)
+
+    def isTracked(name):
+        entry = symbolTable[name]
+        return type(entry.attrs) == typeChecker.LocalAttributes and name not in aliased and makeConstant(entry.type, 0) != None
+
+    known = {}
+
+    def replace(value):
+        match value:
+            case tacGenerator.TAC_VariableValue(identifier = identifier):
+                if identifier in known:
+                    return tacGenerator.TAC_ConstantValue(known[identifier])
+        return value
+
+    folded = 0
+    newList = []
+    for i in function.instructions:
+        #a label is a join point, other paths may bring other values
+        if type(i) == tacGenerator.TAC_LabelInst:
+            known = {}
+            newList.append(i)
+            continue
+
+        replaceUses(i, replace)
+
+        new = foldInstruction(i, symbolTable)
+        if new is not i:
+            folded += 1
+        if new == None:
+            continue
+
+        dst = definedVariable(new, symbolTable)
+        if dst != None:
+            known.pop(dst, None)
+
+            const = None
+            match new:
+                case tacGenerator.TAC_CopyInstruction(src = src):
+                    const = getConstant(src)
+                case tacGenerator.TAC_copyToOffset(src = src, offset = 0):
+                    const = getConstant(src)
+
+            if const and isTracked(dst):
+                known[dst] = makeConstant(symbolTable[dst].type, constantValue(const))
+
+        newList.append(new)
+
+    function.instructions = newList
+
+    log.debug("function {0}: {1} instructions folded", function.identifier, folded)
+
+    return folded
+
+def foldConstants(tac, symbolTable):
+    folded = 0
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef():
+                folded += foldFunction(topLevel, symbolTable)
+
+    return folded > 0
@@ -0,0 +1,238 @@
+from enum import Enum
+from collections import deque
+import tacGenerator
+import diagnostics
+
+log = diagnostics.getLogger("controlFlowGraph")
+
+#Control flow graph of a TAC function and an iterative dataflow solver for
+#the optimization passes.
+#
+#A block starts at a label or after a jump or return and ends at a jump or
+#a return. The ENTRY and EXIT nodes have no instructions, ENTRY goes to
+#the first block and every return goes to EXIT. A pass that edits the
+#instructions of the blocks calls rebuild() to get the edges right again.
+
+ENTRY = "entry"
+EXIT = "exit"
+
+class BasicBlock:
+    def __init__(self, id, instructions, predecessors = None, successors = None):
+        self.id = id
+        self.instructions = instructions
+        self.predecessors = predecessors if predecessors else []
+        self.successors = successors if successors else []
+
+    def __str__(self):
+        return "Block {self.id} pred: {self.predecessors} succ: {self.successors} instructions:{self.instructions}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+class ControlFlowGraph:
+    def __init__(self, instructions):
+        self.blocks = {}
+        self.build(instructions)
+
+    def __str__(self):
+        return "CFG:{0}".format(list(self.blocks.values()))
+
+    def __repr__(self):
+        return self.__str__()
+
+    def build(self, instructions):
+        self.blocks = {ENTRY : BasicBlock(ENTRY, [])}
+
+        current = []
+        for i in instructions:
+            match i:
+                case tacGenerator.TAC_LabelInst():
+                    if current:
+                        self.addBlock(current)
+                    current = [i]
+
+                case tacGenerator.TAC_JumpInst() | tacGenerator.TAC_JumpIfZeroInst() | tacGenerator.TAC_JumpIfNotZeroInst() | tacGenerator.TAC_returnInstruction():
+                    current.append(i)
+                    self.addBlock(current)
+                    current = []
+
+                case _:
+                    current.append(i)
+
+        if current:
+            self.addBlock(current)
+
+        self.blocks[EXIT] = BasicBlock(EXIT, [])
+
+        self.addEdges()
+
+    def addBlock(self, instructions):
+        id = len(self.blocks) - 1
+        self.blocks[id] = BasicBlock(id, instructions)
+
+    def addEdge(self, fromId, toId):
+        self.blocks[fromId].successors.append(toId)
+        self.blocks[toId].predecessors.append(fromId)
+
+    def addEdges(self):
+        ids = [id for id in self.blocks if id != ENTRY and id != EXIT]
+
+        labelBlock = {}
+        for id in ids:
+            first = self.blocks[id].instructions[0]
+            if type(first) == tacGenerator.TAC_LabelInst:
+                labelBlock[first.identifier] = id
+
+        self.addEdge(ENTRY, ids[0] if ids else EXIT)
+
+        for index, id in enumerate(ids):
+            next = ids[index + 1] if index + 1 < len(ids) else EXIT
+
+            match self.blocks[id].instructions[-1]:
+                case tacGenerator.TAC_returnInstruction():
+                    self.addEdge(id, EXIT)
+
+                case tacGenerator.TAC_JumpInst(label = label):
+                    self.addEdge(id, labelBlock[label])
+
+                case tacGenerator.TAC_JumpIfZeroInst(label = label) | tacGenerator.TAC_JumpIfNotZeroInst(label = label):
+                    self.addEdge(id, labelBlock[label])
+                    if next != labelBlock[label]:
+                        self.addEdge(id, next)
+
+                case _:
+                    self.addEdge(id, next)
+
+    def basicBlocks(self):
+        #every block but ENTRY and EXIT, in program order
+        return [block for id, block in self.blocks.items() if id != ENTRY and id != EXIT]
+
+    def toInstructions(self):
+        instructions = []
+        for block in self.basicBlocks():
+            instructions.extend(block.instructions)
+        return instructions
+
+    def rebuild(self):
+        self.build(self.toInstructions())
+
+    def postorder(self):
+        #blocks reachable from ENTRY, every block after its successors
+        order = []
+        visited = {ENTRY}
+        stack = [(ENTRY, iter(self.blocks[ENTRY].successors))]
+
+        while stack:
+            id, successors = stack[-1]
+            for successor in successors:
+                if successor not in visited:
+                    visited.add(successor)
+                    stack.append((successor, iter(self.blocks[successor].successors)))
+                    break
+            else:
+                stack.pop()
+                order.append(id)
+
+        return order
+
+    def reachable(self):
+        return set(self.postorder())
+
+def buildCFG(instructions):
+    return ControlFlowGraph(instructions)
+
+#DATAFLOW
+
+class Direction(Enum):
+    FORWARD = 0
+    BACKWARD = 1
+
+class DataflowResult:
+    def __init__(self, direction, blockIn, blockOut):
+        self.direction = direction
+        #for a forward analysis blockIn is the value at the start of the
+        #block, for a backward one the value at its end, blockOut the other
+        self.blockIn = blockIn
+        self.blockOut = blockOut
+
+    def __str__(self):
+        return "Dataflow {self.direction.name} in: {self.blockIn} out: {self.blockOut}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+def transferBlock(block, value, direction, transfer):
+    instructions = block.instructions if direction == Direction.FORWARD else reversed(block.instructions)
+    for i in instructions:
+        value = transfer(i, value)
+    return value
+
+def solveDataflow(cfg, direction, boundary, top, meet, transfer, blockTransfer = None):
+    #iterative worklist solver. boundary is the value leaving ENTRY (forward)
+    #or EXIT (backward), top the starting value of every other block, meet
+    #joins the values of a list of neighbours and transfer(i, value) steps
+    #over a single instruction. meet may get an empty list for a block
+    #nothing reaches. blockTransfer(block, value), when given, steps over a
+    #whole block at once so the pass can work on a mutable value inside it
+    order = list(reversed(cfg.postorder())) if direction == Direction.FORWARD else cfg.postorder()
+    reached = set(order)
+    order += [id for id in cfg.blocks if id not in reached]
+
+    start = ENTRY if direction == Direction.FORWARD else EXIT
+
+    blockIn = {}
+    blockOut = {id : top for id in cfg.blocks}
+    blockOut[start] = boundary
+
+    def neighbours(block):
+        return block.predecessors if direction == Direction.FORWARD else block.successors
+
+    def dependents(block):
+        return block.successors if direction == Direction.FORWARD else block.predecessors
+
+    worklist = deque(id for id in order if id != start)
+    pending = set(worklist)
+    rounds = 0
+
+    while worklist:
+        id = worklist.popleft()
+        pending.discard(id)
+        block = cfg.blocks[id]
+        rounds += 1
+
+        blockIn[id] = meet([blockOut[n] for n in neighbours(block)])
+        if blockTransfer:
+            value = blockTransfer(block, blockIn[id])
+        else:
+            value = transferBlock(block, blockIn[id], direction, transfer)
+
+        if value != blockOut[id]:
+            blockOut[id] = value
+            for d in dependents(block):
+                if d not in pending and d != start:
+                    pending.add(d)
+                    worklist.append(d)
+
+    blockIn[start] = boundary
+
+    log.debug("{0} dataflow over {1} blocks in {2} steps", direction.name, len(cfg.blocks), rounds)
+
+    return DataflowResult(direction, blockIn, blockOut)
+
+def instructionFacts(block, result, transfer):
+    #the value right before every instruction of block for a forward
+    #analysis, right after it for a backward one
+    facts = []
+    value = result.blockIn[block.id]
+
+    if result.direction == Direction.FORWARD:
+        for i in block.instructions:
+            facts.append(value)
+            value = transfer(i, value)
+    else:
+        for i in reversed(block.instructions):
+            facts.append(value)
+            value = transfer(i, value)
+        facts.reverse()
+
+    return facts
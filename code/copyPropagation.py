@@ -0,0 +1,210 @@
+import typeChecker
+import tacGenerator
+import controlFlowGraph
+import constantFolding
+import diagnostics
+
+log = diagnostics.getLogger("copyPropagation")
+
+#Copy propagation over TAC. A forward dataflow analysis finds the copies
+#dst = src that reach every instruction on all paths, uses of dst are then
+#replaced with src and copies that are already known to hold go away.
+#
+#Static variables and the ones whose address is taken can change through
+#a call or a store, copies to or from them don't survive those. Copies
+#between different types (int and unsigned int share a size) are never
+#propagated, the backend picks signedness from the operand types.
+
+def valueKey(value):
+    match value:
+        case tacGenerator.TAC_VariableValue(identifier = identifier):
+            return ("var", identifier)
+        case tacGenerator.TAC_ConstantValue(const = const):
+            #repr keeps -0.0 and 0.0 apart
+            return (type(const).__name__, repr(constantFolding.constantValue(const)))
+    return None
+
+def meet(values):
+    #None stands for every copy, the value of a block nothing reached yet
+    result = None
+    for value in values:
+        if value == None:
+            continue
+        result = value if result == None else result & value
+    return result if result != None else frozenset()
+
+class ReachingCopies:
+    #the copies reaching a point as dst -> key of src, with an index from
+    #every source variable to the copies out of it so a kill doesn't look
+    #at every copy
+    def __init__(self, copies = frozenset()):
+        self.copies = {}
+        self.bySource = {}
+        for dst, key in copies:
+            self.add(dst, key)
+
+    def __str__(self):
+        return "ReachingCopies:{self.copies}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def add(self, dst, key):
+        self.copies[dst] = key
+        if key[0] == "var":
+            self.bySource.setdefault(key[1], set()).add(dst)
+
+    def kill(self, name):
+        #every copy to or from name
+        key = self.copies.pop(name, None)
+        if key != None and key[0] == "var":
+            self.bySource[key[1]].discard(name)
+
+        for dst in self.bySource.pop(name, ()):
+            del self.copies[dst]
+
+    def frozen(self):
+        return frozenset(self.copies.items())
+
+class CopyAnalysis:
+    def __init__(self, function, symbolTable):
+        self.symbolTable = symbolTable
+        #the TAC value behind every key, to put it back in the code
+        self.values = {}
+
+        self.aliased = set()
+        for i in function.instructions:
+            match i:
+                case tacGenerator.TAC_GetAddress(src = tacGenerator.TAC_VariableValue(identifier = identifier)):
+                    self.aliased.add(identifier)
+
+        for i in function.instructions:
+            for name in self.variables(i):
+                if type(symbolTable[name].attrs) == typeChecker.StaticAttributes:
+                    self.aliased.add(name)
+
+    def variables(self, i):
+        names = []
+        for value in [getattr(i, field, None) for field in ["src", "src1", "src2", "dst"]] + (i.arguments if type(i) == tacGenerator.TAC_FunCallInstruction else []):
+            if type(value) == tacGenerator.TAC_VariableValue:
+                names.append(value.identifier)
+        return names
+
+    def canPropagate(self, src, dst):
+        dstType = self.symbolTable[dst].type
+        match src:
+            case tacGenerator.TAC_VariableValue(identifier = identifier):
+                return identifier != dst and self.symbolTable[identifier].type.checkType(dstType)
+            case tacGenerator.TAC_ConstantValue(const = const):
+                return constantFolding.getConstant(src) != None and type(const) == type(constantFolding.makeConstant(dstType, 0))
+        return False
+
+    def step(self, i, copies):
+        #copies is a ReachingCopies, it goes from before i to after i
+        match i:
+            case tacGenerator.TAC_CopyInstruction(src = src, dst = dst):
+                key = valueKey(src)
+                if copies.copies.get(dst.identifier) == key:
+                    return
+
+                copies.kill(dst.identifier)
+                if self.canPropagate(src, dst.identifier):
+                    self.values[key] = src
+                    copies.add(dst.identifier, key)
+                return
+
+            case tacGenerator.TAC_FunCallInstruction(dst = dst):
+                for name in self.aliased:
+                    copies.kill(name)
+                if dst != None:
+                    copies.kill(dst.identifier)
+                return
+
+            case tacGenerator.TAC_Store():
+                for name in self.aliased:
+                    copies.kill(name)
+                return
+
+        dst = constantFolding.definedVariable(i, self.symbolTable)
+        if dst != None:
+            copies.kill(dst)
+
+    def transfer(self, i, copies):
+        copies = ReachingCopies(copies)
+        self.step(i, copies)
+        return copies.frozen()
+
+    def blockTransfer(self, block, copies):
+        copies = ReachingCopies(copies)
+        for i in block.instructions:
+            self.step(i, copies)
+        return copies.frozen()
+
+def replacePointers(i, replace):
+    #pointer operands only take variables, the backend wants them in memory
+    #or a register
+    def replaceVariable(value):
+        new = replace(value)
+        return new if type(new) == tacGenerator.TAC_VariableValue else value
+
+    match i:
+        case tacGenerator.TAC_Load():
+            i.src = replaceVariable(i.src)
+        case tacGenerator.TAC_Store():
+            i.dst = replaceVariable(i.dst)
+        case tacGenerator.TAC_addPtr():
+            i.ptr = replaceVariable(i.ptr)
+
+def propagateFunction(function, symbolTable):
+    analysis = CopyAnalysis(function, symbolTable)
+
+    cfg = controlFlowGraph.buildCFG(function.instructions)
+    result = controlFlowGraph.solveDataflow(cfg, controlFlowGraph.Direction.FORWARD, frozenset(), None, meet, analysis.transfer, analysis.blockTransfer)
+
+    replaced = 0
+    removed = 0
+
+    for block in cfg.basicBlocks():
+        copies = ReachingCopies(result.blockIn[block.id])
+        reaching = copies.copies
+        instructions = []
+
+        for i in block.instructions:
+            if type(i) == tacGenerator.TAC_CopyInstruction:
+                #dst already holds src, or src holds dst
+                srcKey = valueKey(i.src)
+                if reaching.get(i.dst.identifier) == srcKey or (srcKey[0] == "var" and reaching.get(srcKey[1]) == ("var", i.dst.identifier)):
+                    removed += 1
+                    continue
+
+            def replace(value):
+                nonlocal replaced
+                if type(value) == tacGenerator.TAC_VariableValue and value.identifier in reaching:
+                    replaced += 1
+                    new = analysis.values[reaching[value.identifier]]
+                    if type(new) == tacGenerator.TAC_VariableValue:
+                        return tacGenerator.TAC_VariableValue(new.identifier)
+                    return new
+                return value
+
+            constantFolding.replaceUses(i, replace)
+            replacePointers(i, replace)
+            analysis.step(i, copies)
+            instructions.append(i)
+
+        block.instructions = instructions
+
+    function.instructions = cfg.toInstructions()
+
+    log.debug("function {0}: {1} uses replaced, {2} copies removed", function.identifier, replaced, removed)
+
+    return replaced + removed > 0
+
+def propagateCopies(tac, symbolTable):
+    changed = False
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef():
+                changed = propagateFunction(topLevel, symbolTable) or changed
+
+    return changed
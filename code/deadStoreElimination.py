@@ -0,0 +1,133 @@
+import typeChecker
+import tacGenerator
+import controlFlowGraph
+import constantFolding
+import copyPropagation
+import diagnostics
+
+log = diagnostics.getLogger("deadStoreElimination")
+
+#Dead store elimination over TAC. A backward liveness analysis finds the
+#variables that may still be read after every instruction and removes the
+#ones without side effects whose destination is dead.
+#
+#Calls and stores always stay. A call or a load through a pointer may read
+#any static variable or any variable whose address is taken, statics are
+#also live when the function returns.
+
+def usedVariables(i):
+    names = []
+
+    def collect(value):
+        if type(value) == tacGenerator.TAC_VariableValue:
+            names.append(value.identifier)
+        return value
+
+    constantFolding.replaceUses(i, collect)
+    copyPropagation.replacePointers(i, collect)
+    return names
+
+def hasSideEffects(i):
+    match i:
+        case tacGenerator.TAC_FunCallInstruction() | tacGenerator.TAC_Store() | tacGenerator.TAC_returnInstruction() | tacGenerator.TAC_JumpInst() | tacGenerator.TAC_JumpIfZeroInst() | tacGenerator.TAC_JumpIfNotZeroInst() | tacGenerator.TAC_LabelInst():
+            return True
+    return False
+
+class LivenessAnalysis:
+    def __init__(self, function, symbolTable):
+        self.symbolTable = symbolTable
+
+        self.statics = set()
+        self.aliased = set()
+        for i in function.instructions:
+            for name in usedVariables(i) + [constantFolding.definedVariable(i, symbolTable)]:
+                if name != None and type(symbolTable[name].attrs) == typeChecker.StaticAttributes:
+                    self.statics.add(name)
+
+            match i:
+                case tacGenerator.TAC_GetAddress(src = tacGenerator.TAC_VariableValue(identifier = identifier)):
+                    self.aliased.add(identifier)
+
+        self.aliased |= self.statics
+
+    def step(self, i, live):
+        #live is a mutable set, it goes from after i to before i
+        uses = usedVariables(i)
+
+        match i:
+            case tacGenerator.TAC_FunCallInstruction(dst = dst):
+                if dst != None:
+                    live.discard(dst.identifier)
+                live.update(uses)
+                live.update(self.aliased)
+                return
+
+            case tacGenerator.TAC_Load(dst = dst):
+                live.discard(dst.identifier)
+                live.update(uses)
+                live.update(self.aliased)
+                return
+
+            case tacGenerator.TAC_copyToOffset():
+                #only part of the array is written
+                live.update(uses)
+                return
+
+        dst = constantFolding.definedVariable(i, self.symbolTable)
+        if dst != None:
+            live.discard(dst)
+        live.update(uses)
+
+    def transfer(self, i, live):
+        live = set(live)
+        self.step(i, live)
+        return frozenset(live)
+
+    def blockTransfer(self, block, live):
+        live = set(live)
+        for i in reversed(block.instructions):
+            self.step(i, live)
+        return frozenset(live)
+
+def meet(values):
+    return frozenset().union(*values)
+
+def eliminateFunction(function, symbolTable):
+    analysis = LivenessAnalysis(function, symbolTable)
+
+    cfg = controlFlowGraph.buildCFG(function.instructions)
+    result = controlFlowGraph.solveDataflow(cfg, controlFlowGraph.Direction.BACKWARD, frozenset(analysis.statics), frozenset(), meet, analysis.transfer, analysis.blockTransfer)
+
+    removed = 0
+    for block in cfg.basicBlocks():
+        live = set(result.blockIn[block.id])
+        instructions = []
+
+        #a removed instruction doesn't use anything, so whole chains of dead
+        #code go in one pass
+        for i in reversed(block.instructions):
+            dst = constantFolding.definedVariable(i, symbolTable)
+            if dst != None and not hasSideEffects(i) and dst not in live:
+                removed += 1
+                continue
+
+            analysis.step(i, live)
+            instructions.append(i)
+
+        instructions.reverse()
+        block.instructions = instructions
+
+    function.instructions = cfg.toInstructions()
+
+    log.debug("function {0}: {1} dead stores removed", function.identifier, removed)
+
+    return removed > 0
+
+def eliminateDeadStores(tac, symbolTable):
+    changed = False
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef():
+                changed = eliminateFunction(topLevel, symbolTable) or changed
+
+    return changed
@@ -0,0 +1,85 @@
+import sys
+from enum import IntEnum
+
+#Leveled debug output for the compiler passes. Every module gets its own
+#logger, all of them are QUIET unless the driver turns them up:
+#
+#   --log=debug                      every pass at DEBUG
+#   --log=parser:dump,tacGenerator   parser at DUMP, tacGenerator at DEBUG
+#
+#Messages are only formatted when their level is enabled, dumps take a
+#function so the printNode()/str() of a whole program is never built
+#when nobody reads it.
+
+class Level(IntEnum):
+    QUIET = 0
+    INFO = 1
+    DEBUG = 2
+    DUMP = 3
+
+loggers = {}
+
+#level for loggers created after configure()
+defaultLevel = Level.QUIET
+
+class Logger:
+    def __init__(self, name, level=Level.QUIET):
+        self.name = name
+        self.level = level
+
+    def __str__(self):
+        return "Logger {self.name}: {self.level.name}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def enabled(self, level):
+        return self.level >= level
+
+    def write(self, level, message, args):
+        if self.level >= level:
+            if args:
+                message = message.format(*args)
+            print("[{0}] {1}".format(self.name, message), file=sys.stderr)
+
+    def info(self, message, *args):
+        self.write(Level.INFO, message, args)
+
+    def debug(self, message, *args):
+        self.write(Level.DEBUG, message, args)
+
+    def dump(self, title, makeText):
+        if self.level >= Level.DUMP:
+            print("[{0}] {1}:\n{2}".format(self.name, title, makeText()), file=sys.stderr)
+
+def getLogger(name):
+    if name not in loggers:
+        loggers[name] = Logger(name, defaultLevel)
+    return loggers[name]
+
+def parseLevel(text):
+    if text.upper() not in Level.__members__:
+        print("Error: Invalid log level {0}.".format(text))
+        sys.exit(1)
+    return Level[text.upper()]
+
+def configure(spec):
+    global defaultLevel
+
+    #spec is a comma separated list of level, name or name:level, a bare
+    #level applies to every pass and the named ones override it
+    items = [item for item in spec.split(",") if item != ""]
+
+    for item in items:
+        if item.upper() in Level.__members__:
+            defaultLevel = parseLevel(item)
+            for logger in loggers.values():
+                logger.level = defaultLevel
+
+    for item in items:
+        if ":" in item:
+            name, levelText = item.split(":", 1)
+            getLogger(name).level = parseLevel(levelText)
+
+        elif item.upper() not in Level.__members__:
+            getLogger(item).level = Level.DEBUG
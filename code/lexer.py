@@ -2,6 +2,9 @@ import sys
 import os
 import re
 from enum import Enum
+import diagnostics
+
+log = diagnostics.getLogger("lexer")
 #from cd import printDebugInfo
 
 class TokenType(Enum):
@@ -60,349 +63,150 @@ class TokenType(Enum):
     CHAR_CONST = 53
     STRING_LITERAL = 54
 
+keywords = {
+    "char" : TokenType.CHAR_KW,
+    "double" : TokenType.DOUBLE_KW,
+    "unsigned" : TokenType.UNSIGNED_KW,
+    "signed" : TokenType.SIGNED_KW,
+    "long" : TokenType.LONG_KW,
+    "extern" : TokenType.EXTERN_KW,
+    "static" : TokenType.STATIC_KW,
+    "if" : TokenType.IF_KW,
+    "else" : TokenType.ELSE_KW,
+    "do" : TokenType.DO_KW,
+    "while" : TokenType.WHILE_KW,
+    "for" : TokenType.FOR_KW,
+    "break" : TokenType.BREAK_KW,
+    "continue" : TokenType.CONTINUE_KW,
+    "int" : TokenType.INT_KW,
+    "void" : TokenType.VOID_KW,
+    "return" : TokenType.RETURN_KW
+    }
+
+punctuators = {
+    "--" : TokenType.TWOHYPHENS,
+    "&&" : TokenType.TAMPERSANDS,
+    "||" : TokenType.TVERTICALB,
+    "==" : TokenType.TEQUALS,
+    "!=" : TokenType.EXCLAMATIONEQUAL,
+    "<=" : TokenType.LESSTEQUALT,
+    ">=" : TokenType.GREATERTEQUALT,
+    "[" : TokenType.OPEN_BRACKET,
+    "]" : TokenType.CLOSE_BRACKET,
+    "&" : TokenType.AMPERSAND,
+    "," : TokenType.COMMA,
+    "?" : TokenType.QUESTION_MARK,
+    ":" : TokenType.COLON,
+    "(" : TokenType.OPEN_PAREN,
+    ")" : TokenType.CLOSE_PAREN,
+    "{" : TokenType.OPEN_BRACE,
+    "}" : TokenType.CLOSE_BRACE,
+    ";" : TokenType.SEMICOLON,
+    "~" : TokenType.TILDE,
+    "-" : TokenType.HYPHEN,
+    "/" : TokenType.FORWARD_SLASH,
+    "*" : TokenType.ASTERISK,
+    "%" : TokenType.PERCENT,
+    "+" : TokenType.PLUS,
+    "!" : TokenType.EXCLAMATION,
+    ">" : TokenType.GREATERT,
+    "<" : TokenType.LESST,
+    "=" : TokenType.EQUAL
+    }
+
+escapeSequences = {
+    '\'' : '\'',
+    '\"' : '\"',
+    '?' : '?',
+    '\\' : '\\',
+    'a' : '\a',
+    'b' : '\b',
+    'f' : '\f',
+    'n' : '\n',
+    'r' : '\r',
+    't' : '\t',
+    'v' : '\v'
+    }
+
+#NOTE: the alternatives are tried left to right, so this order is the same 
+#order the old lexer used when it tried one re.match after the other.
+#Numeric constants can't be followed by a letter, digit or a dot.
+masterPattern = re.compile(r"""
+    (?P<WSPACE>\s+)
+    |(?P<DOUBLE_CONSTANT>(?:(?:[0-9]*\.[0-9]+|[0-9]+\.?)[Ee][+-]?[0-9]+|[0-9]*\.[0-9]+|[0-9]+\.)(?=[^\w.]))
+    |(?P<ULONG_CONSTANT>[0-9]+(?:[uU][lL]|[lL][uU])(?=[^\w.]))
+    |(?P<UINT_CONSTANT>[0-9]+[uU](?=[^\w.]))
+    |(?P<LONG_CONSTANT>[0-9]+[lL](?=[^\w.]))
+    |(?P<INT_CONSTANT>[0-9]+(?=[^\w.]))
+    |(?P<TWO_CHAR>--|&&|\|\||==|!=|<=|>=)
+    |(?P<STRING_LITERAL>"(?:[^"\\\n]|\\['"\\?abfnrtv])*")
+    |(?P<CHAR_CONST>'(?:[^'\\\n]|\\['"?\\abfnrtv])')
+    |(?P<IDENTIFIER>[a-zA-Z_]\w*\b)
+    |(?P<ONE_CHAR>[\[\]&,?:=><!%/*+(){};~-])
+    """, re.VERBOSE)
+
+escapePattern = re.compile(r"\\(.)")
+
+def unescape(sliced):
+    return escapePattern.sub(lambda m: escapeSequences[m.group(1)], sliced)
+
 def Lex(buffer, iFile):
     tokenList = []
     LineNumber = 1
 
-    while buffer != r'':
-        #breakpoint()
-
-        #print(buffer)
-
-        is_wspace = r"\s+"
-        wspace = re.match(is_wspace, buffer)
-        if wspace:
-            
-            is_newline = re.match(r"[\s]*\n[\s]*",wspace.group())
-            if is_newline:
-                LineNumber += 1
-            
-            #print(LineNumber)
-            buffer = wspace.string[wspace.span()[1]:]
-        
-        is_floatingPoint = r"(([0-9]*\.[0-9]+|[0-9]+\.?)[Ee][+-]?[0-9]+|[0-9]*\.[0-9]+|[0-9]+\.)[^\w.]"
-        floatingPoint = re.match(is_floatingPoint, buffer)
-        if floatingPoint:
-            is_floatingPoint = r"(([0-9]*\.[0-9]+|[0-9]+\.?)[Ee][+-]?[0-9]+|[0-9]*\.[0-9]+|[0-9]+\.)"
-            floatingPoint = re.match(is_floatingPoint, buffer)
-            if floatingPoint:
-                #print(floatingPoint.group())
-                tokenList.append((floatingPoint.group(), TokenType.DOUBLE_CONSTANT, LineNumber))
-                buffer = floatingPoint.string[floatingPoint.span()[1]:]
-                continue
-        
-        is_unsignedLong = r"([0-9]+([uU][lL]|[lL][uU]))[^\w.]"
-        unsignedLong = re.match(is_unsignedLong, buffer)
-        if unsignedLong:
-
-            is_unsignedLong = r"([0-9]+([uU][lL]|[lL][uU]))"
-            unsignedLong = re.match(is_unsignedLong, buffer)
-            if unsignedLong:
-                tokenList.append((unsignedLong.group(), TokenType.ULONG_CONSTANT, LineNumber))
-
-                buffer = unsignedLong.string[unsignedLong.span()[1]:]
-                continue
-        
-        is_unsigned = r"([0-9]+[uU])[^\w.]"
-        unsigned = re.match(is_unsigned, buffer)
-        if unsigned:
-            is_unsigned = r"([0-9]+[uU])"
-            unsigned = re.match(is_unsigned, buffer)
-            if unsigned:
-                tokenList.append((unsigned.group(), TokenType.UINT_CONSTANT, LineNumber))
-
-                buffer = unsigned.string[unsigned.span()[1]:]
-                continue
-        
-
-        is_long = r"([0-9]+[lL])[^\w.]"
-        long = re.match(is_long, buffer)
-        if long:
-            is_long = r"([0-9]+[lL])"
-            long = re.match(is_long, buffer)
-            if long:
-                tokenList.append((long.group(), TokenType.LONG_CONSTANT, LineNumber))
-                buffer = long.string[long.span()[1]:]
-                continue
-
-        is_int = r"([0-9]+)[^\w.]"
-        int = re.match(is_int, buffer)
-        if int:
-            is_int = r"([0-9]+)"
-            int = re.match(is_int, buffer)
-            if int:
-                tokenList.append((int.group(), TokenType.INT_CONSTANT, LineNumber))
-
-                buffer = int.string[int.span()[1]:]
-                continue
-        
-
-        mList = [
-            (r"--", TokenType.TWOHYPHENS), 
-            (r"&&", TokenType.TAMPERSANDS), 
-            (r"\|\|", TokenType.TVERTICALB), 
-            (r"==", TokenType.TEQUALS), 
-            (r"!=", TokenType.EXCLAMATIONEQUAL), 
-            (r"<=", TokenType.LESSTEQUALT), 
-            (r">=", TokenType.GREATERTEQUALT)
-            ]
-
-        dd = None
-
-        for i in mList:
-            dd = re.match(i[0], buffer)
-            if dd:
-                
-                tokenList.append((dd.group(), i[1], LineNumber))
-                buffer = dd.string[dd.span()[1]:]
-            
-                break
-                    
-        if dd:
-            continue
-
-        isStringLiteral = r"\"([^\"\\\n]|\\[\'\"\\\?abfnrtv])*\""
-        sl = re.match(isStringLiteral, buffer)
-        if sl:
-            """
-            """
-            sliced = sl.group()[1:len(sl.group())-1]
-            lSliced = list(sliced)
-            
-            unScapedL = []
-            print(lSliced)
-
-            while lSliced != []:
-                value = None
-                char = lSliced.pop(0)
-                match char:
-                    case '\\':
-                        char = lSliced.pop(0) 
-                        match char:
-                            case '\'':
-                                value = '\''
-                            case '\"':
-                                value = '\"'
-                            case '?':
-                                value = '?'
-                            case '\\':
-                                value = '\\'
-                            case 'a':
-                                value = '\a'
-                            case 'b':
-                                value = '\b'
-                            case 'f':
-                                value = '\f'
-                            case 'n':
-                                value = '\n'
-                            case 'r':
-                                value = '\r'
-                            case 't':
-                                value = '\t'
-                            case 'v':
-                                value = '\v' 
-                    case _:
-                        value = char
-                
-                unScapedL.append(value)
-            
-            print(unScapedL)
-
-            a = "".join(unScapedL)
-            print(a)
-            tokenList.append((a, TokenType.STRING_LITERAL, LineNumber))
-            buffer = sl.string[sl.span()[1]:]
-            continue
-
-        isCharacterConstant = r"\'([^\'\\\n]|\\[\'\"\?\\abfnrtv])\'"
-        cc = re.match(isCharacterConstant, buffer)
-        if cc:
-            sliced = cc.group()[1:len(cc.group())-1]
-            #print(sliced)
-            asciiValue = None
-            #ale = "Ale\n"
-            #print(ale)
-            match sliced[0]:
-                case '\\':
-                    match sliced[1]:
-                        case '\'':
-                            asciiValue = ord('\'')
-                        case '\"':
-                            asciiValue = ord('\"')
-                        case '?':
-                            asciiValue = ord('?')
-                        case '\\':
-                            asciiValue = ord('\\')
-                        case 'a':
-                            asciiValue = ord('\a')
-                        case 'b':
-                            asciiValue = ord('\b')
-                        case 'f':
-                            asciiValue = ord('\f')
-                        case 'n':
-                            asciiValue = ord('\n')
-                        case 'r':
-                            asciiValue = ord('\r')
-                        case 't':
-                            asciiValue = ord('\t')
-                        case 'v':
-                            asciiValue = ord('\v')
-
-                case _:
-                    asciiValue = ord(sliced[0])
+    pos = 0
+    end = len(buffer)
+    match_ = masterPattern.match
 
-            if asciiValue == None:
-                print("Error invalid token: {0} at Line: {1}".format(buffer, LineNumber))
-                os.remove(iFile)
-                sys.exit(1)
-
-            tokenList.append((asciiValue, TokenType.INT_CONSTANT, LineNumber))
-            buffer = cc.string[cc.span()[1]:]
-            continue
+    while pos < end:
+        m = match_(buffer, pos)
 
+        if m == None:
+            #raise Exception("Error invalid token: {0}".format(buffer))
+            print("Error invalid token: {0} at Line: {1}".format(buffer[pos:], LineNumber))
+            os.remove(iFile)
+            sys.exit(1)
 
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group(kind)
 
-        is_alphanumeric = r"[a-zA-Z_]\w*\b"
-        alphanumeric = re.match(is_alphanumeric, buffer)
-        if alphanumeric:
+        match kind:
+            case "WSPACE":
+                if '\n' in text:
+                    LineNumber += 1
             
-            match alphanumeric.group():
-                
-                case "char":
-                    tokenList.append(("char", TokenType.CHAR_KW, LineNumber))
-
-                case "double":
-                    tokenList.append(("double", TokenType.DOUBLE_KW, LineNumber))
-
-                case "unsigned":
-                    tokenList.append(("unsigned", TokenType.UNSIGNED_KW, LineNumber))
-
-                case "signed":
-                    tokenList.append(("signed", TokenType.SIGNED_KW, LineNumber))
-
-                case "long":
-                    tokenList.append(("long", TokenType.LONG_KW, LineNumber))
-
-                case "extern":
-                    tokenList.append(("extern", TokenType.EXTERN_KW, LineNumber))
-
-                case "static":
-                    tokenList.append(("static", TokenType.STATIC_KW, LineNumber))
-
-                case "if":
-                    tokenList.append(("if", TokenType.IF_KW, LineNumber))
-
-                case "else":
-                    tokenList.append(("else", TokenType.ELSE_KW, LineNumber))
+            case "IDENTIFIER":
+                tokenList.append((text, keywords.get(text, TokenType.IDENTIFIER), LineNumber))
 
-                case "do":
-                    tokenList.append(("do", TokenType.DO_KW, LineNumber))
+            case "TWO_CHAR" | "ONE_CHAR":
+                tokenList.append((text, punctuators[text], LineNumber))
 
-                case "while":
-                    tokenList.append(("while", TokenType.WHILE_KW, LineNumber))
+            case "INT_CONSTANT":
+                tokenList.append((text, TokenType.INT_CONSTANT, LineNumber))
 
-                case "for":
-                    tokenList.append(("for", TokenType.FOR_KW, LineNumber))
+            case "LONG_CONSTANT":
+                tokenList.append((text, TokenType.LONG_CONSTANT, LineNumber))
 
-                case "break":
-                    tokenList.append(("break", TokenType.BREAK_KW, LineNumber))
+            case "UINT_CONSTANT":
+                tokenList.append((text, TokenType.UINT_CONSTANT, LineNumber))
 
-                case "continue":
-                    tokenList.append(("continue", TokenType.CONTINUE_KW, LineNumber))
+            case "ULONG_CONSTANT":
+                tokenList.append((text, TokenType.ULONG_CONSTANT, LineNumber))
 
-                case "int":
-                    tokenList.append(("int", TokenType.INT_KW, LineNumber))
-                    
-                case "void":
-                    tokenList.append(("void", TokenType.VOID_KW, LineNumber))
-                    
-                case "return":
-                    tokenList.append(("return", TokenType.RETURN_KW, LineNumber))
-                
-                
-                case _:
-                    tokenList.append((alphanumeric.group(), TokenType.IDENTIFIER, LineNumber))
+            case "DOUBLE_CONSTANT":
+                tokenList.append((text, TokenType.DOUBLE_CONSTANT, LineNumber))
 
-            buffer = alphanumeric.string[alphanumeric.span()[1]:]
-            continue
-            #print(buffer)
-        
-        is_char = r"[\[\]&,?:=><!%/*+(){};~-]"
-        char = re.match(is_char, buffer)
-        if char:
-            #print(char)
-            match char.group():
-                
-                case "[":
-                    tokenList.append(("[", TokenType.OPEN_BRACKET, LineNumber))
+            case "STRING_LITERAL":
+                sliced = text[1:len(text)-1]
 
-                case "]":
-                    tokenList.append(("]", TokenType.CLOSE_BRACKET, LineNumber))
+                a = unescape(sliced)
+                log.debug("string literal {0!r} -> {1!r}", sliced, a)
+                tokenList.append((a, TokenType.STRING_LITERAL, LineNumber))
 
-                case "&":
-                    tokenList.append(("&", TokenType.AMPERSAND, LineNumber))
-
-                case ",":
-                    tokenList.append((",", TokenType.COMMA, LineNumber))
-                case "?":
-                    tokenList.append(("?", TokenType.QUESTION_MARK, LineNumber))
-                case ":":
-                    tokenList.append((":", TokenType.COLON, LineNumber))
-                case "(":
-                    tokenList.append(("(", TokenType.OPEN_PAREN, LineNumber))
-                    
-                case ")":
-                    tokenList.append((")", TokenType.CLOSE_PAREN, LineNumber))
-
-                case "{":
-                    tokenList.append(("{", TokenType.OPEN_BRACE, LineNumber))
-                    
-                case "}":
-                    tokenList.append(("}", TokenType.CLOSE_BRACE, LineNumber))
-                    
-                case ";":
-                    tokenList.append((";", TokenType.SEMICOLON, LineNumber))
-
-                case "~":
-                    tokenList.append(("~", TokenType.TILDE, LineNumber))
-
-                case "-":
-                    tokenList.append(("-", TokenType.HYPHEN, LineNumber))
-                    
-                case "/":
-                    tokenList.append(("/", TokenType.FORWARD_SLASH, LineNumber))
-                
-                case "*":
-                    tokenList.append(("*", TokenType.ASTERISK, LineNumber))
-                
-                case "%":
-                    tokenList.append(("%", TokenType.PERCENT, LineNumber))
-
-                case "+":
-                    tokenList.append(("+", TokenType.PLUS, LineNumber))
-                
-                case "!":
-                    tokenList.append(("!", TokenType.EXCLAMATION, LineNumber))
-
-                case ">":
-                    tokenList.append((">", TokenType.GREATERT, LineNumber))
-                
-                case "<":
-                    tokenList.append(("<", TokenType.LESST, LineNumber))
-
-                case "=":
-                    tokenList.append(("=", TokenType.EQUAL, LineNumber))
-
-            #aqui tiene que ser keyword
-            buffer = char.string[char.span()[1]:]
-            continue
-            #print(buffer)
-        
-        if buffer != '':
-            #raise Exception("Error invalid token: {0}".format(buffer))
-            print("Error invalid token: {0} at Line: {1}".format(buffer, LineNumber))
-            os.remove(iFile)
-            sys.exit(1)
+            case "CHAR_CONST":
+                sliced = unescape(text[1:len(text)-1])
+                tokenList.append((ord(sliced), TokenType.INT_CONSTANT, LineNumber))
 
     #aqui termina el while con la lista
     #if printDebugInfo: 
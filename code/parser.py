@@ -4,11 +4,16 @@ from lexer import TokenType
 from enum import Enum
 
 class Node:
+    __slots__ = ()
+
     def printNode(self, level):
         return ""
 
 class Program(Node):
 
+    __slots__ = ('declList',)
+    __match_args__ = ('declList',)
+
     def __init__(self, declList=None):
         self.declList = declList
 
@@ -26,6 +31,9 @@ class Program(Node):
         return output
 
 class Block(Node):
+    __slots__ = ('blockItemList',)
+    __match_args__ = ('blockItemList',)
+
     def __init__(self, blockItemList=None):
         self.blockItemList = blockItemList
     
@@ -33,7 +41,6 @@ class Block(Node):
         return "{self.blockItemList}".format(self=self)
     
     def printNode(self, level):
-        print(level)
         output = ''
         if self.blockItemList:
             for i in self.blockItemList:
@@ -49,9 +56,12 @@ class Block(Node):
         return output
 
 class BlockItem:
-    pass
+    __slots__ = ()
 
 class S(BlockItem, Node):
+    __slots__ = ('statement',)
+    __match_args__ = ('statement',)
+
     def __init__(self, statement):
         self.statement = statement
     
@@ -68,6 +78,9 @@ class S(BlockItem, Node):
         
         
 class D(BlockItem, Node):
+    __slots__ = ('declaration',)
+    __match_args__ = ('declaration',)
+
     def __init__(self, declaration):
         self.declaration = declaration
     
@@ -83,9 +96,12 @@ class D(BlockItem, Node):
         return output
 
 class Decl:
-    pass
+    __slots__ = ()
 
 class VarDecl(Decl, Node):
+    __slots__ = ('variableDecl',)
+    __match_args__ = ('variableDecl',)
+
     def __init__(self, variableDecl):
         self.variableDecl = variableDecl
     
@@ -108,6 +124,9 @@ class VarDecl(Decl, Node):
 
     
 class FunDecl(Decl, Node):
+    __slots__ = ('funDecl',)
+    __match_args__ = ('funDecl',)
+
     def __init__(self, funDecl):
         self.funDecl = funDecl
     
@@ -129,6 +148,9 @@ class FunDecl(Decl, Node):
         return output
 
 class VariableDecl(Node):
+    __slots__ = ('identifier', 'varType', 'initializer', 'storageClass')
+    __match_args__ = ('identifier', 'varType', 'initializer', 'storageClass')
+
     def __init__(self, identifier, varType, initializer=None, storageClass=None):
         self.identifier = identifier
         self.varType = varType 
@@ -156,6 +178,9 @@ class VariableDecl(Node):
 
 
 class FunctionDecl(Node):    
+    __slots__ = ('iden', 'funType', 'paramNames', 'block', 'storageClass')
+    __match_args__ = ('iden', 'funType', 'paramNames', 'block', 'storageClass')
+
     def __init__(self, iden, funType, paramNames, block=None, storageClass=None):
         self.iden = iden
         self.funType = funType
@@ -193,9 +218,12 @@ class FunctionDecl(Node):
         return output
 
 class Initializer(Node):
-    pass
+    __slots__ = ()
 
 class SingleInit(Initializer, Node):
+    __slots__ = ('exp', 'retType')
+    __match_args__ = ('exp', 'retType')
+
     def __init__(self, exp, retType=None):
         self.exp = exp
         self.retType = retType
@@ -221,6 +249,9 @@ def tabLevel(output, level):
     return output
 
 class CompoundInit(Initializer, Node):
+    __slots__ = ('initializerList', 'retType')
+    __match_args__ = ('initializerList', 'retType')
+
     def __init__(self, initializerList, retType=None):
         self.initializerList = initializerList 
         self.retType = retType
@@ -249,13 +280,34 @@ class CompoundInit(Initializer, Node):
         
         return output
 
+#Types are interned, building a type that already exists gives back the
+#same object. The same type is always the same object, so checkType is an
+#identity test and a type costs nothing per node that uses it.
+
+internedTypes = {}
+
+def internType(cls, key):
+    type_ = internedTypes.get(key)
+    if type_ == None:
+        type_ = object.__new__(cls)
+        internedTypes[key] = type_
+    return type_
+
 class Type:
+    __slots__ = ('size',)
+
+    isCharacter = False
+    isInteger = False
+    isArithmetic = False
+
+    def __new__(cls):
+        return internType(cls, cls)
+
     def __init__(self):
         self.size = 0
 
     def checkType(self, other):
-        print("Not Overloaded.")
-        sys.exit(1)
+        return other is self
 
     def getBaseTypeSize(self, occupied):
         pass
@@ -267,7 +319,12 @@ class Type:
         return self.__str__()
 
 class CharType(Type, Node):
-    
+    __slots__ = ('isSigned',)
+
+    isCharacter = True
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 1
@@ -282,14 +339,14 @@ class CharType(Type, Node):
     def printNode(self, level):
         return "char"
     
-    def checkType(self, other):
-        if type(other) == CharType:
-            return True
-
-        return False
-    
 
 class SCharType(Type, Node):
+    __slots__ = ('isSigned',)
+
+    isCharacter = True
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 1
@@ -304,14 +361,14 @@ class SCharType(Type, Node):
     def printNode(self, level):
         return "signed char"
     
-    def checkType(self, other):
-        if type(other) == SCharType:
-            return True
-
-        return False
-    
 
 class UCharType(Type, Node):
+    __slots__ = ('isSigned',)
+
+    isCharacter = True
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 1
@@ -326,14 +383,13 @@ class UCharType(Type, Node):
     def printNode(self, level):
         return "unsigned char"
     
-    def checkType(self, other):
-        if type(other) == UCharType:
-            return True
-
-        return False
-    
 
 class IntType(Type, Node):
+    __slots__ = ('isSigned',)
+
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 4
@@ -348,14 +404,13 @@ class IntType(Type, Node):
     def printNode(self, level):
         return "int"
     
-    def checkType(self, other):
-        if type(other) == IntType:
-            return True
-
-        return False
-    
 
 class LongType(Type, Node):
+    __slots__ = ('isSigned',)
+
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 8
@@ -370,13 +425,13 @@ class LongType(Type, Node):
     def printNode(self, level):
         return "long"
     
-    def checkType(self, other):
-        if type(other) == LongType:
-            return True
-
-        return False
     
-class UIntType(Type, Node):    
+class UIntType(Type, Node):
+    __slots__ = ('isSigned',)
+
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 4
@@ -391,13 +446,13 @@ class UIntType(Type, Node):
     def printNode(self, level):
         return "uint"
     
-    def checkType(self, other):
-        if type(other) == UIntType:
-            return True
-
-        return False
 
 class ULongType(Type, Node):
+    __slots__ = ('isSigned',)
+
+    isInteger = True
+    isArithmetic = True
+
     def __init__(self):
         super().__init__()
         self.size = 8
@@ -412,13 +467,12 @@ class ULongType(Type, Node):
     def printNode(self, level):
         return "ulong"
     
-    def checkType(self, other):
-        if type(other) == ULongType:
-            return True
-
-        return False
 
 class DoubleType(Type, Node):
+    __slots__ = ()
+
+    isArithmetic = True
+
     def __str__(self):
         return "double"
     
@@ -427,15 +481,15 @@ class DoubleType(Type, Node):
     
     def printNode(self, level):
         return "double"
-    
-    def checkType(self, other):
-        if type(other) == DoubleType:
-            return True
-
-        return False
         
 
 class PointerType(Type, Node):
+    __slots__ = ('referenceType',)
+    __match_args__ = ('referenceType',)
+
+    def __new__(cls, referenceType):
+        return internType(cls, (cls, referenceType))
+
     def __init__(self, referenceType):
         self.referenceType = referenceType
 
@@ -445,20 +499,18 @@ class PointerType(Type, Node):
     def __str__(self):
         return "P{self.referenceType}".format(self=self)
     
-    def checkType(self, other):
-        
-        if type(other) == PointerType:
-            if self.referenceType.checkType(other.referenceType):
-                return True
-                
-        return False
-
     def printNode(self, level):
         output = "P"
         output += self.referenceType.printNode(level)
         return output
 
 class ArrayType(Type, Node):
+    __slots__ = ('elementType',)
+    __match_args__ = ('elementType', 'size')
+
+    def __new__(cls, elementType, size):
+        return internType(cls, (cls, elementType, size))
+
     def __init__(self, elementType, size):
         self.elementType = elementType
         self.size = size
@@ -466,14 +518,6 @@ class ArrayType(Type, Node):
     def getBaseTypeSize(self, occupied):
         return self.elementType.getBaseTypeSize(0) * self.size - occupied * self.elementType.getBaseTypeSize(0)
     
-    def checkType(self, other):
-        
-        if type(other) == ArrayType:
-            if self.elementType.checkType(other.elementType) and self.size == other.size:
-                return True
-        
-        return False
-            
     def __str__(self):
         return "ArrayType: {self.elementType} Size: {self.size}".format(self=self)
     
@@ -487,8 +531,14 @@ class ArrayType(Type, Node):
     
 
 class FunType(Type, Node):
+    __slots__ = ('paramTypes', 'retType')
+    __match_args__ = ('paramTypes', 'retType')
+
+    def __new__(cls, paramTypes, retType):
+        return internType(cls, (cls, tuple(paramTypes), retType))
+
     def __init__(self, paramTypes, retType):
-        self.paramTypes = paramTypes
+        self.paramTypes = tuple(paramTypes)
         self.retType = retType
     
     def __str__(self):
@@ -515,6 +565,9 @@ class StorageType(Enum):
     EXTERN = 3
 
 class StorageClass(Node):
+    __slots__ = ('storageClass',)
+    __match_args__ = ('storageClass',)
+
     def __init__(self, storageClass):
         self.storageClass = storageClass
 
@@ -527,9 +580,12 @@ class StorageClass(Node):
         
 
 class ForInit:
-    pass
+    __slots__ = ()
 
 class InitDecl(ForInit, Node):
+    __slots__ = ('varDecl',)
+    __match_args__ = ('varDecl',)
+
     def __init__(self, varDecl):
         self.varDecl = varDecl
         
@@ -544,6 +600,9 @@ class InitDecl(ForInit, Node):
         return super().printNode(level)
 
 class InitExp(ForInit, Node):
+    __slots__ = ('exp',)
+    __match_args__ = ('exp',)
+
     def __init__(self, exp=None):
         self.exp = exp
     
@@ -560,9 +619,12 @@ class InitExp(ForInit, Node):
         return super().printNode(level)
 
 class Statement:
-    pass
+    __slots__ = ()
 
 class IfStatement(Statement, Node):
+    __slots__ = ('exp', 'thenS', 'elseS')
+    __match_args__ = ('exp', 'thenS', 'elseS')
+
     def __init__(self, expCond, thenS, elseS=None):
         self.exp = expCond
         self.thenS = thenS
@@ -585,6 +647,9 @@ class IfStatement(Statement, Node):
 
 
 class ReturnStmt(Statement, Node):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
+
     def __init__(self, exp):
         self.expression = exp
 
@@ -599,6 +664,9 @@ class ReturnStmt(Statement, Node):
     
 
 class ExpressionStmt(Statement, Node):
+    __slots__ = ('exp',)
+    __match_args__ = ('exp',)
+
     def __init__(self, exp):
         self.exp = exp
     
@@ -612,6 +680,9 @@ class ExpressionStmt(Statement, Node):
     
 
 class BreakStatement(Statement, Node):
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier=None):
         self.identifier = identifier
     
@@ -627,6 +698,9 @@ class BreakStatement(Statement, Node):
     
 
 class ContinueStatement(Statement, Node):
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier=None):
         self.identifier = identifier
     
@@ -640,6 +714,9 @@ class ContinueStatement(Statement, Node):
         return output
 
 class WhileStatement(Statement, Node):
+    __slots__ = ('condExp', 'statement', 'identifier')
+    __match_args__ = ('condExp', 'statement', 'identifier')
+
     def __init__(self, condExp, statement, identifier=None):
         self.condExp = condExp
         self.statement = statement
@@ -662,6 +739,9 @@ class WhileStatement(Statement, Node):
     
 
 class DoWhileStatement(Statement, Node):
+    __slots__ = ('statement', 'condExp', 'identifier')
+    __match_args__ = ('statement', 'condExp', 'identifier')
+
     def __init__(self, statement, condExp, identifier=None):
         self.statement = statement
         self.condExp = condExp
@@ -683,6 +763,9 @@ class DoWhileStatement(Statement, Node):
         return super().printNode(level)
 
 class ForStatement(Statement, Node):
+    __slots__ = ('forInit', 'condExp', 'postExp', 'statement', 'identifier')
+    __match_args__ = ('forInit', 'statement', 'condExp', 'postExp', 'identifier')
+
     def __init__(self, forInit, statement, condExp=None, postExp=None, identifier=None):
         self.forInit = forInit
         self.condExp = condExp
@@ -718,6 +801,9 @@ class ForStatement(Statement, Node):
         
 
 class CompoundStatement(Statement, Node):
+    __slots__ = ('block',)
+    __match_args__ = ('block',)
+
     def __init__(self, block):
         self.block = block
     
@@ -731,6 +817,8 @@ class CompoundStatement(Statement, Node):
 
 
 class NullStatement(Statement, Node):
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -738,11 +826,16 @@ class NullStatement(Statement, Node):
         return "NullStatement;"
 
 class Expression:
+    __slots__ = ()
+
     retType = None
     def __repr__(self):
         return self.__str__()
 
 class StringExpression(Expression, Node):
+    __slots__ = ('string', 'retType')
+    __match_args__ = ('string', 'retType')
+
     def __init__(self, string, retType = None):
         self.string = string
         self.retType = retType
@@ -761,6 +854,9 @@ class StringExpression(Expression, Node):
         return output    
 
 class Dereference(Expression, Node):
+    __slots__ = ('exp', 'retType')
+    __match_args__ = ('exp', 'retType')
+
     def __init__(self, exp, retType = None):
         self.exp = exp
         self.retType = retType
@@ -780,6 +876,9 @@ class Dereference(Expression, Node):
 
 #&
 class AddrOf(Expression, Node):
+    __slots__ = ('exp', 'retType')
+    __match_args__ = ('exp', 'retType')
+
     def __init__(self, exp, retType = None):
         self.exp = exp
         self.retType = retType
@@ -798,6 +897,9 @@ class AddrOf(Expression, Node):
         return output
 
 class Subscript(Expression, Node):
+    __slots__ = ('ptrExp', 'indexExp', 'retType')
+    __match_args__ = ('ptrExp', 'indexExp', 'retType')
+
     def __init__(self, ptrExp, indexExp, retType = None):
         self.ptrExp = ptrExp
         self.indexExp = indexExp
@@ -820,9 +922,12 @@ class Subscript(Expression, Node):
 
 
 class Null_Expression(Expression):
-    pass
+    __slots__ = ()
 
 class Constant_Expression(Expression, Node):
+    __slots__ = ('const', 'retType')
+    __match_args__ = ('const', 'retType')
+
     def __init__(self, const, retType = None):
         self.const = const
         self.retType = retType
@@ -844,6 +949,9 @@ class Constant_Expression(Expression, Node):
     
 
 class Cast_Expression(Expression, Node):
+    __slots__ = ('targetType', 'exp', 'retType')
+    __match_args__ = ('targetType', 'exp', 'retType')
+
     def __init__(self, targetType, exp, retType = None):
         self.targetType = targetType
         self.exp = exp
@@ -867,6 +975,9 @@ class Cast_Expression(Expression, Node):
         #return super().printNode(level)
 
 class Unary_Expression(Expression, Node):
+    __slots__ = ('operator', 'expression', 'retType')
+    __match_args__ = ('operator', 'expression', 'retType')
+
     def __init__(self, operator, expression, retType = None):
         self.operator = operator
         self.expression = expression
@@ -887,6 +998,9 @@ class Unary_Expression(Expression, Node):
         return output
 
 class Binary_Expression(Expression, Node):
+    __slots__ = ('operator', 'left', 'right', 'retType')
+    __match_args__ = ('operator', 'left', 'right', 'retType')
+
     def __init__(self, operator, left, right, retType = None):
         self.operator = operator
         self.left = left
@@ -914,6 +1028,9 @@ class Binary_Expression(Expression, Node):
     
 
 class Conditional_Expression(Expression, Node):
+    __slots__ = ('condExp', 'thenExp', 'elseExp', 'retType')
+    __match_args__ = ('condExp', 'thenExp', 'elseExp', 'retType')
+
     def __init__(self, condExp, thenExp, elseExp, retType = None):
         self.condExp = condExp
         self.thenExp = thenExp
@@ -940,6 +1057,9 @@ class Conditional_Expression(Expression, Node):
         return output
 
 class Var_Expression(Expression, Node):
+    __slots__ = ('identifier', 'retType')
+    __match_args__ = ('identifier', 'retType')
+
     def __init__(self, identifier, retType = None):
         self.identifier = identifier
         self.retType = retType
@@ -960,6 +1080,9 @@ class Var_Expression(Expression, Node):
     
 
 class Assignment_Expression(Expression, Node):
+    __slots__ = ('lvalue', 'exp', 'retType')
+    __match_args__ = ('lvalue', 'exp', 'retType')
+
     def __init__(self, lvalue, exp, retType = None):
         self.lvalue = lvalue
         self.exp = exp
@@ -984,6 +1107,9 @@ class Assignment_Expression(Expression, Node):
         
 
 class FunctionCall_Exp(Expression, Node):
+    __slots__ = ('identifier', 'argumentList', 'retType')
+    __match_args__ = ('identifier', 'argumentList', 'retType')
+
     def __init__(self, identifer, argumentList=None, retType = None):
         self.identifier = identifer
         self.argumentList = argumentList
@@ -1012,9 +1138,12 @@ class FunctionCall_Exp(Expression, Node):
     
 
 class Const:
-    pass
+    __slots__ = ()
 
 class ConstChar(Const, Node):
+    __slots__ = ('int',)
+    __match_args__ = ('int',)
+
     def __init__(self, int):
         self.int = int
     
@@ -1025,6 +1154,9 @@ class ConstChar(Const, Node):
         return "{}".format(self.int)
 
 class ConstUChar(Const, Node):
+    __slots__ = ('int',)
+    __match_args__ = ('int',)
+
     def __init__(self, int):
         self.int = int
     
@@ -1035,6 +1167,9 @@ class ConstUChar(Const, Node):
         return "{}".format(self.int)
 
 class ConstInt(Const, Node):
+    __slots__ = ('int',)
+    __match_args__ = ('int',)
+
     def __init__(self, int):
         self.int = int
 
@@ -1046,6 +1181,9 @@ class ConstInt(Const, Node):
     
 
 class ConstLong(Const, Node):
+    __slots__ = ('int',)
+    __match_args__ = ('int',)
+
     def __init__(self, int):
         self.int = int
     
@@ -1056,6 +1194,9 @@ class ConstLong(Const, Node):
         return "{}".format(self.int)
     
 class ConstUInt(Const, Node):
+    __slots__ = ('int',)
+    __match_args__ = ('int',)
+
     def __init__(self, int):
         self.int = int
 
@@ -1067,6 +1208,9 @@ class ConstUInt(Const, Node):
     
 
 class ConstULong(Const, Node):
+    __slots__ = ('int',)
+    __match_args__ = ('int',)
+
     def __init__(self, int):
         self.int = int
     
@@ -1078,6 +1222,9 @@ class ConstULong(Const, Node):
 
 
 class ConstDouble(Const, Node):
+    __slots__ = ('double',)
+    __match_args__ = ('double',)
+
     def __init__(self, double):
         self.double = double
     
@@ -1111,9 +1258,12 @@ class BinopType(Enum):
     GREATEROREQUAL = 13
 
 class Operator:
-    pass
+    __slots__ = ()
 
 class UnaryOperator(Operator, Node):
+    __slots__ = ('operator',)
+    __match_args__ = ('operator',)
+
     def __init__(self, operator):
         self.operator = operator
     
@@ -1125,6 +1275,9 @@ class UnaryOperator(Operator, Node):
         return self.operator.name
 
 class BinaryOperator(Operator, Node):
+    __slots__ = ('operator',)
+    __match_args__ = ('operator',)
+
     def __init__(self, operator):
         self.operator = operator
 
@@ -1135,19 +1288,54 @@ class BinaryOperator(Operator, Node):
     def printNode(self, level):
         return self.operator.name
 
+class TokenStream:
+    def __init__(self, tokenList):
+        self.tokenList = tokenList
+        self.cursor = 0
+
+    def __str__(self):
+        return "{0}".format(self.remaining())
+
+    def __repr__(self):
+        return self.__str__()
+
+    def atEnd(self):
+        return self.cursor >= len(self.tokenList)
+
+    def peek(self, k=0):
+        index = self.cursor + k
+        if index < len(self.tokenList):
+            return self.tokenList[index]
+        
+        return None
+
+    def take(self):
+        token = self.peek()
+        if token != None:
+            self.cursor += 1
+        
+        return token
+
+    def remaining(self):
+        return self.tokenList[self.cursor:]
+
 def takeToken(tokenList):
-    if(tokenList != []):
-        return tokenList.pop(0)
+    token = tokenList.take()
+    if token != None:
+        return token
     
     print("No more tokens.")
     sys.exit(1)
 
 def peek(tokenList, index=None):
-    if(tokenList != []):
-        if index:
-            return tokenList[index]
-        else:
-            return tokenList[0]
+    token = None
+    if index:
+        token = tokenList.peek(index)
+    else:
+        token = tokenList.peek()
+
+    if token != None:
+        return token
     
     print("No more tokens.")
     sys.exit(1)
@@ -1324,9 +1512,12 @@ def isConstant(token):
     
 
 class AbstractDeclarator:
-    pass
+    __slots__ = ()
 
 class AbstractPointer(AbstractDeclarator, Node):
+    __slots__ = ('abstractD',)
+    __match_args__ = ('abstractD',)
+
     def __init__(self, abstractD):
         self.abstractD = abstractD
     
@@ -1334,6 +1525,9 @@ class AbstractPointer(AbstractDeclarator, Node):
         return "P{self.abstractD}".format(self=self)
 
 class AbstractArray(AbstractDeclarator, Node):
+    __slots__ = ('abstractD', 'size')
+    __match_args__ = ('abstractD', 'size')
+
     def __init__(self, abstractD, size):
         self.abstractD = abstractD
         self.size = size
@@ -1342,7 +1536,7 @@ class AbstractArray(AbstractDeclarator, Node):
         return "Array({self.abstractD}, {self.size})".format(self=self)
 
 class AbstractBase(AbstractDeclarator, Node):
-    pass
+    __slots__ = ()
 
     def __str__(self):
         return "".format(self=self)
@@ -2197,9 +2391,12 @@ def parseFunctionDecl(tokenList, name, type, params, storageClass):
     return FunctionDecl(name, type, params, block, storageClass)
 
 class Declarator:
-    pass
+    __slots__ = ()
 
 class Ident(Declarator):
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier
     
@@ -2207,6 +2404,9 @@ class Ident(Declarator):
         return "(IdenDeclarator: {self.identifier})".format(self=self)
 
 class PointerDeclarator(Declarator):
+    __slots__ = ('declarator',)
+    __match_args__ = ('declarator',)
+
     def __init__(self, declarator):
         self.declarator = declarator
 
@@ -2214,6 +2414,9 @@ class PointerDeclarator(Declarator):
         return "(PointerDeclarator: {self.declarator})".format(self=self)
 
 class ArrayDeclarator(Declarator):
+    __slots__ = ('declarator', 'size')
+    __match_args__ = ('declarator', 'size')
+
     def __init__(self, declarator, size):
         self.declarator = declarator
         self.size = size
@@ -2223,6 +2426,9 @@ class ArrayDeclarator(Declarator):
 
 
 class FunDeclarator(Declarator):
+    __slots__ = ('paramInfoList', 'declarator')
+    __match_args__ = ('paramInfoList', 'declarator')
+
     def __init__(self, paramInfoList, declarator):
         self.paramInfoList = paramInfoList
         self.declarator = declarator
@@ -2231,9 +2437,12 @@ class FunDeclarator(Declarator):
         return "(FunDeclarator: {self.declarator} {self.paramInfoList})".format(self=self)
 
 class ParamInfo():
-    pass
+    __slots__ = ()
 
 class Param(ParamInfo):
+    __slots__ = ('type', 'declarator')
+    __match_args__ = ('type', 'declarator')
+
     def __init__(self, type, declarator):
         self.type = type
         self.declarator = declarator
@@ -2248,11 +2457,11 @@ class Param(ParamInfo):
 
 def parseProgram(tokenList):
     
-    if tokenList == []:
+    if tokenList.atEnd():
         return Program()
     
     funDeclList = []
-    while tokenList != []:
+    while not tokenList.atEnd():
         isValid, decl = parseDeclaration(tokenList)
 
         if isValid == False:
@@ -0,0 +1,170 @@
+import sys
+import tacGenerator
+import constantFolding
+import unreachableCode
+import commonSubexpressions
+import copyPropagation
+import deadStoreElimination
+import diagnostics
+
+log = diagnostics.getLogger("passManager")
+
+#Named optimization passes and the -O levels that pick them.
+#
+#   -O0   no optimization, every pseudo gets its own stack slot
+#   -O1   constant folding and unreachable code, strength reduction,
+#         register allocation, stack slot sharing and the peephole
+#         optimizer
+#   -O2   every pass, the TAC passes run again until none changes anything
+#
+#--enable=name,... and --disable=name,... adjust the level after it is
+#picked. With the passManager log at DEBUG (--log=passManager) the TAC is
+#checked after every pass.
+
+class Pass:
+    def __init__(self, name, function):
+        self.name = name
+        #function(tac, symbolTable) returns True when it changed something
+        self.function = function
+
+    def __str__(self):
+        return "Pass {self.name}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+#in the order they run
+TAC_PASSES = [
+    Pass("constantFolding", constantFolding.foldConstants),
+    Pass("unreachableCode", unreachableCode.eliminateUnreachableCode),
+    Pass("commonSubexpressions", commonSubexpressions.eliminateCommonSubexpressions),
+    Pass("copyPropagation", copyPropagation.propagateCopies),
+    Pass("deadStoreElimination", deadStoreElimination.eliminateDeadStores)
+    ]
+
+#backend passes that can be left out, cd.py runs them
+BACKEND_PASSES = ["strengthReduction", "registerAllocation", "stackSlotSharing", "peephole"]
+
+LEVELS = {
+    0 : [],
+    1 : ["constantFolding", "unreachableCode", "strengthReduction", "registerAllocation", "stackSlotSharing", "peephole"],
+    2 : [p.name for p in TAC_PASSES] + BACKEND_PASSES
+    }
+
+DEFAULT_LEVEL = 2
+
+#rounds of the TAC passes at -O2 before giving up on a fixpoint
+MAX_ROUNDS = 10
+
+def passNames():
+    return [p.name for p in TAC_PASSES] + BACKEND_PASSES
+
+class PassManager:
+    def __init__(self, level = DEFAULT_LEVEL):
+        self.level = level
+        self.enabled = set(LEVELS[level])
+        self.fixpoint = level >= 2
+
+    def __str__(self):
+        return "PassManager -O{self.level} passes: {self.enabled} fixpoint: {self.fixpoint}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def toggle(self, names, on):
+        for name in names.split(","):
+            if name not in passNames():
+                print("Error Unknown pass {0}, the passes are {1}.".format(name, ", ".join(passNames())))
+                sys.exit(1)
+
+            if on:
+                self.enabled.add(name)
+            else:
+                self.enabled.discard(name)
+
+    def isEnabled(self, name):
+        return name in self.enabled
+
+    def runTAC(self, tac, symbolTable, stats, afterPass = None):
+        passes = [p for p in TAC_PASSES if p.name in self.enabled]
+        verify = log.enabled(diagnostics.Level.DEBUG)
+
+        if verify:
+            verifyTAC(tac, symbolTable, "TAC_parseProgram")
+
+        for round in range(1, MAX_ROUNDS + 1):
+            changed = False
+
+            for p in passes:
+                #later rounds get their own name in the pass statistics
+                name = p.name if round == 1 else "{0}.{1}".format(p.name, round)
+                changed = stats.run(name, p.function, tac, symbolTable) or changed
+
+                diagnostics.getLogger(p.name).dump("TAC", lambda: tac)
+
+                if verify:
+                    verifyTAC(tac, symbolTable, name)
+
+                if afterPass:
+                    afterPass()
+
+            log.debug("round {0}: {1}", round, "changed" if changed else "no change")
+
+            if not self.fixpoint or not changed:
+                break
+
+#IR VERIFICATION
+
+def operands(i):
+    values = []
+
+    def collect(value):
+        values.append(value)
+        return value
+
+    constantFolding.replaceUses(i, collect)
+    copyPropagation.replacePointers(i, collect)
+    return values
+
+def verifyFunction(function, symbolTable):
+    labels = set()
+    for i in function.instructions:
+        if type(i) == tacGenerator.TAC_LabelInst:
+            if i.identifier in labels:
+                return "label {0} defined twice".format(i.identifier)
+            labels.add(i.identifier)
+
+    for i in function.instructions:
+        match i:
+            case tacGenerator.TAC_JumpInst(label = label) | tacGenerator.TAC_JumpIfZeroInst(label = label) | tacGenerator.TAC_JumpIfNotZeroInst(label = label):
+                if label not in labels:
+                    return "jump to missing label {0} in {1}".format(label, i)
+
+        for value in operands(i):
+            match value:
+                case tacGenerator.TAC_VariableValue(identifier = identifier):
+                    if identifier not in symbolTable:
+                        return "unknown variable {0} in {1}".format(identifier, i)
+                case tacGenerator.TAC_ConstantValue():
+                    pass
+                case None if type(i) in [tacGenerator.TAC_returnInstruction, tacGenerator.TAC_FunCallInstruction]:
+                    pass
+                case _:
+                    return "bad operand {0} in {1}".format(value, i)
+
+        dst = constantFolding.definedVariable(i, symbolTable)
+        if dst != None and dst not in symbolTable:
+            return "unknown destination {0} in {1}".format(dst, i)
+
+    return None
+
+def verifyTAC(tac, symbolTable, after):
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef():
+                error = verifyFunction(topLevel, symbolTable)
+                if error:
+                    print("Error Invalid TAC after {0} in function {1}: {2}".format(after, topLevel.identifier, error))
+                    sys.exit(1)
+
+    log.debug("TAC verified after {0}", after)
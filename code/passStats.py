@@ -0,0 +1,96 @@
+import sys
+import json
+import time
+import tracemalloc
+
+#Per-pass time and memory instrumentation, used by cd.py for --time-passes
+#and --mem-passes and by benchmark.py.
+
+class PassRecord:
+    def __init__(self, name, time=0.0, peak=0, retained=0, count=0):
+        self.name = name
+        self.time = time
+        self.peak = peak
+        self.retained = retained
+        self.count = count
+
+    def __str__(self):
+        return "{self.name}: {self.time}s {self.peak}B {self.retained}B {self.count}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+class PassStats:
+    def __init__(self, timePasses=False, memPasses=False):
+        self.timePasses = timePasses
+        self.memPasses = memPasses
+        self.records = []
+
+        if memPasses and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __str__(self):
+        return "PassStats: {self.records}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def enabled(self):
+        return self.timePasses or self.memPasses
+
+    def run(self, name, fn, *args):
+        #disabled: no clock, no tracing, just the call
+        if not self.enabled():
+            return fn(*args)
+
+        record = PassRecord(name)
+        self.records.append(record)
+
+        if self.memPasses:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        result = fn(*args)
+        record.time = time.perf_counter() - start
+
+        if self.memPasses:
+            current, peak = tracemalloc.get_traced_memory()
+            record.peak = peak - base
+            record.retained = current - base
+
+        return result
+
+    def total(self):
+        return sum(r.time for r in self.records)
+
+    def toDict(self):
+        passes = []
+        for r in self.records:
+            entry = {"name" : r.name, "time" : r.time}
+            if self.memPasses:
+                entry.update({"peak" : r.peak, "retained" : r.retained})
+            passes.append(entry)
+
+        return {"passes" : passes, "total" : self.total()}
+
+    def printTable(self, out=sys.stderr):
+        total = self.total()
+
+        header = "  {0:<24}{1:>12}{2:>8}".format("pass", "time (ms)", "%")
+        if self.memPasses:
+            header += "{0:>14}{1:>16}".format("peak (KiB)", "retained (KiB)")
+        print("Pass statistics:", file=out)
+        print(header, file=out)
+
+        for r in self.records:
+            percent = r.time / total * 100 if total > 0 else 0.0
+            line = "  {0:<24}{1:>12.2f}{2:>8.1f}".format(r.name, r.time * 1000, percent)
+            if self.memPasses:
+                line += "{0:>14.1f}{1:>16.1f}".format(r.peak / 1024, r.retained / 1024)
+            print(line, file=out)
+
+        print("  {0:<24}{1:>12.2f}".format("total", total * 1000), file=out)
+
+    def printJson(self, out=sys.stderr):
+        print(json.dumps(self.toDict(), indent=1), file=out)
@@ -1,7 +1,50 @@
-import copy
 import sys
 import parser
 
+#shared by every entry seen through an enclosing scope
+outerScope = {'from_current_scope':False}
+
+class IdMap:
+    #one scope of identifiers, lookups fall through to the enclosing
+    #scopes so entering a block doesn't copy anything
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.entries = {}
+
+    def __str__(self):
+        return "{self.entries} -> {self.parent}".format(self=self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def lookup(self, id):
+        scope = self
+        while scope != None:
+            if id in scope.entries:
+                return scope, scope.entries[id]
+            scope = scope.parent
+
+        return None, None
+
+    def __contains__(self, id):
+        scope, entry = self.lookup(id)
+        return entry != None
+
+    def __getitem__(self, id):
+        scope, entry = self.lookup(id)
+
+        if entry == None:
+            raise KeyError(id)
+
+        if scope == self:
+            return entry
+
+        #same entry as in the map it was declared in, seen from an inner scope
+        return [entry[0], outerScope, entry[2]]
+
+    def __setitem__(self, id, entry):
+        self.entries[id] = entry
+
 def resolveExpression(expression, idMap):
     match expression:        
         case parser.Assignment_Expression(lvalue=lvalue, exp=exp):
@@ -64,7 +107,6 @@ def resolveExpression(expression, idMap):
             pass            
         
         case parser.Conditional_Expression(condExp=condExp, thenExp=thenExp, elseExp=elseExp):
-            print(type(elseExp))
             c = resolveExpression(condExp, idMap)
             t = resolveExpression(thenExp, idMap)
             e = resolveExpression(elseExp, idMap)
@@ -209,16 +251,8 @@ def resolveDeclaration(dec, idMap, isBlockDecl):
             
 
 def copyidMap(idMap):
-    #print("VAR map: ", idMap)
-    
-    newMap = copy.deepcopy(idMap)
-
-    for i in newMap.values():
-        i[1] = {'from_current_scope':False}
-    
-    #print("NEW map: ", newMap)
-
-    return newMap
+    #a new scope on top of idMap, everything in idMap is from an outer scope now
+    return IdMap(idMap)
 
 def resolveForInit(forInit, idMap):
     #print(type(forInit))
@@ -318,7 +352,7 @@ def resolveBlock(block, idMap):
 def IdentifierResolution(pro):
     
     if pro.declList:
-        idMap = {}
+        idMap = IdMap()
         funcDecList = []
         for decl in pro.declList:
             f = resolveDeclaration(decl, idMap, False)
@@ -5,8 +5,14 @@ import semanticAnalysis
 import typeChecker
 
 from typeChecker import isIntegerType
+import diagnostics
+
+log = diagnostics.getLogger("tacGenerator")
 
 class TAC_Program:
+    __slots__ = ('topLevelList',)
+    __match_args__ = ('topLevelList',)
+
     def __init__(self, topLevelList):
         self.topLevelList = topLevelList
     
@@ -14,9 +20,12 @@ class TAC_Program:
         return "TAC Program:{self.topLevelList}".format(self=self)
 
 class TopLevel:
-    pass
+    __slots__ = ()
 
 class StaticConstant(TopLevel):
+    __slots__ = ('identifier', 'type', 'staticInit')
+    __match_args__ = ('identifier', 'type', 'staticInit')
+
     def __init__(self, identifier, type, staticInit):
         self.identifier = identifier
         self.type = type
@@ -29,6 +38,9 @@ class StaticConstant(TopLevel):
         return self.__str__()
 
 class StaticVariable(TopLevel):
+    __slots__ = ('identifier', 'global_', 'type', 'initList')
+    __match_args__ = ('identifier', 'global_', 'type', 'initList')
+
     def __init__(self, identifier, global_, type, initList):
         self.identifier = identifier
         self.global_ = global_
@@ -42,6 +54,9 @@ class StaticVariable(TopLevel):
         return self.__str__()
 
 class TAC_FunctionDef(TopLevel):
+    __slots__ = ('identifier', 'global_', 'params', 'instructions')
+    __match_args__ = ('identifier', 'global_', 'params', 'instructions')
+
     def __init__(self, identifier, global_, params, instructions):
         self.identifier = identifier
         self.global_ = global_
@@ -55,9 +70,12 @@ class TAC_FunctionDef(TopLevel):
         return self.__str__()
 
 class instruction:
-    pass
+    __slots__ = ()
 
 class TAC_addPtr(instruction):
+    __slots__ = ('ptr', 'index', 'scale', 'dst')
+    __match_args__ = ('ptr', 'index', 'scale', 'dst')
+
     def __init__(self, ptr, index, scale, dst):
         self.ptr = ptr
         self.index = index
@@ -71,6 +89,9 @@ class TAC_addPtr(instruction):
         return self.__str__()
 
 class TAC_copyToOffset(instruction):
+    __slots__ = ('src', 'dst', 'offset')
+    __match_args__ = ('src', 'dst', 'offset')
+
     def __init__(self, src, dst, offset):
         self.src = src
         self.dst = dst
@@ -83,6 +104,9 @@ class TAC_copyToOffset(instruction):
         return self.__str__()
 
 class TAC_returnInstruction(instruction):
+    __slots__ = ('Value',)
+    __match_args__ = ('Value',)
+
     def __init__(self, Value):
         self.Value = Value
     
@@ -93,6 +117,9 @@ class TAC_returnInstruction(instruction):
         return self.__str__()
 
 class TAC_signExtendInstruction(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -104,6 +131,9 @@ class TAC_signExtendInstruction(instruction):
         return self.__str__()
     
 class TAC_zeroExtendInstruction(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -115,6 +145,9 @@ class TAC_zeroExtendInstruction(instruction):
         return self.__str__()
 
 class TAC_DoubleToInt(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -126,6 +159,9 @@ class TAC_DoubleToInt(instruction):
         return self.__str__()
 
 class TAC_DoubleToUInt(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -137,6 +173,9 @@ class TAC_DoubleToUInt(instruction):
         return self.__str__()
 
 class TAC_IntToDouble(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -148,6 +187,9 @@ class TAC_IntToDouble(instruction):
         return self.__str__()
 
 class TAC_UIntToDouble(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -160,6 +202,9 @@ class TAC_UIntToDouble(instruction):
 
 
 class TAC_truncateInstruction(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src
         self.dst = dst
@@ -172,6 +217,9 @@ class TAC_truncateInstruction(instruction):
 
 
 class TAC_UnaryInstruction(instruction):
+    __slots__ = ('operator', 'src', 'dst')
+    __match_args__ = ('operator', 'src', 'dst')
+
     def __init__(self, operator, src, dst):
         self.operator = operator
         self.src = src 
@@ -184,6 +232,9 @@ class TAC_UnaryInstruction(instruction):
         return self.__str__()
 
 class TAC_CopyInstruction(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src 
         self.dst = dst   
@@ -195,6 +246,9 @@ class TAC_CopyInstruction(instruction):
         return self.__str__()
 
 class TAC_GetAddress(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src 
         self.dst = dst
@@ -206,6 +260,9 @@ class TAC_GetAddress(instruction):
         return self.__str__()
     
 class TAC_Load(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src 
         self.dst = dst
@@ -217,6 +274,9 @@ class TAC_Load(instruction):
         return self.__str__()
 
 class TAC_Store(instruction):
+    __slots__ = ('src', 'dst')
+    __match_args__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         self.src = src 
         self.dst = dst
@@ -228,6 +288,9 @@ class TAC_Store(instruction):
         return self.__str__()
 
 class TAC_JumpIfZeroInst(instruction):
+    __slots__ = ('condition', 'label')
+    __match_args__ = ('condition', 'label')
+
     def __init__(self, condition, label):
         self.condition = condition
         self.label = label
@@ -239,6 +302,9 @@ class TAC_JumpIfZeroInst(instruction):
         return self.__str__()
 
 class TAC_JumpIfNotZeroInst(instruction):
+    __slots__ = ('condition', 'label')
+    __match_args__ = ('condition', 'label')
+
     def __init__(self, condition, label):
         self.condition = condition
         self.label = label
@@ -250,6 +316,9 @@ class TAC_JumpIfNotZeroInst(instruction):
         return self.__str__()
 
 class TAC_JumpInst(instruction):
+    __slots__ = ('label',)
+    __match_args__ = ('label',)
+
     def __init__(self, label):
         self.label = label
     
@@ -260,6 +329,9 @@ class TAC_JumpInst(instruction):
         return self.__str__()
 
 class TAC_LabelInst(instruction):
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier
     
@@ -270,6 +342,9 @@ class TAC_LabelInst(instruction):
         return self.__str__()
 
 class TAC_BinaryInstruction:
+    __slots__ = ('operator', 'src1', 'src2', 'dst')
+    __match_args__ = ('operator', 'src1', 'src2', 'dst')
+
     def __init__(self, operator, src1, src2, dst):
         self.operator = operator
         self.src1 = src1 
@@ -283,6 +358,9 @@ class TAC_BinaryInstruction:
         return self.__str__()
 
 class TAC_FunCallInstruction:
+    __slots__ = ('funName', 'arguments', 'dst')
+    __match_args__ = ('funName', 'arguments', 'dst')
+
     def __init__(self, funName, arguments, dst):
         self.funName = funName
         self.arguments = arguments
@@ -295,9 +373,12 @@ class TAC_FunCallInstruction:
         return self.__str__()
 
 class Value:
-    pass
+    __slots__ = ()
 
 class TAC_ConstantValue(Value):
+    __slots__ = ('const',)
+    __match_args__ = ('const',)
+
     def __init__(self, const):
         self.const = const
     
@@ -308,6 +389,9 @@ class TAC_ConstantValue(Value):
         return self.__str__()
 
 class TAC_VariableValue(Value):
+    __slots__ = ('identifier',)
+    __match_args__ = ('identifier',)
+
     def __init__(self, identifier):
         self.identifier = identifier
 
@@ -337,9 +421,12 @@ class BinopType(Enum):
     REMAINDER = 10
 
 class Operator:
-    pass
+    __slots__ = ()
 
 class TAC_UnaryOperator(Operator):
+    __slots__ = ('operator',)
+    __match_args__ = ('operator',)
+
     def __init__(self, operator):
         self.operator = operator
     
@@ -353,6 +440,9 @@ class TAC_UnaryOperator(Operator):
                 return "_"
 
 class TAC_BinaryOperator(Operator):
+    __slots__ = ('operator',)
+    __match_args__ = ('operator',)
+
     def __init__(self, operator):
         self.operator = operator
 
@@ -373,14 +463,20 @@ class TAC_BinaryOperator(Operator):
 
 
 class ExpResult:
-    pass
+    __slots__ = ()
 
 class PlainOperand(ExpResult):
+    __slots__ = ('val',)
+    __match_args__ = ('val',)
+
     def __init__(self, val):
         self.val = val
     
 
 class DereferencedPointer(ExpResult):
+    __slots__ = ('val',)
+    __match_args__ = ('val',)
+
     def __init__(self, val):
         self.val = val
     
@@ -882,7 +978,6 @@ def TAC_parseInstructions(expression, instructions, symbolTable):
 
                     match src:
                         case TAC_ConstantValue(const=const):
-                            print(type(const))
                             match const:
                                 case parser.ConstInt():
                                     realType = parser.IntType() 
@@ -982,8 +1077,7 @@ def TAC_parseInstructions(expression, instructions, symbolTable):
             return DereferencedPointer(dst)
 
         case parser.StringExpression(string = string, retType = retType):
-            tmp = makeTemp()
-            symbolTable[tmp] = typeChecker.Entry(tmp, typeChecker.ConstantAttr(typeChecker.StringInit(string, True)), parser.ArrayType(parser.CharType(), len(string) + 1))
+            tmp = typeChecker.internString(string, symbolTable)
             return PlainOperand(TAC_VariableValue(tmp))
 
         case _:
@@ -1182,7 +1276,6 @@ def TAC_emitInitializer(variableDecl, init, instructions, symbolTable, offset):
 
                     #add zero padding
                     
-                    print(retType.size)
                     at = retType.size
 
                     while at > len(string):
@@ -1194,7 +1287,13 @@ def TAC_emitInitializer(variableDecl, init, instructions, symbolTable, offset):
                 case _:
                     src = TAC_emitTackyAndConvert(exp, instructions, symbolTable)
                     typeSize = retType.getBaseTypeSize(0)
-                    instructions.append(TAC_copyToOffset(src, variableDecl.identifier, offset[0]))
+
+                    #a scalar is initialized with a plain copy
+                    if type(symbolTable[variableDecl.identifier].type) == parser.ArrayType:
+                        instructions.append(TAC_copyToOffset(src, variableDecl.identifier, offset[0]))
+                    else:
+                        instructions.append(TAC_CopyInstruction(src, TAC_VariableValue(variableDecl.identifier)))
+
                     offset[0] += typeSize
             
         case parser.CompoundInit(initializerList = initializerList, retType = retType):
@@ -1266,7 +1365,7 @@ def TAC_parseTopLevel(decl, symbolTable):
 def TAC_convertSymbolsToTAC(symbolTable):
     tacDefs = []
     for name, entry in symbolTable.items():
-        print(entry)
+        log.debug("symbol {0}", entry)
         match entry.attrs:
             case typeChecker.StaticAttributes(initialVal = initialVal, global_ = global_):
                 #print(type(initialVal))
@@ -1,9 +1,14 @@
 import sys
 from enum import Enum
 import ctypes
+import math
+import array
 import parser
 
 from semanticAnalysis import makeTemporary
+import diagnostics
+
+log = diagnostics.getLogger("typeChecker")
 
 class Entry:
     def __init__(self, name, attrs, type, funType=None):
@@ -148,6 +153,67 @@ class ZeroInit(StaticInit):
     def __str__(self):
         return "{self.bytes}".format(self=self)
 
+class RunInit(StaticInit):
+    #values of one scalar type next to each other, kind is the class of a
+    #single one (IntInit, ...) and values an array.array of the numbers
+    def __init__(self, kind, values):
+        self.kind = kind
+        self.values = values
+
+    def __str__(self):
+        return "{0} x {1}".format(self.kind.__name__, len(self.values))
+
+#array.array typecode and size in bytes of the scalars that go in a RunInit
+RUN_KINDS = {
+    CharInit : ("b", 1),
+    UCharInit : ("B", 1),
+    IntInit : ("i", 4),
+    UIntInit : ("I", 4),
+    LongInit : ("q", 8),
+    ULongInit : ("Q", 8),
+    DoubleInit : ("d", 8)
+    }
+
+def addStaticInit(initList, init):
+    #zeros (not -0.0) join the ZeroInit before them and values the RunInit
+    #of their type before them, a big array is a few objects and not one
+    #per element
+    last = initList[-1] if initList else None
+
+    if type(init) in RUN_KINDS:
+        typecode, size = RUN_KINDS[type(init)]
+        value = init.double.value if type(init) == DoubleInit else init.int.value
+
+        if value == 0 and math.copysign(1, value) > 0:
+            init = ZeroInit(size)
+        elif type(last) == RunInit and last.kind == type(init):
+            last.values.append(value)
+            return
+        else:
+            init = RunInit(type(init), array.array(typecode, [value]))
+
+    if type(init) == ZeroInit and type(last) == ZeroInit:
+        last.bytes += init.bytes
+        return
+
+    initList.append(init)
+
+#STRING CONSTANTS
+
+#string literal text -> the constant holding it, every literal with the same
+#text in the program shares one
+stringPool = {}
+
+def internString(string, symbolTable):
+    if string not in stringPool:
+        tmp = makeTemporary("string")
+        log.debug("string constant {0}", tmp)
+
+        symbolTable[tmp] = Entry(tmp, ConstantAttr(StringInit(string, True)), parser.ArrayType(parser.CharType(), len(string) + 1))
+        stringPool[string] = tmp
+
+    return stringPool[string]
+
 def getCommonType(type1, type2):
     
     if isCharacterType(type1):
@@ -221,21 +287,13 @@ def getCommonPointerType(exp1, exp2):
 
 
 def isCharacterType(targetType):
-    if type(targetType) == parser.CharType or type(targetType) == parser.SCharType or type(targetType) == parser.UCharType:
-        return True
-    return False
+    return targetType.isCharacter
 
 def isIntegerType(targetType):
-    if isCharacterType(targetType) or type(targetType) == parser.IntType or type(targetType) == parser.LongType or type(targetType) == parser.UIntType or type(targetType) == parser.ULongType:
-        return True
-    
-    return False
+    return targetType.isInteger
 
 def isArithmeticType(targetType):
-    if isIntegerType(targetType) or type(targetType) == parser.DoubleType:
-        return True
-    
-    return False
+    return targetType.isArithmetic
     
 
 def convertByAssignment(exp, targetType):
@@ -297,7 +355,7 @@ def typeCheckExpression(exp, symbolTable):
 
                             convertedArgs.append(exp)
                         
-                        print(convertedArgs)
+                        log.debug("call {0} converted arguments {1}", id, convertedArgs)
 
                         return parser.FunctionCall_Exp(id, convertedArgs, retType)
                     
@@ -675,12 +733,11 @@ def AnnotateExpression(varDecl):
 
 def CreateZeroInitializer(type_, initList):
     match type_:
-        case parser.ArrayType(elementType = elementType, size = size):
-            for i in range(size):    
-                CreateZeroInitializer(elementType, initList)
+        case parser.ArrayType():
+            addStaticInit(initList, ZeroInit(type_.getBaseTypeSize(0)))
             
         case _:
-            initList.append(GetStaticInitializer(type_, 0))
+            addStaticInit(initList, GetStaticInitializer(type_, 0))
             
 
 def AnnotateInitializer(varDecl, type_, init, initList, symbolTable):
@@ -692,31 +749,31 @@ def AnnotateInitializer(varDecl, type_, init, initList, symbolTable):
                     case parser.ConstLong(int = int):
                         temp = parser.Constant_Expression(const, parser.LongType())
                         temp = convertByAssignment(temp, type_)
-                        initList.append(GetStaticInitializer(type_, int))  
+                        addStaticInit(initList, GetStaticInitializer(type_, int))  
                         return parser.SingleInit(temp, type_)
 
                     case parser.ConstInt(int = int):
                         temp = parser.Constant_Expression(const, parser.IntType())
                         temp = convertByAssignment(temp, type_)
-                        initList.append(GetStaticInitializer(type_, int))                            
+                        addStaticInit(initList, GetStaticInitializer(type_, int))                            
                         return parser.SingleInit(temp, type_)
 
                     case parser.ConstULong(int = int):
                         temp = parser.Constant_Expression(const, parser.ULongType())
                         temp = convertByAssignment(temp, type_)
-                        initList.append(GetStaticInitializer(type_, int))                            
+                        addStaticInit(initList, GetStaticInitializer(type_, int))                            
                         return parser.SingleInit(temp, type_)
                         
                     case parser.ConstUInt(int = int):
                         temp = parser.Constant_Expression(const, parser.UIntType())
                         temp = convertByAssignment(temp, type_)
-                        initList.append(GetStaticInitializer(type_, int))                            
+                        addStaticInit(initList, GetStaticInitializer(type_, int))                            
                         return parser.SingleInit(temp, type_)
                     
                     case parser.ConstDouble(double=double):
                         temp = parser.Constant_Expression(const, parser.DoubleType())
                         temp = convertByAssignment(temp, type_)
-                        initList.append(GetStaticInitializer(type_, double))                            
+                        addStaticInit(initList, GetStaticInitializer(type_, double))                            
                         return parser.SingleInit(temp, type_)
 
                     case _:
@@ -749,10 +806,10 @@ def AnnotateInitializer(varDecl, type_, init, initList, symbolTable):
                         nullT = True
                         occupiedB += 1
 
-                    initList.append(StringInit(string, nullT))
+                    addStaticInit(initList, StringInit(string, nullT))
 
                     if occupiedB < size: 
-                        initList.append(ZeroInit(size - occupiedB))
+                        addStaticInit(initList, ZeroInit(size - occupiedB))
                     
                     return parser.SingleInit(parser.StringExpression(string, type_), type_)
                     
@@ -768,12 +825,9 @@ def AnnotateInitializer(varDecl, type_, init, initList, symbolTable):
                         print("Error: Cannot initialize a pointer to non char type.")
                         sys.exit(1)
 
-                    tmp = makeTemporary("string")
-                    print(tmp)
+                    tmp = internString(string, symbolTable)
 
-                    symbolTable[tmp] = Entry(tmp, ConstantAttr(StringInit(string, True)), parser.ArrayType(parser.CharType(), len(string) + 1))
-
-                    initList.append(PointerInit(tmp))
+                    addStaticInit(initList, PointerInit(tmp))
 
                     return parser.SingleInit(parser.StringExpression(string, type_), type_)
                 
@@ -799,7 +853,7 @@ def AnnotateInitializer(varDecl, type_, init, initList, symbolTable):
             size = type_.getBaseTypeSize(index)
 
             if index < type_.size:
-                initList.append(ZeroInit(size))
+                addStaticInit(initList, ZeroInit(size))
 
             return parser.CompoundInit(astInitList, type_)
 
@@ -1172,7 +1226,8 @@ def typeCheckFunctionDeclaration(funDec, symbolTable):
             case _:
                 adjustedParamTypes.append(paramType)
 
-    funDec.funType.paramTypes = adjustedParamTypes
+    #types are shared, the adjusted one is a new type
+    funDec.funType = parser.FunType(adjustedParamTypes, funDec.funType.retType)
 
     funType = funDec.funType
     hasBody = funDec.block != None
@@ -1199,7 +1254,7 @@ def typeCheckFunctionDeclaration(funDec, symbolTable):
             sys.exit(1)
 
         for old, new in zip(oldDecl.type.paramTypes, funType.paramTypes):
-            print("Old: ", old, "New:", new)
+            log.debug("parameter old: {0} new: {1}", old, new)
             if not old.checkType(new):
                 print("Error: Incompatible parameter types in function declarations.")
                 sys.exit(1)
@@ -1233,6 +1288,8 @@ def typeCheckFunctionDeclaration(funDec, symbolTable):
 
 def typeCheckProgram(pro):
     symbolTable = {}
+    stringPool.clear()
+
     if pro.declList:
         declList = []
         for decl in pro.declList:
@@ -0,0 +1,64 @@
+import tacGenerator
+import controlFlowGraph
+import diagnostics
+
+log = diagnostics.getLogger("unreachableCode")
+
+#Unreachable code elimination over the TAC control flow graph. Removes the
+#blocks ENTRY can't reach (the Return 0 after a return, the else of a
+#constant if), jumps to the block that follows anyway and labels nothing
+#jumps to.
+
+def isJump(i):
+    match i:
+        case tacGenerator.TAC_JumpInst() | tacGenerator.TAC_JumpIfZeroInst() | tacGenerator.TAC_JumpIfNotZeroInst():
+            return True
+    return False
+
+def eliminateFunction(function):
+    cfg = controlFlowGraph.buildCFG(function.instructions)
+
+    reachable = cfg.reachable()
+    blocks = [block for block in cfg.basicBlocks() if block.id in reachable]
+    removedBlocks = len(cfg.basicBlocks()) - len(blocks)
+
+    #a jump to the next block, conditional or not, ends up in the same place
+    removedJumps = 0
+    for index, block in enumerate(blocks[:-1]):
+        last = block.instructions[-1]
+        first = blocks[index + 1].instructions[0]
+
+        if isJump(last) and type(first) == tacGenerator.TAC_LabelInst and first.identifier == last.label:
+            block.instructions.pop()
+            removedJumps += 1
+
+    referenced = set()
+    for block in blocks:
+        if block.instructions and isJump(block.instructions[-1]):
+            referenced.add(block.instructions[-1].label)
+
+    removedLabels = 0
+    for block in blocks:
+        if block.instructions and type(block.instructions[0]) == tacGenerator.TAC_LabelInst and block.instructions[0].identifier not in referenced:
+            block.instructions.pop(0)
+            removedLabels += 1
+
+    instructions = []
+    for block in blocks:
+        instructions.extend(block.instructions)
+
+    changed = len(instructions) != len(function.instructions)
+    function.instructions = instructions
+
+    log.debug("function {0}: {1} blocks, {2} jumps and {3} labels removed", function.identifier, removedBlocks, removedJumps, removedLabels)
+
+    return changed
+
+def eliminateUnreachableCode(tac, symbolTable):
+    changed = False
+    for topLevel in tac.topLevelList:
+        match topLevel:
+            case tacGenerator.TAC_FunctionDef():
+                changed = eliminateFunction(topLevel) or changed
+
+    return changed
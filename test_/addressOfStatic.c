@@ -0,0 +1,44 @@
+//Taking the address of a global and of a static local must give the
+//variable itself, not a stack slot. Exits 42 at every -O level.
+
+int g = 42;
+
+int set(int *p)
+{
+    *p = 7;
+    return 0;
+}
+
+int get(void)
+{
+    return g;
+}
+
+int *counter(void)
+{
+    static int count = 0;
+    count = count + 1;
+    return &count;
+}
+
+int main(void)
+{
+    int *c;
+
+    set(&g);
+    if (get() != 7)
+        return 1;
+
+    counter();
+    c = counter();
+    if (*c != 2)
+        return 2;
+
+    *c = 10;
+    c = counter();
+    if (*c != 11)
+        return 3;
+
+    g = 42;
+    return get();
+}
@@ -0,0 +1,13 @@
+//Zeroing z with xorpd is only a write, so z is not live before it and the
+//fourteen doubles before it fit in registers at -O1 and -O2. Exits 105.
+
+double f(double a) {
+    double b = a + 1.0; double c = a + 2.0; double d = a + 3.0; double e = a + 4.0;
+    double g = a + 5.0; double h = a + 6.0; double i = a + 7.0; double j = a + 8.0;
+    double k = a + 9.0; double l = a + 10.0; double m = a + 11.0; double n = a + 12.0;
+    double o = a + 13.0;
+    double s = a + b + c + d + e + g + h + i + j + k + l + m + n + o;
+    double z = 0.0;
+    return s + z;
+}
+int main(void) { return (int)f(1.0); }